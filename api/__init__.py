@@ -9,9 +9,16 @@ from . import health  # This imports the routes from health.py
 from . import projects  # This imports the routes from projects.py
 from . import contact  # This imports the routes from contact.py
 from . import auth  # This imports the new admin auth routes
+from . import admin_projects  # This imports the admin project and tag routes
+from . import time_logs  # This imports the freelance time log routes
+from . import invoices  # This imports the freelance invoice routes
+from . import dashboard  # This imports the freelance dashboard route
+from . import jobs  # This imports the background job stats route
+from . import caching  # This imports the cache stats route
+from . import analytics  # This imports the project view analytics routes
+from . import events  # This imports the admin change event stream
+from . import bootstrap  # This imports the batched admin dashboard route
 
 # Future routes for when you're ready to implement freelance features
 # from . import clients
 # from . import freelance_projects
-# from . import time_logs
-# from . import invoices
\ No newline at end of file
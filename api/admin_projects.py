@@ -1,19 +1,36 @@
 from flask import jsonify, request
 from datetime import datetime
-import sys
-import os
+from sqlalchemy import delete, func, select, true, update
+from sqlalchemy.exc import IntegrityError
 
-# Add parent directory to path to resolve imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-# Import db from the parent package
-from __init__ import db
+# Import the database extension
+from extensions import db
 # Import models from the parent package
-from models import Project, Tag
+from models import Project, Tag, project_tags
 # Import the blueprint
 from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
 # Import authentication decorator
 from .auth import admin_required
+# Import request validation
+from .validation import (PROJECT_BULK_SCHEMA, PROJECT_CREATE_SCHEMA, PROJECT_REORDER_SCHEMA,
+                         PROJECT_UPDATE_SCHEMA, validate_json)
+# Import the markdown pre-rendering stage
+from services.rendering import apply_rendering
+# Import the image variant pipeline, archival and related-project jobs,
+# the admin change feed, the tag autocomplete index and manual ordering
+from services import archival, changes, images, ordering, related, tag_index
+# Import cross-worker cache invalidation
+import cache
+# Import Idempotency-Key replay for retried POSTs
+import idempotency
+
+# Markdown content dominates project payloads
+PROJECT_MAX_BYTES = 512 * 1024
+# Fields the bulk endpoint can set; the rest need per-project work (slugs, rendering)
+BULK_FIELDS = ('featured', 'private')
+BULK_FILTERS = {'tag': str, 'featured': bool, 'private': bool}
 
 # Helper function to create slug from title
 def create_slug(title):
@@ -34,36 +51,47 @@ def get_or_create_tags(tag_names):
         if not tag:
             tag = Tag(name=tag_name)
             db.session.add(tag)
+            tag_index.track_created(tag)
+            cache.invalidate('tags')
         tags.append(tag)
     return tags
 
+def dialect_insert(table):
+    """INSERT with on_conflict_do_nothing() for the current database."""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+def ensure_tags(tag_names):
+    """Ids of the named tags, creating the missing ones in one INSERT; {name: id}."""
+    tag_ids = dict(db.session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(tag_names))).all())
+    missing = [tag_name for tag_name in tag_names if tag_name not in tag_ids]
+    if missing:
+        # Another request may create the same tag meanwhile; its row is used then
+        db.session.execute(
+            dialect_insert(Tag).on_conflict_do_nothing(index_elements=['name']),
+            [{'name': tag_name} for tag_name in missing]
+        )
+        tag_ids.update(db.session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing))).all())
+        cache.invalidate('tags')
+    return tag_ids
+
 @api.route('/admin/projects', methods=['POST'])
+@validate_json(PROJECT_CREATE_SCHEMA, max_bytes=PROJECT_MAX_BYTES)
 @admin_required
+@idempotency.idempotent
 def create_project():
     """Create a new project."""
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'status': 'error',
-                'message': 'No data provided'
-            }), 400
-        
-        # Validate required fields
-        required_fields = ['title', 'description']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Missing required field: {field}'
-                }), 400
+        data = request.validated_data
         
         # Create slug from title if not provided
         slug = data.get('slug') or create_slug(data['title'])
         
-        # Check if slug already exists
-        existing_project = Project.query.filter_by(slug=slug).first()
+        # Check if slug already exists (deleted projects release theirs)
+        existing_project = Project.query.filter_by(slug=slug, deleted_at=None).first()
         if existing_project:
             return jsonify({
                 'status': 'error',
@@ -80,6 +108,8 @@ def create_project():
             featured=data.get('featured', False),
             content=data.get('content'),
             image_url=data.get('image_url'),
+            # New projects go to the end of the manual order
+            sort_key=ordering.next_key(),
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
@@ -89,8 +119,19 @@ def create_project():
             tag_objects = get_or_create_tags(data['tags'])
             new_project.tags = tag_objects
         
-        # Save to database
+        # Pre-render markdown so reads never have to
+        apply_rendering(new_project)
+        
+        # Save to database, queueing image variants in the same transaction
         db.session.add(new_project)
+        db.session.flush()
+        images.schedule_processing(new_project)
+        related.schedule_update(new_project)
+        if ordering.needs_rebalance(new_project.sort_key):
+            ordering.schedule_rebalance()
+        changes.record('project.created', changes.project_data(new_project))
+        cache.invalidate('projects')
+        cache.invalidate('project', new_project.slug)
         db.session.commit()
         
         # Return created project
@@ -116,6 +157,7 @@ def create_project():
         }), 201
     
     except Exception as e:
+        capture_exception(e)
         db.session.rollback()
         return jsonify({
             'status': 'error',
@@ -123,25 +165,21 @@ def create_project():
         }), 500
 
 @api.route('/admin/projects/<int:project_id>', methods=['PUT'])
+@validate_json(PROJECT_UPDATE_SCHEMA, max_bytes=PROJECT_MAX_BYTES)
 @admin_required
 def update_project(project_id):
     """Update an existing project."""
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'status': 'error',
-                'message': 'No data provided'
-            }), 400
+        data = request.validated_data
         
         # Find project
         project = Project.query.get(project_id)
-        if not project:
+        if not project or project.deleted_at:
             return jsonify({
                 'status': 'error',
                 'message': 'Project not found'
             }), 404
+        old_slug = project.slug
         
         # Update fields if provided
         if 'title' in data:
@@ -150,13 +188,13 @@ def update_project(project_id):
             if 'slug' not in data:
                 new_slug = create_slug(data['title'])
                 # Check if new slug conflicts with existing projects (excluding current)
-                existing = Project.query.filter(Project.slug == new_slug, Project.id != project_id).first()
+                existing = Project.query.filter(Project.slug == new_slug, Project.id != project_id, Project.deleted_at.is_(None)).first()
                 if not existing:
                     project.slug = new_slug
         
         if 'slug' in data:
             # Check if slug conflicts with existing projects (excluding current)
-            existing = Project.query.filter(Project.slug == data['slug'], Project.id != project_id).first()
+            existing = Project.query.filter(Project.slug == data['slug'], Project.id != project_id, Project.deleted_at.is_(None)).first()
             if existing:
                 return jsonify({
                     'status': 'error',
@@ -174,8 +212,11 @@ def update_project(project_id):
             project.featured = data['featured']
         if 'content' in data:
             project.content = data['content']
-        if 'image_url' in data:
+            apply_rendering(project)
+        image_changed = 'image_url' in data and data['image_url'] != project.image_url
+        if image_changed:
             project.image_url = data['image_url']
+            images.clear_image_metadata(project)
         
         # Handle tags
         if 'tags' in data:
@@ -188,7 +229,17 @@ def update_project(project_id):
         # Update timestamp
         project.updated_at = datetime.utcnow()
         
-        # Save changes
+        if image_changed:
+            images.schedule_processing(project)
+        if 'tags' in data or 'description' in data:
+            related.schedule_update(project)
+        changes.record('project.updated', dict(changes.project_data(project), previous_slug=old_slug))
+        
+        # Save changes; every worker drops its cached copies on commit
+        cache.invalidate('projects')
+        cache.invalidate('related')
+        cache.invalidate('project', old_slug)
+        cache.invalidate('project', project.slug)
         db.session.commit()
         
         # Return updated project
@@ -214,6 +265,160 @@ def update_project(project_id):
         })
     
     except Exception as e:
+        capture_exception(e)
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+def bulk_error(message):
+    return jsonify({
+        'status': 'error',
+        'message': message
+    }), 400
+
+@api.route('/admin/projects/bulk', methods=['PATCH'])
+@validate_json(PROJECT_BULK_SCHEMA)
+@admin_required
+def bulk_update_projects():
+    """Change many projects in one transaction.
+
+    Targets are live projects, given as "ids" or as a "filter" on tag,
+    featured and private. "set" takes featured and private; "add_tags" and
+    "remove_tags" take tag names. Each change is one set-based statement
+    however many projects it touches. Returns a result per project.
+    """
+    try:
+        data = request.validated_data
+        if ('ids' in data) == ('filter' in data):
+            return bulk_error('Provide exactly one of ids or filter')
+        
+        fields = data.get('set') or {}
+        for name, value in fields.items():
+            if name not in BULK_FIELDS:
+                return bulk_error(f"Only {', '.join(BULK_FIELDS)} can be set in bulk")
+            if not isinstance(value, bool):
+                return bulk_error(f'Invalid field: set.{name} must be a boolean')
+        add_names = list(dict.fromkeys(data.get('add_tags') or []))
+        remove_names = list(dict.fromkeys(data.get('remove_tags') or []))
+        both = set(add_names) & set(remove_names)
+        if both:
+            return bulk_error(f"Tag(s) both added and removed: {', '.join(sorted(both))}")
+        if not fields and not add_names and not remove_names:
+            return bulk_error('Nothing to change: provide set, add_tags or remove_tags')
+        
+        # Resolve the targets in one query
+        query = select(Project.id, Project.slug, Project.featured, Project.private).where(Project.deleted_at.is_(None))
+        if 'ids' in data:
+            requested = list(dict.fromkeys(data['ids']))
+            query = query.where(Project.id.in_(requested))
+        else:
+            requested = None
+            for name, value in data['filter'].items():
+                kind = BULK_FILTERS.get(name)
+                if kind is None:
+                    return bulk_error(f"Unknown filter: {name} (use {', '.join(BULK_FILTERS)})")
+                if not isinstance(value, kind):
+                    return bulk_error(f'Invalid field: filter.{name} must be a {kind.__name__}')
+            filters = data['filter']
+            if 'tag' in filters:
+                query = (query.join(project_tags, project_tags.c.project_id == Project.id)
+                         .join(Tag, Tag.id == project_tags.c.tag_id).where(Tag.name == filters['tag']))
+            for name in ('featured', 'private'):
+                if name in filters:
+                    query = query.where(getattr(Project, name) == filters[name])
+        targets = {row.id: row for row in db.session.execute(query)}
+        target_ids = sorted(targets)
+        
+        # Current links between the targets and the tags involved, to report
+        # (and write) only what actually changes
+        add_ids = ensure_tags(add_names) if add_names and target_ids else {}
+        remove_ids = dict(db.session.execute(
+            select(Tag.name, Tag.id).where(Tag.name.in_(remove_names))
+        ).all()) if remove_names and target_ids else {}
+        involved = set(add_ids.values()) | set(remove_ids.values())
+        linked = set(db.session.execute(
+            select(project_tags.c.project_id, project_tags.c.tag_id)
+            .where(project_tags.c.project_id.in_(target_ids), project_tags.c.tag_id.in_(involved))
+        ).all()) if involved else set()
+        
+        results = {}
+        for project_id, row in targets.items():
+            results[project_id] = {
+                'id': project_id,
+                'fields': [name for name, value in fields.items() if getattr(row, name) != value],
+                'tags_added': [name for name in add_names if (project_id, add_ids[name]) not in linked],
+                'tags_removed': [name for name in remove_names
+                                 if name in remove_ids and (project_id, remove_ids[name]) in linked]
+            }
+        changed = sorted(project_id for project_id, result in results.items()
+                         if result['fields'] or result['tags_added'] or result['tags_removed'])
+        retagged = sorted(project_id for project_id in changed
+                          if results[project_id]['tags_added'] or results[project_id]['tags_removed'])
+        
+        if changed:
+            if add_ids:
+                # INSERT ... SELECT: every (target, tag) pair in one statement
+                pairs = (
+                    select(Project.id, Tag.id)
+                    .join(Tag, true())
+                    .where(Project.id.in_(retagged), Tag.id.in_(add_ids.values()))
+                )
+                db.session.execute(
+                    dialect_insert(project_tags)
+                    .from_select(['project_id', 'tag_id'], pairs)
+                    .on_conflict_do_nothing(index_elements=['project_id', 'tag_id'])
+                )
+            if remove_ids:
+                db.session.execute(delete(project_tags).where(
+                    project_tags.c.project_id.in_(retagged),
+                    project_tags.c.tag_id.in_(remove_ids.values())
+                ))
+            db.session.execute(
+                update(Project)
+                .where(Project.id.in_(changed))
+                .values(**fields, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            
+            related.schedule_updates(retagged)
+            changes.record('projects.bulk_updated', {
+                'ids': changed,
+                'set': fields,
+                'add_tags': add_names,
+                'remove_tags': remove_names
+            })
+            cache.invalidate('projects')
+            cache.invalidate('related')
+            for project_id in changed:
+                cache.invalidate('project', targets[project_id].slug)
+            if retagged:
+                # Tag project counts changed
+                cache.invalidate('tags')
+        db.session.commit()
+        
+        changed_set = set(changed)
+        order = requested if requested is not None else target_ids
+        project_results = []
+        for project_id in order:
+            result = results.get(project_id)
+            if result is None:
+                project_results.append({'id': project_id, 'status': 'not_found'})
+            else:
+                project_results.append(dict(result, status='updated' if project_id in changed_set else 'unchanged'))
+        
+        return jsonify({
+            'status': 'success',
+            'message': f'{len(changed)} of {len(targets)} project(s) updated',
+            'updated': len(changed),
+            'unchanged': len(targets) - len(changed),
+            'not_found': len(order) - len(targets),
+            'results': project_results
+        })
+    
+    except Exception as e:
+        capture_exception(e)
         db.session.rollback()
         return jsonify({
             'status': 'error',
@@ -223,11 +428,11 @@ def update_project(project_id):
 @api.route('/admin/projects/<int:project_id>', methods=['DELETE'])
 @admin_required
 def delete_project(project_id):
-    """Delete a project."""
+    """Delete a project (soft delete; it can be restored until it is archived)."""
     try:
         # Find project
         project = Project.query.get(project_id)
-        if not project:
+        if not project or project.deleted_at:
             return jsonify({
                 'status': 'error',
                 'message': 'Project not found'
@@ -236,8 +441,14 @@ def delete_project(project_id):
         # Store project title for response
         project_title = project.title
         
-        # Delete project
-        db.session.delete(project)
+        # Mark as deleted; the archive job moves it out of the table later
+        project.deleted_at = datetime.utcnow()
+        archival.schedule()
+        related.schedule_update(project)
+        changes.record('project.deleted', changes.project_data(project))
+        cache.invalidate('projects')
+        cache.invalidate('related')
+        cache.invalidate('project', project.slug)
         db.session.commit()
         
         return jsonify({
@@ -246,6 +457,146 @@ def delete_project(project_id):
         })
     
     except Exception as e:
+        capture_exception(e)
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/projects/<int:project_id>/restore', methods=['POST'])
+@admin_required
+@idempotency.idempotent
+def restore_project(project_id):
+    """Restore a deleted project that has not been archived yet."""
+    try:
+        project = Project.query.get(project_id)
+        if not project or not project.deleted_at:
+            return jsonify({
+                'status': 'error',
+                'message': 'Deleted project not found'
+            }), 404
+        
+        # The slug may have been reused while the project was deleted
+        existing = Project.query.filter(Project.slug == project.slug, Project.deleted_at.is_(None)).first()
+        if existing:
+            return jsonify({
+                'status': 'error',
+                'message': 'A project with this slug already exists'
+            }), 400
+        
+        # Its place in the order may have been given away too; if so it goes last
+        if ordering.key_taken(project.sort_key, exclude_id=project.id):
+            project.sort_key = ordering.next_key()
+        
+        project.deleted_at = None
+        project.updated_at = datetime.utcnow()
+        related.schedule_update(project)
+        changes.record('project.restored', changes.project_data(project))
+        cache.invalidate('projects')
+        cache.invalidate('related')
+        cache.invalidate('project', project.slug)
+        db.session.commit()
+        
+        return jsonify({
+            'status': 'success',
+            'message': f'Project "{project.title}" restored successfully'
+        })
+    
+    except Exception as e:
+        capture_exception(e)
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+def parse_move(move):
+    """(project id, 'after' or 'before', anchor id or None), or an error message."""
+    project_id = move.get('id')
+    if not isinstance(project_id, int) or isinstance(project_id, bool):
+        return 'Invalid field: moves[].id must be an integer'
+    anchors = [name for name in ('after_id', 'before_id') if name in move]
+    if len(anchors) != 1:
+        return 'Each move needs exactly one of after_id or before_id'
+    anchor_id = move[anchors[0]]
+    if anchor_id is not None and (not isinstance(anchor_id, int) or isinstance(anchor_id, bool)):
+        return f'Invalid field: moves[].{anchors[0]} must be an integer or null'
+    return project_id, anchors[0][:-3], anchor_id
+
+@api.route('/admin/projects/reorder', methods=['POST'])
+@validate_json(PROJECT_REORDER_SCHEMA)
+@admin_required
+@idempotency.idempotent
+def reorder_projects():
+    """Move projects in the manual order, all in one transaction.
+
+    Moves run in the given order. {"id": 3, "after_id": 7} puts project 3
+    right after project 7 and {"id": 3, "before_id": 7} right before it;
+    "after_id": null moves it to the start and "before_id": null to the end.
+    Each move rewrites only the moved project's sort_key.
+    """
+    try:
+        moves = []
+        for move in request.validated_data['moves']:
+            parsed = parse_move(move)
+            if isinstance(parsed, str):
+                return jsonify({
+                    'status': 'error',
+                    'message': parsed
+                }), 400
+            moves.append(parsed)
+        
+        # Load every project the moves name in one query
+        ids = {project_id for project_id, _, _ in moves} | {anchor_id for _, _, anchor_id in moves if anchor_id is not None}
+        projects = {
+            project.id: project
+            for project in Project.query.filter(Project.id.in_(ids), Project.deleted_at.is_(None))
+        }
+        missing = sorted(ids - projects.keys())
+        if missing:
+            return jsonify({
+                'status': 'error',
+                'message': f"Project(s) not found: {', '.join(map(str, missing))}"
+            }), 404
+        
+        keys = {}
+        for project_id, direction, anchor_id in moves:
+            project = projects[project_id]
+            anchor = projects.get(anchor_id)
+            if direction == 'after':
+                key = ordering.move(project, after=anchor, to_start=anchor is None)
+            else:
+                key = ordering.move(project, before=anchor)
+            keys[project_id] = key
+        
+        # Keys grow when moves keep landing in the same gap
+        rebalance = any(ordering.needs_rebalance(key) for key in keys.values())
+        if rebalance:
+            ordering.schedule_rebalance()
+        changes.record('projects.reordered', {'projects': [
+            {'id': project_id, 'sort_key': key} for project_id, key in keys.items()
+        ]})
+        cache.invalidate('projects')
+        db.session.commit()
+        
+        return jsonify({
+            'status': 'success',
+            'message': f'{len(moves)} move(s) applied',
+            'projects': [{'id': project_id, 'sort_key': key} for project_id, key in keys.items()],
+            'rebalance_scheduled': rebalance
+        })
+    
+    except IntegrityError:
+        # Another reorder took the same key first
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': 'The order changed while the moves were applied, please reload and retry'
+        }), 409
+    
+    except Exception as e:
+        capture_exception(e)
         db.session.rollback()
         return jsonify({
             'status': 'error',
@@ -255,9 +606,18 @@ def delete_project(project_id):
 @api.route('/admin/projects', methods=['GET'])
 @admin_required
 def get_all_projects_admin():
-    """Get all projects for admin (including private ones)."""
+    """Get all projects for admin (including private ones).
+
+    ?deleted=true lists the trash; ?sort=manual lists live projects in the
+    portfolio order instead of by last update.
+    """
     try:
-        projects = Project.query.order_by(Project.updated_at.desc()).all()
+        if request.args.get('deleted', 'false').lower() == 'true':
+            projects = Project.query.filter(Project.deleted_at.isnot(None)).order_by(Project.deleted_at.desc()).all()
+        elif request.args.get('sort') == 'manual':
+            projects = Project.query.filter(Project.deleted_at.is_(None)).order_by(Project.sort_key).all()
+        else:
+            projects = Project.query.filter(Project.deleted_at.is_(None)).order_by(Project.updated_at.desc()).all()
         
         result = []
         for project in projects:
@@ -272,8 +632,10 @@ def get_all_projects_admin():
                 'content': project.content,
                 'image_url': project.image_url,
                 'tags': [tag.name for tag in project.tags],
+                'sort_key': project.sort_key,
                 'created_at': project.created_at.isoformat(),
-                'updated_at': project.updated_at.isoformat()
+                'updated_at': project.updated_at.isoformat(),
+                'deleted_at': project.deleted_at.isoformat() if project.deleted_at else None
             }
             result.append(project_data)
         
@@ -284,6 +646,7 @@ def get_all_projects_admin():
         })
     
     except Exception as e:
+        capture_exception(e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -312,8 +675,10 @@ def get_project_admin(project_id):
             'content': project.content,
             'image_url': project.image_url,
             'tags': [tag.name for tag in project.tags],
+            'sort_key': project.sort_key,
             'created_at': project.created_at.isoformat(),
-            'updated_at': project.updated_at.isoformat()
+            'updated_at': project.updated_at.isoformat(),
+            'deleted_at': project.deleted_at.isoformat() if project.deleted_at else None
         }
         
         return jsonify({
@@ -322,6 +687,7 @@ def get_project_admin(project_id):
         })
     
     except Exception as e:
+        capture_exception(e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -333,13 +699,20 @@ def get_all_tags():
     """Get all available tags."""
     try:
         tags = Tag.query.order_by(Tag.name).all()
+        # Count live projects per tag in one query
+        counts = dict(db.session.execute(
+            select(project_tags.c.tag_id, func.count())
+            .join(Project, Project.id == project_tags.c.project_id)
+            .where(Project.deleted_at.is_(None))
+            .group_by(project_tags.c.tag_id)
+        ).all())
         
         result = []
         for tag in tags:
             tag_data = {
                 'id': tag.id,
                 'name': tag.name,
-                'project_count': len(tag.projects)
+                'project_count': counts.get(tag.id, 0)
             }
             result.append(tag_data)
         
@@ -350,6 +723,29 @@ def get_all_tags():
         })
     
     except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/tags/suggest', methods=['GET'])
+@admin_required
+def suggest_tags():
+    """Get tags matching ?q= for autocomplete, most used first (?limit=, default 10)."""
+    try:
+        query = request.args.get('q', '')
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+        suggestions, source = tag_index.suggest(query[:50], limit)
+        
+        return jsonify({
+            'status': 'success',
+            'tags': suggestions,
+            'source': source
+        })
+    
+    except Exception as e:
+        capture_exception(e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -367,15 +763,20 @@ def delete_tag(tag_id):
                 'message': 'Tag not found'
             }), 404
         
-        # Check if tag is used by any projects
-        if tag.projects:
+        # Check if tag is used by any live projects
+        live_projects = [project for project in tag.projects if not project.deleted_at]
+        if live_projects:
             return jsonify({
                 'status': 'error',
-                'message': f'Cannot delete tag "{tag.name}" - it is used by {len(tag.projects)} project(s)'
+                'message': f'Cannot delete tag "{tag.name}" - it is used by {len(live_projects)} project(s)'
             }), 400
         
+        # Deleted projects lose the tag (the association rows go with it)
         tag_name = tag.name
         db.session.delete(tag)
+        tag_index.track_deleted(tag_id)
+        changes.record('tag.deleted', {'id': tag_id, 'name': tag_name})
+        cache.invalidate('tags')
         db.session.commit()
         
         return jsonify({
@@ -384,6 +785,7 @@ def delete_tag(tag_id):
         })
     
     except Exception as e:
+        capture_exception(e)
         db.session.rollback()
         return jsonify({
             'status': 'error',
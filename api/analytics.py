@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+from flask import jsonify, request
+from sqlalchemy import func, select
+
+# Import the database extension
+from extensions import db
+# Import models from the parent package
+from models import Project, ProjectView
+# Import buffered view counting
+from services import views
+# Import the blueprint
+from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+# Import authentication decorator
+from .auth import admin_required
+
+# Longest range the endpoints will aggregate
+MAX_DAYS = 365
+
+def _days_arg(default):
+    return max(1, min(request.args.get('days', default, type=int), MAX_DAYS))
+
+@api.route('/admin/analytics/views', methods=['GET'])
+@admin_required
+def get_view_analytics():
+    """Get daily view totals and the most viewed projects for the last ?days (default 30)."""
+    try:
+        days = _days_arg(30)
+        limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+
+        daily = db.session.execute(
+            select(ProjectView.day, func.sum(ProjectView.views))
+            .where(ProjectView.day >= since)
+            .group_by(ProjectView.day)
+            .order_by(ProjectView.day)
+        ).all()
+
+        totals = (
+            select(ProjectView.project_id, func.sum(ProjectView.views).label('views'))
+            .where(ProjectView.day >= since)
+            .group_by(ProjectView.project_id)
+            .subquery()
+        )
+        top = db.session.execute(
+            select(Project.id, Project.title, Project.slug, Project.popularity, totals.c.views)
+            .join(totals, totals.c.project_id == Project.id)
+            .order_by(totals.c.views.desc(), Project.id)
+            .limit(limit)
+        ).all()
+
+        return jsonify({
+            'status': 'success',
+            'since': since.isoformat(),
+            'total': sum(count for _, count in daily),
+            'daily': [{'day': day.isoformat(), 'views': count} for day, count in daily],
+            'top_projects': [
+                {
+                    'id': project_id,
+                    'title': title,
+                    'slug': slug,
+                    'popularity': popularity,
+                    'views': count
+                }
+                for project_id, title, slug, popularity, count in top
+            ],
+            # Views counted by this worker and not yet written
+            'buffer': views.stats()
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/analytics/projects/<int:project_id>/views', methods=['GET'])
+@admin_required
+def get_project_view_analytics(project_id):
+    """Get one project's daily views for the last ?days (default 90)."""
+    try:
+        project = Project.query.get(project_id)
+        if not project:
+            return jsonify({
+                'status': 'error',
+                'message': 'Project not found'
+            }), 404
+
+        days = _days_arg(90)
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        daily = db.session.execute(
+            select(ProjectView.day, ProjectView.views)
+            .where(ProjectView.project_id == project_id, ProjectView.day >= since)
+            .order_by(ProjectView.day)
+        ).all()
+
+        return jsonify({
+            'status': 'success',
+            'id': project.id,
+            'slug': project.slug,
+            'popularity': project.popularity,
+            'since': since.isoformat(),
+            'total': sum(count for _, count in daily),
+            'daily': [{'day': day.isoformat(), 'views': count} for day, count in daily]
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
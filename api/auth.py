@@ -1,22 +1,28 @@
 from flask import jsonify, request, current_app
 from functools import wraps
-import jwt
 from datetime import datetime, timedelta
-import sys
-import os
+from sqlalchemy.orm import make_transient_to_detached
 
-# Add parent directory to path to resolve imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-# Import db from the parent package
-from __init__ import db
+# Import the database extension
+from extensions import db
+# Import request tracing
+import tracing
+# Import the process-local cache (user rows for admin_required)
+import cache
 # Import models from the parent package
 from models import User
 # Import the blueprint
 from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+# Import request validation
+from .validation import CHANGE_PASSWORD_SCHEMA, CREATE_ADMIN_SCHEMA, LOGIN_SCHEMA, validate_json
 
 def generate_token(user_id):
     """Generate JWT token for user."""
+    # PyJWT is imported on first use to keep it out of worker start-up
+    import jwt
+    
     payload = {
         'user_id': user_id,
         'exp': datetime.utcnow() + timedelta(hours=24),  # Token expires in 24 hours
@@ -26,13 +32,42 @@ def generate_token(user_id):
 
 def verify_token(token):
     """Verify JWT token and return user_id."""
-    try:
-        payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-        return payload['user_id']
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
+    import jwt
+    
+    with tracing.span('jwt.verify') as span:
+        try:
+            payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+            return payload['user_id']
+        except jwt.ExpiredSignatureError:
+            span.set_attribute('jwt.invalid', 'expired')
+            return None
+        except jwt.InvalidTokenError:
+            span.set_attribute('jwt.invalid', 'invalid')
+            return None
+
+def load_user(user_id):
+    """Get the token's user, from the process cache when possible.
+
+    The cache holds plain column values; the user is attached to the session
+    without a query, so request handlers can still modify and commit it.
+    """
+    def load():
+        user = db.session.get(User, user_id)
+        if not user:
+            return None
+        return {
+            'id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'password_hash': user.password_hash
+        }
+
+    row = cache.get_or_load('user', str(user_id), load)
+    if row is None:
         return None
+    user = User(**row)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
 
 def admin_required(f):
     """Decorator to require admin authentication for routes."""
@@ -66,7 +101,7 @@ def admin_required(f):
             }), 401
         
         # Check if user exists
-        user = User.query.get(user_id)
+        user = load_user(user_id)
         if not user:
             return jsonify({
                 'status': 'error',
@@ -81,25 +116,13 @@ def admin_required(f):
     return decorated_function
 
 @api.route('/auth/login', methods=['POST'])
+@validate_json(LOGIN_SCHEMA, max_bytes=4096)
 def login():
     """Admin login endpoint."""
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'status': 'error',
-                'message': 'No data provided'
-            }), 400
-        
-        username = data.get('username')
-        password = data.get('password')
-        
-        if not username or not password:
-            return jsonify({
-                'status': 'error',
-                'message': 'Username and password are required'
-            }), 400
+        data = request.validated_data
+        username = data['username']
+        password = data['password']
         
         # Find user
         user = User.query.filter_by(username=username).first()
@@ -125,6 +148,7 @@ def login():
         })
     
     except Exception as e:
+        capture_exception(e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -147,6 +171,7 @@ def verify_auth():
         })
     
     except Exception as e:
+        capture_exception(e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -162,6 +187,7 @@ def logout():
     })
 
 @api.route('/auth/create-admin', methods=['POST'])
+@validate_json(CREATE_ADMIN_SCHEMA, max_bytes=4096)
 def create_admin():
     """Create initial admin user (remove this endpoint after first use!)."""
     try:
@@ -173,21 +199,7 @@ def create_admin():
                 'message': 'Admin user already exists. This endpoint is disabled.'
             }), 403
         
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'status': 'error',
-                'message': 'No data provided'
-            }), 400
-        
-        required_fields = ['username', 'email', 'password']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Missing required field: {field}'
-                }), 400
+        data = request.validated_data
         
         # Create admin user
         admin_user = User(
@@ -210,6 +222,7 @@ def create_admin():
         }), 201
     
     except Exception as e:
+        capture_exception(e)
         db.session.rollback()
         return jsonify({
             'status': 'error',
@@ -217,26 +230,14 @@ def create_admin():
         }), 500
 
 @api.route('/auth/change-password', methods=['PUT'])
+@validate_json(CHANGE_PASSWORD_SCHEMA, max_bytes=4096)
 @admin_required
 def change_password():
     """Change user password."""
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'status': 'error',
-                'message': 'No data provided'
-            }), 400
-        
-        current_password = data.get('current_password')
-        new_password = data.get('new_password')
-        
-        if not current_password or not new_password:
-            return jsonify({
-                'status': 'error',
-                'message': 'Current password and new password are required'
-            }), 400
+        data = request.validated_data
+        current_password = data['current_password']
+        new_password = data['new_password']
         
         user = request.current_user
         
@@ -247,8 +248,9 @@ def change_password():
                 'message': 'Current password is incorrect'
             }), 400
         
-        # Set new password
+        # Set new password; other workers drop their cached copy on commit
         user.set_password(new_password)
+        cache.invalidate('user', user.id)
         db.session.commit()
         
         return jsonify({
@@ -257,6 +259,7 @@ def change_password():
         })
     
     except Exception as e:
+        capture_exception(e)
         db.session.rollback()
         return jsonify({
             'status': 'error',
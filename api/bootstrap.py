@@ -0,0 +1,211 @@
+from collections import defaultdict
+from datetime import date
+import hashlib
+
+from flask import Response, jsonify, request
+from sqlalchemy import and_, func, literal_column, not_, select
+
+# Import the database extension
+from extensions import db
+# Import models from the parent package
+from models import Contact, Project, Tag, project_tags
+# Import the dashboard summary service
+from services import dashboard
+# Import the blueprint
+from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+# Import authentication decorator
+from .auth import admin_required
+
+SECTIONS = ('user', 'projects', 'tags', 'contacts', 'freelance')
+
+def _version(*parts):
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:16]
+
+def _parse_versions(value):
+    """'projects:abc,tags:def' -> {'projects': 'abc', 'tags': 'def'}."""
+    versions = {}
+    for item in (value or '').split(','):
+        section, _, version = item.strip().partition(':')
+        if section and version:
+            versions[section] = version
+    return versions
+
+def _read_state(sections):
+    """Everything the section versions depend on, in one statement."""
+    live_project = Project.deleted_at.is_(None)
+    live_contact = Contact.deleted_at.is_(None)
+    columns = []
+    if 'projects' in sections or 'tags' in sections:
+        columns += [
+            select(func.count()).select_from(Project).where(live_project)
+            .scalar_subquery().label('live_projects'),
+            select(func.max(Project.updated_at)).where(live_project)
+            .scalar_subquery().label('projects_updated_at'),
+            select(func.max(Project.deleted_at)).where(Project.deleted_at.isnot(None))
+            .scalar_subquery().label('projects_deleted_at')
+        ]
+    if 'tags' in sections:
+        columns += [
+            select(func.count()).select_from(Tag).scalar_subquery().label('tags'),
+            select(func.max(Tag.id)).scalar_subquery().label('max_tag_id')
+        ]
+    if 'contacts' in sections:
+        columns += [
+            select(func.count()).select_from(Contact).where(not_(Contact.read), live_contact)
+            .scalar_subquery().label('unread_contacts'),
+            select(func.count()).select_from(Contact).where(live_contact)
+            .scalar_subquery().label('live_contacts'),
+            select(func.max(Contact.created_at)).where(live_contact)
+            .scalar_subquery().label('latest_contact_at')
+        ]
+    if 'freelance' in sections:
+        columns.append(literal_column(
+            "(SELECT refreshed_at FROM dashboard_summary WHERE metric = 'refreshed')"
+        ).label('freelance_refreshed_at'))
+    if not columns:
+        return {}
+    return db.session.execute(select(*columns)).one()._asdict()
+
+def _section_versions(sections, state, user):
+    projects = (state.get('live_projects'), state.get('projects_updated_at'), state.get('projects_deleted_at'))
+    versions = {
+        'user': _version(user.id, user.username, user.email),
+        'projects': _version(*projects),
+        # Tag counts follow project changes too
+        'tags': _version(*projects, state.get('tags'), state.get('max_tag_id')),
+        'contacts': _version(state.get('unread_contacts'), state.get('live_contacts'), state.get('latest_contact_at')),
+        'freelance': _version(state.get('freelance_refreshed_at'))
+    }
+    return {section: versions[section] for section in sections}
+
+def _load_projects():
+    """Live project summaries (no content) in two statements."""
+    live = Project.deleted_at.is_(None)
+    tags = defaultdict(list)
+    for project_id, name in db.session.execute(
+        select(project_tags.c.project_id, Tag.name)
+        .join(Tag, Tag.id == project_tags.c.tag_id)
+        .join(Project, Project.id == project_tags.c.project_id)
+        .where(live)
+        .order_by(Tag.name)
+    ):
+        tags[project_id].append(name)
+
+    rows = db.session.execute(
+        select(Project.id, Project.title, Project.slug, Project.description, Project.github,
+               Project.private, Project.featured, Project.image_url, Project.created_at, Project.updated_at)
+        .where(live)
+        .order_by(Project.updated_at.desc())
+    ).all()
+    return [
+        {
+            'id': row.id,
+            'title': row.title,
+            'slug': row.slug,
+            'description': row.description,
+            'github': row.github,
+            'private': row.private,
+            'featured': row.featured,
+            'image_url': row.image_url,
+            'tags': tags[row.id],
+            'created_at': row.created_at.isoformat(),
+            'updated_at': row.updated_at.isoformat()
+        }
+        for row in rows
+    ]
+
+def _load_tags():
+    """Tags with live project counts in one statement."""
+    live_counts = (
+        select(project_tags.c.tag_id, func.count().label('project_count'))
+        .join(Project, and_(Project.id == project_tags.c.project_id, Project.deleted_at.is_(None)))
+        .group_by(project_tags.c.tag_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(Tag.id, Tag.name, func.coalesce(live_counts.c.project_count, 0))
+        .outerjoin(live_counts, live_counts.c.tag_id == Tag.id)
+        .order_by(Tag.name)
+    ).all()
+    return [{'id': tag_id, 'name': name, 'project_count': count} for tag_id, name, count in rows]
+
+def _load_freelance():
+    summary = dashboard.load_summary(date.today())
+    refreshed_at = summary['refreshed_at']
+    return {
+        'unpaid': summary['unpaid'],
+        'overdue': summary['overdue'],
+        'totals': summary['totals'],
+        'refreshed_at': refreshed_at.isoformat() if refreshed_at else None
+    }
+
+@api.route('/admin/bootstrap', methods=['GET'])
+@admin_required
+def get_admin_bootstrap():
+    """Get everything the admin dashboard needs on load in one request.
+
+    ?sections= picks sections (default all). ?versions=projects:<v>,tags:<v>
+    skips sections the client already has; If-None-Match works for the whole
+    response.
+    """
+    try:
+        requested = request.args.get('sections')
+        sections = [section.strip() for section in requested.split(',')] if requested else list(SECTIONS)
+        unknown = [section for section in sections if section not in SECTIONS]
+        if unknown:
+            return jsonify({
+                'status': 'error',
+                'message': f"Unknown section(s): {', '.join(unknown)}"
+            }), 400
+
+        if 'freelance' in sections:
+            dashboard.ensure_table()
+        user = request.current_user
+        state = _read_state(sections)
+        versions = _section_versions(sections, state, user)
+
+        etag = _version(*sorted(versions.items()))
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        loaders = {
+            'user': lambda: {'id': user.id, 'username': user.username, 'email': user.email},
+            'projects': _load_projects,
+            'tags': _load_tags,
+            'freelance': _load_freelance
+        }
+        known = _parse_versions(request.args.get('versions'))
+        result = {}
+        for section in sections:
+            if known.get(section) == versions[section]:
+                result[section] = {'version': versions[section], 'unchanged': True}
+                continue
+            if section == 'contacts':
+                # Already read along with the versions
+                data = {
+                    'unread': state['unread_contacts'],
+                    'total': state['live_contacts'],
+                    'latest_at': state['latest_contact_at'].isoformat() if state['latest_contact_at'] else None
+                }
+            else:
+                data = loaders[section]()
+            result[section] = {'version': versions[section], 'data': data}
+
+        response = jsonify({
+            'status': 'success',
+            'sections': result
+        })
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
@@ -0,0 +1,31 @@
+from flask import jsonify
+
+# Import the process-local cache, request coalescing and idempotent replay
+import cache
+import idempotency
+import singleflight
+# Import the blueprint
+from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+# Import authentication decorator
+from .auth import admin_required
+
+@api.route('/admin/cache/stats', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """Get cache, request coalescing and idempotent replay counters for this worker process."""
+    try:
+        return jsonify({
+            'status': 'success',
+            'cache': cache.stats(),
+            'singleflight': singleflight.stats(),
+            'idempotency': idempotency.stats()
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
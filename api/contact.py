@@ -1,40 +1,67 @@
-from flask import jsonify, request
-import sys
-import os
+from flask import current_app, jsonify, request
 from datetime import datetime
+from functools import wraps
 
-# Add parent directory to path to resolve imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-# Import db from the parent package
-from __init__ import db
+# Import the database extension
+from extensions import db
 # Import models from the parent package
 from models import Contact
+# Import the contact notification, spam filter, archival and change feed services
+from services import archival, changes, notifications, spam
 # Import the blueprint
 from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+# Import authentication decorator
+from .auth import admin_required
+# Import request validation
+from .validation import CONTACT_SCHEMA, rejection_stats, validate_json
+# Import Idempotency-Key replay for retried POSTs
+import idempotency
+
+SUCCESS_MESSAGE = 'Contact form submitted successfully'
+
+def client_ip():
+    """Address of the client, taking the proxy's X-Forwarded-For entry when trusted."""
+    if current_app.config['TRUST_PROXY']:
+        return request.access_route[-1]
+    return request.remote_addr
+
+def screen_spam(f):
+    """Decorator running the in-memory spam filter on the validated body.
+
+    It sits above idempotency.idempotent, so filtered submissions are
+    answered before the database is touched, Idempotency-Key claims included.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        reason = spam.get_filter(current_app).check(request.validated_data, client_ip())
+        if reason in spam.SILENT_REASONS:
+            # Look like success so bots do not adapt
+            return jsonify({
+                'status': 'success',
+                'message': SUCCESS_MESSAGE
+            })
+        if reason:
+            return jsonify({
+                'status': 'error',
+                'message': 'Too many submissions, please try again later'
+            }), 429
+        return f(*args, **kwargs)
+
+    return decorated_function
 
 @api.route('/contact', methods=['POST'])
+@validate_json(CONTACT_SCHEMA, max_bytes='CONTACT_MAX_BYTES')
+@screen_spam
+@idempotency.idempotent
 def submit_contact():
     """Submit a contact form."""
+    # Size and shape were checked before parsing and the spam filter has
+    # let the message through
+    data = request.validated_data
+    contact_filter = spam.get_filter(current_app)
     try:
-        # Get form data
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'status': 'error',
-                'message': 'No data provided'
-            }), 400
-        
-        # Validate required fields
-        required_fields = ['name', 'email', 'message']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Missing required field: {field}'
-                }), 400
-        
         # Create new contact
         new_contact = Contact(
             name=data['name'],
@@ -43,19 +70,120 @@ def submit_contact():
             created_at=datetime.utcnow(),
             read=False
         )
-        
-        # Save to database
+
+        # Save to database; the admin digest is sent later by a background job
         db.session.add(new_contact)
+        db.session.flush()
+        notifications.contact_created()
+        changes.record('contact.created', {
+            'id': new_contact.id,
+            'name': new_contact.name,
+            'email': new_contact.email
+        })
+        db.session.commit()
+        # Only a stored message makes later copies duplicates
+        contact_filter.record(data)
+
+        return jsonify({
+            'status': 'success',
+            'message': SUCCESS_MESSAGE
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        db.session.rollback()
+        # The client will retry; it must not count as a duplicate or a flood
+        contact_filter.release(data, client_ip())
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/contact/filter-stats', methods=['GET'])
+@admin_required
+def get_contact_filter_stats():
+    """Get spam filter and validation rejections by reason for this worker process."""
+    try:
+        return jsonify({
+            'status': 'success',
+            'counters': spam.get_filter(current_app).stats(),
+            'validation': rejection_stats('api.submit_contact')
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/contacts', methods=['GET'])
+@admin_required
+def get_contacts():
+    """Get live contact submissions, newest first (?limit=&offset=)."""
+    try:
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        offset = request.args.get('offset', 0, type=int)
+        contacts = (
+            Contact.query
+            .filter(Contact.deleted_at.is_(None))
+            .order_by(Contact.created_at.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+
+        result = []
+        for contact in contacts:
+            contact_data = {
+                'id': contact.id,
+                'name': contact.name,
+                'email': contact.email,
+                'message': contact.message,
+                'read': contact.read,
+                'created_at': contact.created_at.isoformat() if contact.created_at else None
+            }
+            result.append(contact_data)
+
+        return jsonify({
+            'status': 'success',
+            'contacts': result,
+            'count': len(result)
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/contacts/<int:contact_id>', methods=['DELETE'])
+@admin_required
+def delete_contact(contact_id):
+    """Delete a contact submission (soft delete; archived later)."""
+    try:
+        contact = Contact.query.get(contact_id)
+        if not contact or contact.deleted_at:
+            return jsonify({
+                'status': 'error',
+                'message': 'Contact not found'
+            }), 404
+
+        contact.deleted_at = datetime.utcnow()
+        archival.schedule()
+        changes.record('contact.deleted', {'id': contact.id})
         db.session.commit()
-        
+
         return jsonify({
             'status': 'success',
-            'message': 'Contact form submitted successfully'
+            'message': 'Contact deleted successfully'
         })
-    
+
     except Exception as e:
+        capture_exception(e)
         db.session.rollback()
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
@@ -0,0 +1,35 @@
+from flask import jsonify
+from datetime import date, datetime, timezone
+
+# Import the dashboard summary service
+from services import dashboard
+# Import the blueprint
+from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+# Import authentication decorator
+from .auth import admin_required
+
+@api.route('/admin/dashboard', methods=['GET'])
+@admin_required
+def get_dashboard():
+    """Get freelance revenue, unpaid/overdue totals and hours by client."""
+    try:
+        summary = dashboard.load_summary(date.today())
+
+        refreshed_at = summary.pop('refreshed_at')
+        age = (datetime.now(timezone.utc) - refreshed_at).total_seconds() if refreshed_at else None
+
+        return jsonify({
+            'status': 'success',
+            'dashboard': summary,
+            'refreshed_at': refreshed_at.isoformat() if refreshed_at else None,
+            'age_seconds': round(age, 1) if age is not None else None
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
@@ -0,0 +1,91 @@
+from flask import Response, current_app, jsonify, request
+
+# Import the change feed
+from services import changes
+# Import the blueprint
+from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+# Import authentication decorator
+from .auth import admin_required
+
+# Reconnect delay sent to clients; longer where a stream cannot stay open
+RETRY_MS = 3000
+SHORT_RETRY_MS = 10000
+
+@api.route('/admin/events', methods=['GET'])
+@admin_required
+def stream_admin_events():
+    """Stream project, contact and tag changes as server-sent events.
+
+    Send Last-Event-ID (or ?last_event_id=) to resume after a given event.
+    """
+    try:
+        after = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        if after is not None:
+            try:
+                after = int(after)
+            except ValueError:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Last-Event-ID must be an integer'
+                }), 400
+
+        subscription = changes.subscribe(after)
+        if subscription is None:
+            response = jsonify({
+                'status': 'error',
+                'message': 'Too many open event streams, please retry shortly'
+            })
+            response.headers['Retry-After'] = '10'
+            return response, 503
+        subscriber, position = subscription
+
+        try:
+            events = changes.backlog(after, position) if after is not None else []
+        except Exception:
+            changes.unsubscribe(subscriber)
+            raise
+
+        config = current_app.config
+        # A sync worker serves one request at a time: send what is pending and
+        # close, and let the client reconnect instead of holding the worker
+        long_lived = request.environ.get('wsgi.multithread', False)
+        response = Response(
+            changes.stream(
+                subscriber,
+                events,
+                config['CHANGES_STREAM_MAX_AGE'] if long_lived else 0,
+                config['CHANGES_KEEPALIVE'],
+                RETRY_MS if long_lived else SHORT_RETRY_MS
+            ),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        # Runs when the client disconnects or the stream ends
+        response.call_on_close(lambda: changes.unsubscribe(subscriber))
+        return response
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/events/stats', methods=['GET'])
+@admin_required
+def get_event_stream_stats():
+    """Get change feed counters for this worker process."""
+    try:
+        return jsonify({
+            'status': 'success',
+            'changes': changes.stats()
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
@@ -1,15 +1,20 @@
 from flask import jsonify
 from sqlalchemy import text
-import sys
-import os
 
-# Add parent directory to path to resolve imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-# Import db from the parent package
-from __init__ import db
+# Import the database extension
+from extensions import db
 # Import the blueprint
 from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+
+@api.route('/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe that answers without touching the database."""
+    return jsonify({
+        'status': 'success',
+        'message': 'API is running'
+    }), 200
 
 @api.route('/health', methods=['GET'])
 def health_check():
@@ -30,6 +35,7 @@ def health_check():
             'postgres_version': version_info
         }), 200
     except Exception as e:
+        capture_exception(e)
         return jsonify({
             'status': 'error',
             'message': f'Database connection failed: {str(e)}'
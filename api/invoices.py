@@ -0,0 +1,275 @@
+from flask import jsonify, request
+from datetime import date, timedelta
+from sqlalchemy.exc import IntegrityError
+
+# Import the database extension
+from extensions import db
+# Import models from the parent package
+from models import FreelanceProject, Invoice
+# Import the invoice generation service
+from services import dashboard, invoicing
+# Import the blueprint
+from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+# Import authentication decorator
+from .auth import admin_required
+# Import shared date parsing
+from .time_logs import parse_date
+# Import Idempotency-Key replay for retried POSTs
+import idempotency
+
+# Default payment term when no due date is given
+DEFAULT_PAYMENT_TERM_DAYS = 30
+
+def serialize_invoice(invoice):
+    """Convert an invoice to JSON format (amounts as exact decimal strings)."""
+    return {
+        'id': invoice.id,
+        'project_id': invoice.project_id,
+        'invoice_number': invoice.invoice_number,
+        'amount': str(invoice.amount),
+        'issue_date': invoice.issue_date.isoformat(),
+        'due_date': invoice.due_date.isoformat(),
+        'paid': invoice.paid,
+        'paid_date': invoice.paid_date.isoformat() if invoice.paid_date else None,
+        'period_start': invoice.period_start.isoformat() if invoice.period_start else None,
+        'period_end': invoice.period_end.isoformat() if invoice.period_end else None,
+        'notes': invoice.notes,
+        'created_at': invoice.created_at.isoformat() if invoice.created_at else None
+    }
+
+def parse_period(data):
+    """Read start/end/issue/due dates from a generation request, returning (dates, error)."""
+    start_date = parse_date(data.get('start_date'))
+    end_date = parse_date(data.get('end_date'))
+    if not start_date or not end_date:
+        return None, 'start_date and end_date are required (YYYY-MM-DD)'
+    if start_date > end_date:
+        return None, 'start_date must not be after end_date'
+
+    issue_date = parse_date(data['issue_date']) if data.get('issue_date') else date.today()
+    if not issue_date:
+        return None, 'Invalid issue_date, expected YYYY-MM-DD'
+
+    if data.get('due_date'):
+        due_date = parse_date(data['due_date'])
+        if not due_date:
+            return None, 'Invalid due_date, expected YYYY-MM-DD'
+    else:
+        due_date = issue_date + timedelta(days=DEFAULT_PAYMENT_TERM_DAYS)
+
+    return (start_date, end_date, issue_date, due_date), None
+
+@api.route('/admin/invoices', methods=['GET'])
+@admin_required
+def get_invoices():
+    """List invoices, optionally filtered by project and paid status."""
+    try:
+        query = Invoice.query
+
+        project_id = request.args.get('project_id', type=int)
+        if project_id is not None:
+            query = query.filter(Invoice.project_id == project_id)
+
+        paid = request.args.get('paid')
+        if paid is not None:
+            query = query.filter(Invoice.paid == (paid.lower() in ('1', 'true', 'yes')))
+
+        invoices = query.order_by(Invoice.issue_date.desc(), Invoice.id.desc()).all()
+
+        return jsonify({
+            'status': 'success',
+            'invoices': [serialize_invoice(invoice) for invoice in invoices],
+            'count': len(invoices)
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/invoices/generate', methods=['POST'])
+@admin_required
+@idempotency.idempotent
+def generate_invoice():
+    """Generate an invoice for one freelance project's hours in a date range."""
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'status': 'error',
+                'message': 'No data provided'
+            }), 400
+
+        project_id = data.get('project_id')
+        if not isinstance(project_id, int) or isinstance(project_id, bool):
+            return jsonify({
+                'status': 'error',
+                'message': 'project_id must be an integer'
+            }), 400
+
+        project = db.session.get(FreelanceProject, project_id)
+        if not project:
+            return jsonify({
+                'status': 'error',
+                'message': 'Freelance project not found'
+            }), 404
+
+        if project.hourly_rate is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Freelance project has no hourly rate'
+            }), 400
+
+        dates, error = parse_period(data)
+        if error:
+            return jsonify({
+                'status': 'error',
+                'message': error
+            }), 400
+
+        invoices, invoiced = invoicing.generate_invoices(*dates, project_ids=[project.id], notes=data.get('notes'))
+        if invoiced:
+            db.session.rollback()
+            return jsonify({
+                'status': 'error',
+                'message': 'Freelance project already has an invoice for part of this period'
+            }), 409
+        if not invoices:
+            return jsonify({
+                'status': 'error',
+                'message': 'No billable hours in this period'
+            }), 400
+
+        dashboard.request_refresh()
+        db.session.commit()
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Invoice generated successfully',
+            'invoice': serialize_invoice(invoices[0])
+        }), 201
+
+    except IntegrityError:
+        # A concurrent request invoiced the same period first
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': 'Freelance project already has an invoice for part of this period'
+        }), 409
+
+    except Exception as e:
+        capture_exception(e)
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/invoices/generate-batch', methods=['POST'])
+@admin_required
+@idempotency.idempotent
+def generate_invoice_batch():
+    """Generate invoices for every active freelance project in one transaction."""
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'status': 'error',
+                'message': 'No data provided'
+            }), 400
+
+        dates, error = parse_period(data)
+        if error:
+            return jsonify({
+                'status': 'error',
+                'message': error
+            }), 400
+
+        invoices, invoiced = invoicing.generate_invoices(*dates, active_only=True, notes=data.get('notes'))
+        dashboard.request_refresh()
+        db.session.commit()
+
+        return jsonify({
+            'status': 'success',
+            'message': f'{len(invoices)} invoice(s) generated successfully',
+            'invoices': [serialize_invoice(invoice) for invoice in invoices],
+            'count': len(invoices),
+            # Active projects left out: already invoiced for part of the period
+            'skipped_project_ids': invoiced
+        }), 201
+
+    except IntegrityError:
+        # A concurrent batch invoiced the same period first; retrying skips those
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': 'Another request generated invoices for this period; retry to skip them'
+        }), 409
+
+    except Exception as e:
+        capture_exception(e)
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/invoices/<int:invoice_id>', methods=['PUT'])
+@admin_required
+def update_invoice(invoice_id):
+    """Mark an invoice as paid or unpaid."""
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'status': 'error',
+                'message': 'No data provided'
+            }), 400
+
+        invoice = Invoice.query.get(invoice_id)
+        if not invoice:
+            return jsonify({
+                'status': 'error',
+                'message': 'Invoice not found'
+            }), 404
+
+        if 'paid' in data:
+            invoice.paid = bool(data['paid'])
+            if invoice.paid:
+                invoice.paid_date = parse_date(data.get('paid_date')) or date.today()
+            else:
+                invoice.paid_date = None
+        if 'due_date' in data:
+            due_date = parse_date(data['due_date'])
+            if not due_date:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Invalid due_date, expected YYYY-MM-DD'
+                }), 400
+            invoice.due_date = due_date
+        if 'notes' in data:
+            invoice.notes = data['notes']
+
+        dashboard.request_refresh()
+        db.session.commit()
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Invoice updated successfully',
+            'invoice': serialize_invoice(invoice)
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
@@ -0,0 +1,33 @@
+from flask import jsonify
+
+# Import the background job service
+from services import jobs
+# Import the blueprint
+from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+# Import authentication decorator
+from .auth import admin_required
+
+@api.route('/admin/jobs/stats', methods=['GET'])
+@admin_required
+def get_job_stats():
+    """Get background queue depth, latency and throughput."""
+    try:
+        worker = jobs.embedded_worker()
+
+        return jsonify({
+            'status': 'success',
+            'queue': jobs.queue_stats(),
+            'embedded_worker': {
+                'name': worker.name,
+                'stats': dict(worker.stats)
+            } if worker else None
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
@@ -1,50 +1,75 @@
 from flask import jsonify, request
-import sys
-import os
 
-# Add parent directory to path to resolve imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-# Import db from the parent package
-from __init__ import db
+# Import the database extension
+from extensions import db
 # Import models from the parent package
-from models import Project, Tag
+from models import Project, ProjectNeighbor, Tag
+# Import image response helpers
+from services.images import image_payload
 # Import the blueprint
 from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+# Import the process-local cache (admin writes invalidate it in every worker)
+import cache
+# Import request coalescing for cache misses
+import singleflight
+# Import buffered view counting
+from services import views
+
+def cached(namespace, key, load):
+    """Serve from the worker cache; concurrent misses for a key share one load()."""
+    return cache.get_or_load(namespace, key, lambda: singleflight.do((namespace, key), load))
+
+def serialize_projects(projects):
+    """Convert projects to the JSON format of the list endpoints."""
+    result = []
+    for project in projects:
+        project_data = {
+            'id': project.id,
+            'title': project.title,
+            'slug': project.slug,
+            'description': project.description,
+            'github': project.github,
+            'private': project.private,
+            'featured': project.featured,
+            'excerpt': project.content_excerpt,
+            'reading_time': project.reading_time,
+            'image_url': project.image_url,
+            'image': image_payload(project),
+            'tags': [tag.name for tag in project.tags]
+        }
+        result.append(project_data)
+    return result
 
 @api.route('/projects', methods=['GET'])
 def get_projects():
-    """Get all projects or filter by tag."""
+    """Get all projects or filter by tag, in the manual order; ?sort=popular orders by recent views."""
     try:
         # Check if tag filter is provided
         tag = request.args.get('tag')
-        
-        if tag:
-            # Filter projects by tag
-            projects = Project.query.join(Project.tags).filter(Tag.name == tag).all()
-        else:
-            # Get all projects
-            projects = Project.query.all()
-        
-        # Convert projects to JSON format
-        result = []
-        for project in projects:
-            project_data = {
-                'id': project.id,
-                'title': project.title,
-                'slug': project.slug,
-                'description': project.description,
-                'github': project.github,
-                'private': project.private,
-                'featured': project.featured,
-                'image_url': project.image_url,
-                'tags': [tag.name for tag in project.tags]
-            }
-            result.append(project_data)
-        
-        return jsonify(result)
-    
+        popular = request.args.get('sort') == 'popular'
+
+        def load():
+            if tag:
+                # Filter projects by tag
+                query = Project.query.join(Project.tags).filter(Tag.name == tag, Project.deleted_at.is_(None))
+            else:
+                # Get all projects
+                query = Project.query.filter(Project.deleted_at.is_(None))
+            if popular:
+                # Precomputed by services/views.py
+                query = query.order_by(Project.popularity.desc(), Project.id)
+            else:
+                # Set by the admin reorder endpoint, see services/ordering.py
+                query = query.order_by(Project.sort_key)
+            return serialize_projects(query.all())
+
+        key = f'tag={tag}' if tag else 'all'
+        return jsonify(cached('projects', f'{key}&sort=popular' if popular else key, load))
+
     except Exception as e:
+        capture_exception(e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -54,13 +79,35 @@ def get_projects():
 def get_featured_projects():
     """Get featured projects."""
     try:
-        # Get all featured projects
-        featured_projects = Project.query.filter_by(featured=True).all()
-        
-        # Convert projects to JSON format
-        result = []
-        for project in featured_projects:
-            project_data = {
+        def load():
+            # Get all featured projects
+            featured_projects = (
+                Project.query.filter_by(featured=True).filter(Project.deleted_at.is_(None))
+                .order_by(Project.sort_key).all()
+            )
+            return serialize_projects(featured_projects)
+
+        return jsonify(cached('projects', 'featured', load))
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/projects/<slug>', methods=['GET'])
+def get_project_by_slug(slug):
+    """Get a project by its slug."""
+    try:
+        def load():
+            # Find project by slug
+            project = Project.query.filter_by(slug=slug).filter(Project.deleted_at.is_(None)).first()
+            if not project:
+                return None
+
+            # Convert project to JSON format
+            return {
                 'id': project.id,
                 'title': project.title,
                 'slug': project.slug,
@@ -68,50 +115,64 @@ def get_featured_projects():
                 'github': project.github,
                 'private': project.private,
                 'featured': project.featured,
+                'content': project.content,
+                'content_html': project.content_html,
+                'toc': project.content_toc or [],
+                'excerpt': project.content_excerpt,
+                'reading_time': project.reading_time,
                 'image_url': project.image_url,
+                'image': image_payload(project),
                 'tags': [tag.name for tag in project.tags]
             }
-            result.append(project_data)
-        
-        return jsonify(result)
-    
+
+        project_data = cached('project', slug, load)
+        if not project_data:
+            return jsonify({
+                'status': 'error',
+                'message': 'Project not found'
+            }), 404
+
+        # Counted in memory and written in batches, not per request
+        views.record(project_data['id'])
+        return jsonify(project_data)
+
     except Exception as e:
+        capture_exception(e)
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 500
 
-@api.route('/projects/<slug>', methods=['GET'])
-def get_project_by_slug(slug):
-    """Get a project by its slug."""
+@api.route('/projects/<slug>/related', methods=['GET'])
+def get_related_projects(slug):
+    """Get the projects most similar to a project (precomputed by services/related.py)."""
     try:
-        # Find project by slug
-        project = Project.query.filter_by(slug=slug).first()
-        
-        if not project:
+        def load():
+            project = Project.query.filter_by(slug=slug).filter(Project.deleted_at.is_(None)).first()
+            if not project:
+                return None
+
+            related = (
+                Project.query
+                .join(ProjectNeighbor, ProjectNeighbor.neighbor_id == Project.id)
+                .filter(ProjectNeighbor.project_id == project.id, Project.deleted_at.is_(None))
+                .order_by(ProjectNeighbor.rank)
+                .all()
+            )
+            return serialize_projects(related)
+
+        related = cached('related', slug, load)
+        if related is None:
             return jsonify({
                 'status': 'error',
                 'message': 'Project not found'
             }), 404
-        
-        # Convert project to JSON format
-        project_data = {
-            'id': project.id,
-            'title': project.title,
-            'slug': project.slug,
-            'description': project.description,
-            'github': project.github,
-            'private': project.private,
-            'featured': project.featured,
-            'content': project.content,
-            'image_url': project.image_url,
-            'tags': [tag.name for tag in project.tags]
-        }
-        
-        return jsonify(project_data)
-    
+
+        return jsonify(related)
+
     except Exception as e:
+        capture_exception(e)
         return jsonify({
             'status': 'error',
             'message': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
@@ -0,0 +1,321 @@
+from flask import jsonify, request
+from datetime import date, datetime
+import math
+from sqlalchemy import insert, select
+
+# Import the database extension
+from extensions import db
+# Import models from the parent package
+from models import FreelanceProject, TimeLog
+# Import the rollup maintenance helpers
+from services import dashboard, time_rollups
+# Import the blueprint
+from api import api
+# Import error reporting for the request log
+from logging_config import capture_exception
+# Import authentication decorator
+from .auth import admin_required
+# Import Idempotency-Key replay for retried POSTs
+import idempotency
+
+# Upper bound for a single bulk submission
+MAX_BULK_ENTRIES = 1000
+
+def parse_date(value):
+    """Parse an ISO date string, returning None when invalid."""
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+def parse_entry(entry):
+    """Validate a time log payload and return (row, error)."""
+    if not isinstance(entry, dict):
+        return None, 'Each entry must be an object'
+
+    for field in ['project_id', 'date', 'hours']:
+        if entry.get(field) in (None, ''):
+            return None, f'Missing required field: {field}'
+
+    log_date = parse_date(entry['date'])
+    if log_date is None:
+        return None, 'Invalid date, expected YYYY-MM-DD'
+
+    try:
+        hours = float(entry['hours'])
+        project_id = int(entry['project_id'])
+    except (TypeError, ValueError):
+        return None, 'Invalid project_id or hours'
+
+    # float() accepts 'nan' and 'inf', which compare False against any bound
+    if not math.isfinite(hours) or hours <= 0 or hours > 24:
+        return None, 'Hours must be between 0 and 24'
+
+    return {
+        'project_id': project_id,
+        'date': log_date,
+        'hours': hours,
+        'description': entry.get('description')
+    }, None
+
+def serialize_time_log(log):
+    """Convert a time log to JSON format."""
+    return {
+        'id': log.id,
+        'project_id': log.project_id,
+        'date': log.date.isoformat(),
+        'hours': log.hours,
+        'description': log.description,
+        'created_at': log.created_at.isoformat() if log.created_at else None
+    }
+
+@api.route('/admin/time-logs', methods=['GET'])
+@admin_required
+def get_time_logs():
+    """List time logs, optionally filtered by project and date range."""
+    try:
+        query = TimeLog.query
+
+        project_id = request.args.get('project_id', type=int)
+        if project_id is not None:
+            query = query.filter(TimeLog.project_id == project_id)
+
+        start = parse_date(request.args.get('start'))
+        if start:
+            query = query.filter(TimeLog.date >= start)
+
+        end = parse_date(request.args.get('end'))
+        if end:
+            query = query.filter(TimeLog.date <= end)
+
+        limit = min(request.args.get('limit', 500, type=int), 5000)
+        logs = query.order_by(TimeLog.date.desc(), TimeLog.id.desc()).limit(limit).all()
+
+        return jsonify({
+            'status': 'success',
+            'time_logs': [serialize_time_log(log) for log in logs],
+            'count': len(logs)
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/time-logs', methods=['POST'])
+@admin_required
+@idempotency.idempotent
+def create_time_logs():
+    """Create one time log, or many at once via {"entries": [...]}."""
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'status': 'error',
+                'message': 'No data provided'
+            }), 400
+
+        entries = data.get('entries') if isinstance(data, dict) and 'entries' in data else data
+        if isinstance(entries, dict):
+            entries = [entries]
+        if not isinstance(entries, list) or not entries:
+            return jsonify({
+                'status': 'error',
+                'message': 'No entries provided'
+            }), 400
+        if len(entries) > MAX_BULK_ENTRIES:
+            return jsonify({
+                'status': 'error',
+                'message': f'At most {MAX_BULK_ENTRIES} entries can be submitted at once'
+            }), 413
+
+        rows = []
+        for index, entry in enumerate(entries):
+            row, error = parse_entry(entry)
+            if error:
+                return jsonify({
+                    'status': 'error',
+                    'message': f'Entry {index}: {error}'
+                }), 400
+            rows.append(row)
+
+        # Check all referenced projects with a single query
+        project_ids = {row['project_id'] for row in rows}
+        found = set(db.session.scalars(
+            select(FreelanceProject.id).where(FreelanceProject.id.in_(project_ids))
+        ))
+        missing = sorted(project_ids - found)
+        if missing:
+            return jsonify({
+                'status': 'error',
+                'message': f'Freelance project(s) not found: {missing}'
+            }), 404
+
+        now = datetime.utcnow()
+        for row in rows:
+            row['created_at'] = now
+
+        # One executemany for the logs and one for the rollups, in one transaction
+        new_ids = db.session.scalars(insert(TimeLog).returning(TimeLog.id), rows).all()
+        time_rollups.apply_deltas(
+            (row['project_id'], row['date'], row['hours'], 1) for row in rows
+        )
+        dashboard.request_refresh()
+        db.session.commit()
+
+        return jsonify({
+            'status': 'success',
+            'message': f'{len(new_ids)} time log(s) created successfully',
+            'ids': new_ids,
+            'count': len(new_ids)
+        }), 201
+
+    except Exception as e:
+        capture_exception(e)
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/time-logs/<int:log_id>', methods=['PUT'])
+@admin_required
+def update_time_log(log_id):
+    """Update a time log and move its hours between rollup buckets."""
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'status': 'error',
+                'message': 'No data provided'
+            }), 400
+
+        log = TimeLog.query.get(log_id)
+        if not log:
+            return jsonify({
+                'status': 'error',
+                'message': 'Time log not found'
+            }), 404
+
+        merged = {
+            'project_id': data.get('project_id', log.project_id),
+            'date': data.get('date', log.date),
+            'hours': data.get('hours', log.hours),
+            'description': data.get('description', log.description)
+        }
+        row, error = parse_entry(merged)
+        if error:
+            return jsonify({
+                'status': 'error',
+                'message': error
+            }), 400
+
+        if row['project_id'] != log.project_id and not FreelanceProject.query.get(row['project_id']):
+            return jsonify({
+                'status': 'error',
+                'message': 'Freelance project not found'
+            }), 404
+
+        time_rollups.apply_deltas([
+            (log.project_id, log.date, -log.hours, -1),
+            (row['project_id'], row['date'], row['hours'], 1)
+        ])
+
+        log.project_id = row['project_id']
+        log.date = row['date']
+        log.hours = row['hours']
+        log.description = row['description']
+        dashboard.request_refresh()
+        db.session.commit()
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Time log updated successfully',
+            'time_log': serialize_time_log(log)
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/time-logs/<int:log_id>', methods=['DELETE'])
+@admin_required
+def delete_time_log(log_id):
+    """Delete a time log."""
+    try:
+        log = TimeLog.query.get(log_id)
+        if not log:
+            return jsonify({
+                'status': 'error',
+                'message': 'Time log not found'
+            }), 404
+
+        time_rollups.apply_deltas([(log.project_id, log.date, -log.hours, -1)])
+        db.session.delete(log)
+        dashboard.request_refresh()
+        db.session.commit()
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Time log deleted successfully'
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        db.session.rollback()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api.route('/admin/time-logs/summary', methods=['GET'])
+@admin_required
+def get_time_log_summary():
+    """Get hours per project per day, week or month from the rollup table."""
+    try:
+        period = request.args.get('period', 'week')
+        if period not in time_rollups.PERIODS:
+            return jsonify({
+                'status': 'error',
+                'message': f'Invalid period, expected one of: {", ".join(time_rollups.PERIODS)}'
+            }), 400
+
+        rows = time_rollups.summarize(
+            period,
+            start=parse_date(request.args.get('start')),
+            end=parse_date(request.args.get('end')),
+            project_id=request.args.get('project_id', type=int)
+        )
+
+        result = []
+        for project_id, start, hours, entries in rows:
+            result.append({
+                'project_id': project_id,
+                'period_start': start.isoformat(),
+                'hours': float(hours),
+                'entries': entries
+            })
+
+        return jsonify({
+            'status': 'success',
+            'period': period,
+            'summary': result,
+            'total_hours': sum(item['hours'] for item in result)
+        })
+
+    except Exception as e:
+        capture_exception(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
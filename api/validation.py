@@ -0,0 +1,225 @@
+from collections import Counter
+from functools import wraps
+import re
+import threading
+
+from flask import current_app, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# Import the blueprint
+from api import api
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+$')
+
+TYPE_NAMES = {
+    str: 'a string',
+    bool: 'a boolean',
+    int: 'an integer',
+    float: 'a number',
+    list: 'a list',
+    dict: 'an object'
+}
+
+class Field:
+    """Declarative rule for one JSON field, compiled to a check function once."""
+
+    def __init__(self, kind, required=False, nullable=False, max_length=None,
+                 min_value=None, max_value=None, items=None, max_items=None, pattern=None):
+        self.kind = kind
+        self.required = required
+        self.nullable = nullable
+        self.max_length = max_length
+        self.min_value = min_value
+        self.max_value = max_value
+        self.items = items
+        self.max_items = max_items
+        self.pattern = pattern
+
+    def compile(self, name):
+        """Return check(value) -> error message or None."""
+        kind = self.kind
+        # bool is a subclass of int; numbers must not accept True/False
+        accepted = (int, float) if kind is float else kind
+        reject_bool = kind in (int, float)
+        nullable = self.nullable
+        max_length = self.max_length
+        min_value = self.min_value
+        max_value = self.max_value
+        max_items = self.max_items
+        pattern = self.pattern
+        item_check = self.items.compile(f'{name}[]') if self.items else None
+        type_error = f'Invalid field: {name} must be {TYPE_NAMES[kind]}'
+
+        def check(value):
+            if value is None:
+                return None if nullable else f'Invalid field: {name} must not be null'
+            if not isinstance(value, accepted) or (reject_bool and isinstance(value, bool)):
+                return type_error
+            if max_length is not None and len(value) > max_length:
+                return f'Invalid field: {name} must be at most {max_length} characters'
+            if pattern is not None and not pattern.match(value):
+                return f'Invalid field: {name} is not valid'
+            if min_value is not None and value < min_value:
+                return f'Invalid field: {name} must be at least {min_value}'
+            if max_value is not None and value > max_value:
+                return f'Invalid field: {name} must be at most {max_value}'
+            if max_items is not None and len(value) > max_items:
+                return f'Invalid field: {name} must have at most {max_items} items'
+            if item_check is not None:
+                for item in value:
+                    error = item_check(item)
+                    if error:
+                        return error
+            return None
+
+        return check
+
+class Schema:
+    """A set of Fields validated against a JSON object.
+
+    Unknown keys are left alone so clients can send extra data.
+    """
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self._required = tuple(name for name, field in fields.items() if field.required)
+        self._checks = tuple((name, field.compile(name)) for name, field in fields.items())
+
+    def validate(self, data):
+        """Return the first error message, or None when data is valid."""
+        for name in self._required:
+            # Required fields must also be non-empty, as the routes always checked
+            if data.get(name) in (None, '', []):
+                return f'Missing required field: {name}'
+        for name, check in self._checks:
+            if name in data:
+                error = check(data[name])
+                if error:
+                    return error
+        return None
+
+_rejections = Counter()
+_rejections_lock = threading.Lock()
+
+def _reject(reason, message, status_code):
+    with _rejections_lock:
+        _rejections[(request.endpoint, reason)] += 1
+    return jsonify({
+        'status': 'error',
+        'message': message
+    }), status_code
+
+def rejection_stats(endpoint=None):
+    """Validation rejections by reason, for one endpoint or per endpoint."""
+    with _rejections_lock:
+        items = list(_rejections.items())
+    if endpoint is not None:
+        return {reason: count for (name, reason), count in items if name == endpoint}
+    stats = {}
+    for (name, reason), count in items:
+        stats.setdefault(name, {})[reason] = count
+    return stats
+
+def validate_json(schema, max_bytes=None):
+    """Parse and validate the JSON body before the view runs.
+
+    max_bytes is a byte limit or the name of a config key holding one
+    (default MAX_CONTENT_LENGTH). Oversized bodies are rejected from the
+    Content-Length header without reading them; bodies without one are read
+    up to MAX_CONTENT_LENGTH. Place it above admin_required so junk never
+    reaches the user lookup. The view reads request.validated_data.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            limit = max_bytes if isinstance(max_bytes, int) else current_app.config[max_bytes or 'MAX_CONTENT_LENGTH']
+            if request.content_length is not None and request.content_length > limit:
+                return _reject('too_large', f'Request body too large (limit {limit} bytes)', 413)
+
+            if request.content_length == 0:
+                return _reject('missing', 'No data provided', 400)
+            if not request.is_json:
+                return _reject('not_json', 'Request body must be JSON (Content-Type: application/json)', 400)
+            data = request.get_json(silent=True)
+            if data is None:
+                return _reject('invalid_json', 'Request body must be valid JSON', 400)
+            if not isinstance(data, dict):
+                return _reject('not_object', 'Request body must be a JSON object', 400)
+            if not data:
+                return _reject('missing', 'No data provided', 400)
+
+            error = schema.validate(data)
+            if error:
+                return _reject('invalid', error, 400)
+
+            request.validated_data = data
+            return f(*args, **kwargs)
+
+        return decorated_function
+    return decorator
+
+@api.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    """Bodies without Content-Length that exceed MAX_CONTENT_LENGTH while read."""
+    return jsonify({
+        'status': 'error',
+        'message': f"Request body too large (limit {current_app.config['MAX_CONTENT_LENGTH']} bytes)"
+    }), 413
+
+# Schemas for the write routes, compiled once at import
+CONTACT_SCHEMA = Schema(
+    name=Field(str, required=True, max_length=100),
+    email=Field(str, required=True, max_length=120, pattern=EMAIL_RE),
+    message=Field(str, required=True, max_length=10000),
+    rendered_at=Field(float, nullable=True)
+)
+
+LOGIN_SCHEMA = Schema(
+    username=Field(str, required=True, max_length=64),
+    password=Field(str, required=True, max_length=128)
+)
+
+CREATE_ADMIN_SCHEMA = Schema(
+    username=Field(str, required=True, max_length=64),
+    email=Field(str, required=True, max_length=120, pattern=EMAIL_RE),
+    password=Field(str, required=True, max_length=128)
+)
+
+CHANGE_PASSWORD_SCHEMA = Schema(
+    current_password=Field(str, required=True, max_length=128),
+    new_password=Field(str, required=True, max_length=128)
+)
+
+_project_fields = {
+    'title': Field(str, max_length=100),
+    'slug': Field(str, max_length=100),
+    'description': Field(str, max_length=5000),
+    'github': Field(str, nullable=True, max_length=255),
+    'private': Field(bool),
+    'featured': Field(bool),
+    'content': Field(str, nullable=True, max_length=200000),
+    'image_url': Field(str, nullable=True, max_length=255),
+    'tags': Field(list, nullable=True, max_items=50, items=Field(str, max_length=50))
+}
+
+PROJECT_CREATE_SCHEMA = Schema(**{
+    **_project_fields,
+    'title': Field(str, required=True, max_length=100),
+    'description': Field(str, required=True, max_length=5000)
+})
+
+PROJECT_UPDATE_SCHEMA = Schema(**_project_fields)
+
+# Each move: {"id": ..., "after_id": ...} or {"id": ..., "before_id": ...}
+PROJECT_REORDER_SCHEMA = Schema(
+    moves=Field(list, required=True, max_items=200, items=Field(dict))
+)
+
+# Targets are "ids" or a "filter"; the route checks the keys of filter and set
+PROJECT_BULK_SCHEMA = Schema(
+    ids=Field(list, max_items=1000, items=Field(int)),
+    filter=Field(dict),
+    set=Field(dict),
+    add_tags=Field(list, max_items=50, items=Field(str, max_length=50)),
+    remove_tags=Field(list, max_items=50, items=Field(str, max_length=50))
+)
@@ -1,11 +1,8 @@
 import os
-import sys
-
-# Add the current directory to sys.path
-sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 # Import from local modules
-from __init__ import create_app, db
+from extensions import db
+from factory import create_app
 
 # Create Flask application instance
 app = create_app(os.getenv('FLASK_CONFIG') or 'default')
@@ -0,0 +1,157 @@
+"""
+Compare gunicorn worker classes against the public project endpoints.
+
+For every mode a gunicorn process is started with gunicorn.conf.py and
+GUNICORN_WORKER_CLASS set, then hammered by concurrent client threads for a
+fixed duration. With --sqlite a throwaway database is seeded from
+data/projects.json; otherwise DATABASE_URL must point at a populated database.
+
+Usage (from the repository root):
+    python -m benchmarks.gunicorn_modes --sqlite --duration 10 --clients 32
+    python -m benchmarks.gunicorn_modes --modes gthread gevent
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def seed_sqlite():
+    """Create a SQLite database holding the projects from data/projects.json."""
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+
+    from factory import create_app
+    from extensions import db
+    from models import Project, Tag
+    from services.ordering import spread_keys
+
+    app = create_app('development')
+    with open(os.path.join(ROOT, 'data', 'projects.json')) as f:
+        projects = json.load(f)
+
+    with app.app_context():
+        db.create_all()
+        tags = {}
+        for item, sort_key in zip(projects, spread_keys(len(projects))):
+            project = Project(
+                title=item['title'],
+                slug=item['slug'],
+                description=item['description'],
+                github=item.get('github'),
+                private=item.get('private', False),
+                featured=item.get('featured', False),
+                content=item.get('content'),
+                image_url=item.get('image_url'),
+                sort_key=sort_key
+            )
+            project.tags = [tags.setdefault(name, Tag(name=name)) for name in item.get('tags', [])]
+            db.session.add(project)
+        db.session.commit()
+    return [item['slug'] for item in projects]
+
+def wait_until_up(url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    raise RuntimeError(f'{url} did not come up within {timeout}s')
+
+def hammer(base_url, routes, clients, duration):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        local, failed, index = [], 0, offset
+        while time.monotonic() < deadline:
+            route = routes[index % len(routes)]
+            index += 1
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(base_url + route, timeout=10) as response:
+                    response.read()
+                local.append(time.perf_counter() - start)
+            except Exception:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+def run_mode(mode, routes, args):
+    port = free_port()
+    env = dict(os.environ, GUNICORN_WORKER_CLASS=mode, PORT=str(port))
+    if args.workers:
+        env['WEB_CONCURRENCY'] = str(args.workers)
+
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        wait_until_up(base_url + '/api/health/live')
+        hammer(base_url, routes, args.clients, 1.0)  # warm-up
+        latencies, errors = hammer(base_url, routes, args.clients, args.duration)
+    finally:
+        process.terminate()
+        process.wait()
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float('nan')
+
+    print(f'{mode:8} {len(latencies) / args.duration:9.1f} req/s  '
+          f'p50={pct(0.50):7.1f}ms  p95={pct(0.95):7.1f}ms  p99={pct(0.99):7.1f}ms  '
+          f'mean={statistics.fmean(latencies) * 1000 if latencies else float("nan"):7.1f}ms  errors={errors}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', default=['sync', 'gthread', 'gevent'])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, help='pin WEB_CONCURRENCY for a like-for-like comparison')
+    parser.add_argument('--sqlite', action='store_true', help='seed a temporary SQLite database')
+    parser.add_argument('--slug', action='append', default=[], help='project slug(s) to request')
+    args = parser.parse_args()
+
+    slugs = seed_sqlite() if args.sqlite else args.slug
+    routes = ['/api/projects', '/api/projects/featured'] + [f'/api/projects/{slug}' for slug in slugs[:5]]
+    os.environ.setdefault('FLASK_CONFIG', 'production')
+
+    for mode in args.modes:
+        if mode == 'gevent':
+            try:
+                import gevent  # noqa: F401
+            except ImportError:
+                print('gevent   skipped (gevent is not installed)')
+                continue
+        run_mode(mode, routes, args)
+
+if __name__ == '__main__':
+    main()
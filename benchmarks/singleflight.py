@@ -0,0 +1,104 @@
+"""
+Effect of request coalescing (singleflight.py) on a cold project cache.
+
+Seeds a temporary SQLite database, then fires bursts of concurrent
+identical requests at one endpoint from a thread pool, with the cache
+disabled so every burst is a cold start. Reports SQL statements per burst,
+latency and the coalescing counters, with SINGLEFLIGHT_ENABLED on and off.
+
+Usage (from the repository root):
+    python -m benchmarks.singleflight --threads 32 --bursts 20
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+
+def seed(db, count):
+    from sqlalchemy import insert
+    from models import Project, Tag, project_tags
+    from services.ordering import spread_keys
+
+    db.session.execute(insert(Tag), [{'id': i, 'name': f'tag-{i}'} for i in range(1, 21)])
+    db.session.execute(insert(Project), [
+        {'id': i, 'title': f'Project {i}', 'slug': f'project-{i}', 'description': 'Synthetic project ' * 10,
+         'featured': i % 10 == 0, 'private': False, 'content_excerpt': 'Excerpt ' * 20, 'reading_time': 3,
+         'sort_key': sort_key}
+        for i, sort_key in enumerate(spread_keys(count), start=1)
+    ])
+    db.session.execute(insert(project_tags), [
+        {'project_id': i, 'tag_id': t} for i in range(1, count + 1) for t in {i % 20 + 1, (i * 7) % 20 + 1}
+    ])
+    db.session.commit()
+
+def run(app, route, threads, bursts):
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    statements = 0
+    lock = threading.Lock()
+
+    def count(*args):
+        nonlocal statements
+        with lock:
+            statements += 1
+
+    def call():
+        started = time.perf_counter()
+        response = app.test_client().get(route)
+        assert response.status_code == 200, response.status_code
+        return time.perf_counter() - started
+
+    event.listen(Engine, 'before_cursor_execute', count)
+    latencies = []
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for _ in range(bursts):
+                latencies.extend(pool.map(lambda _: call(), range(threads)))
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count)
+    return statements / bursts, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--bursts', type=int, default=20)
+    parser.add_argument('--projects', type=int, default=300)
+    parser.add_argument('--route', default='/api/projects')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'singleflight.db')
+    os.environ['CACHE_ENABLED'] = 'false'
+    os.environ.setdefault('JOBS_EMBEDDED_WORKER', 'false')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    from factory import create_app
+    from extensions import db
+    import singleflight
+
+    app = create_app('development')
+    with app.app_context():
+        db.create_all()
+        seed(db, args.projects)
+
+    print(f'{args.route}: {args.bursts} bursts of {args.threads} concurrent requests, cache disabled')
+    for enabled in (False, True):
+        app.config['SINGLEFLIGHT_ENABLED'] = enabled
+        before = singleflight.stats()
+        per_burst, latencies = run(app, args.route, args.threads, args.bursts)
+        after = singleflight.stats()
+        latencies.sort()
+        print(
+            f"singleflight {'on ' if enabled else 'off'}  "
+            f'statements/burst {per_burst:7.1f}  '
+            f'p50 {statistics.median(latencies) * 1000:7.2f} ms  '
+            f'p95 {latencies[int(len(latencies) * 0.95)] * 1000:7.2f} ms  '
+            f"coalesced {after['coalesced'] - before['coalesced']}"
+        )
+
+if __name__ == '__main__':
+    main()
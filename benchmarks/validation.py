@@ -0,0 +1,98 @@
+"""
+Per-request overhead of the JSON validation layer (api/validation.py).
+
+Measures, inside a request context so Flask's own body handling is included:
+  schema          Schema.validate on an already parsed payload
+  decorated       validate_json + a no-op view, end to end
+  hand-written    get_json() plus the field checks the routes used to do
+  oversized       rejecting a body over the limit from Content-Length,
+                  against parsing it first and checking afterwards
+
+Usage (from the repository root):
+    python -m benchmarks.validation --iterations 20000
+"""
+import argparse
+import json
+import os
+import time
+
+
+CONTACT = {
+    'name': 'Ada Lovelace',
+    'email': 'ada@example.com',
+    'message': 'Hello! I would like to talk about a small freelance project. ' * 4
+}
+
+PROJECT = {
+    'title': 'E-Commerce Dashboard',
+    'description': 'Analytics dashboard for online retail stores.',
+    'github': 'https://github.com/example/dashboard',
+    'featured': True,
+    'content': '# Overview\n\n' + 'Some markdown content for the project page. ' * 200,
+    'tags': ['React', 'Node.js', 'MongoDB']
+}
+
+def per_call(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def hand_written(request):
+    data = request.get_json()
+    if not data:
+        return 400
+    for field in ['name', 'email', 'message']:
+        if not data.get(field):
+            return 400
+    return 200
+
+def parse_then_check(request, limit):
+    data = request.get_json()
+    return 413 if len(json.dumps(data)) > limit else 200
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', 'sqlite://')
+    from flask import request
+    from factory import create_app
+    from api.validation import CONTACT_SCHEMA, PROJECT_CREATE_SCHEMA, validate_json
+
+    app = create_app('development')
+    # The "parse then check" comparison needs the global cap out of the way
+    app.config['MAX_CONTENT_LENGTH'] = None
+    view = validate_json(CONTACT_SCHEMA, max_bytes=16 * 1024)(lambda: 200)
+    n = args.iterations
+
+    print(f'iterations={n} (microseconds per call)')
+    print(f'schema contact      {per_call(lambda: CONTACT_SCHEMA.validate(CONTACT), n):8.2f}')
+    print(f'schema project      {per_call(lambda: PROJECT_CREATE_SCHEMA.validate(PROJECT), n):8.2f}')
+
+    body = json.dumps(CONTACT)
+
+    def request_with(func, payload):
+        def run():
+            with app.test_request_context('/api/contact', method='POST', data=payload,
+                                          content_type='application/json'):
+                func()
+        return run
+
+    baseline = per_call(request_with(lambda: None, body), n)
+    decorated = per_call(request_with(view, body), n) - baseline
+    manual = per_call(request_with(lambda: hand_written(request), body), n) - baseline
+    print(f'decorated contact   {decorated:8.2f}  (over an empty request context)')
+    print(f'hand-written        {manual:8.2f}')
+
+    huge = json.dumps({**CONTACT, 'message': 'x' * 2 * 1024 * 1024})
+    m = max(n // 100, 10)
+    huge_baseline = per_call(request_with(lambda: None, huge), m)
+    rejected = per_call(request_with(view, huge), m) - huge_baseline
+    parsed = per_call(request_with(lambda: parse_then_check(request, 16 * 1024), huge), m) - huge_baseline
+    print(f'oversized rejected  {rejected:8.2f}  (2 MB body, Content-Length check)')
+    print(f'oversized parsed    {parsed:8.2f}  (2 MB body, parse then check)')
+
+if __name__ == '__main__':
+    main()
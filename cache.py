@@ -0,0 +1,366 @@
+"""
+Process-local read cache kept coherent across workers by an invalidation bus.
+
+Reads go through get_or_load(namespace, key, loader). Writers call
+invalidate(namespace, key) inside their transaction; the events of one
+transaction are coalesced and published when it commits, through CACHE_BUS:
+
+  postgres  a single pg_notify on the cache_invalidation channel; Postgres
+            delivers it only if the transaction commits
+  poll      a row in cache_events that every process polls for (SQLite and
+            tests, where the processes share the database file)
+  local     evict in this process only, for a single worker
+
+Each process runs a listener thread that evicts the named entries, merging
+whatever arrived together. While the listener is not connected (start-up, a
+lost connection, a gap in the polled sequence) the cache is bypassed, and it
+is cleared once the listener is back, so a process never serves an entry it
+may have missed an invalidation for.
+
+Events carry the origin() of the process that published them. Subscribers
+are told only about other processes' events unless they ask for their own;
+the tag index applies its own process's changes directly.
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import json
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+
+from sqlalchemy import delete, event, func, insert, text
+from sqlalchemy import select as sql_select
+from sqlalchemy.orm import Session
+
+# Import the database extension
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+MISS = object()
+# Event that clears every entry
+ALL = '*'
+CHANNEL = 'cache_invalidation'
+# pg_notify payloads are capped at 8000 bytes; larger batches become ALL
+MAX_PAYLOAD = 7900
+
+_origin = None
+_origin_pid = None
+
+def origin():
+    """Id of this process on the bus; a forked child gets its own."""
+    global _origin, _origin_pid
+    if _origin_pid != os.getpid():
+        _origin = uuid.uuid4().hex
+        _origin_pid = os.getpid()
+    return _origin
+
+def parse_event(name):
+    """'project:alpha' -> ('project', 'alpha'); 'projects' -> ('projects', None)."""
+    namespace, _, key = name.partition(':')
+    return namespace, key or None
+
+class LocalCache:
+    """Thread-safe LRU with a TTL as a safety net behind invalidation."""
+
+    def __init__(self, max_entries=1000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Bumped by every eviction; a value loaded across a bump is not stored
+        self.generation = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'events': 0, 'resyncs': 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None or entry[0] < time.monotonic():
+                self.stats['misses'] += 1
+                return MISS
+            self._entries.move_to_end((namespace, key))
+            self.stats['hits'] += 1
+            return entry[1]
+
+    def set(self, namespace, key, value, generation):
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self._entries[(namespace, key)] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def evict(self, events):
+        """Drop entries for (namespace, key) pairs; a None key drops the namespace."""
+        with self._lock:
+            self.generation += 1
+            before = len(self._entries)
+            for namespace, key in events:
+                if namespace == ALL:
+                    self._entries.clear()
+                elif key is None:
+                    for entry_key in [k for k in self._entries if k[0] == namespace]:
+                        del self._entries[entry_key]
+                else:
+                    self._entries.pop((namespace, key), None)
+            self.stats['evictions'] += before - len(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+class LocalBus:
+    """No cross-process delivery: the committing process evicts for itself."""
+
+    def __init__(self, config):
+        pass
+
+    def publish(self, connection, events):
+        pass
+
+    def listen(self, engine, on_events, on_connected, on_lost):
+        on_connected()
+
+class PostgresBus:
+    """LISTEN/NOTIFY on a dedicated connection outside the pool."""
+
+    def __init__(self, config):
+        self.keepalive = config['CACHE_KEEPALIVE']
+        self.coalesce_window = config['CACHE_COALESCE_WINDOW']
+
+    def publish(self, connection, events):
+        payload = json.dumps({'origin': origin(), 'events': events})
+        if len(payload) > MAX_PAYLOAD:
+            payload = json.dumps({'origin': origin(), 'events': [ALL]})
+        connection.execute(text('SELECT pg_notify(:channel, :payload)'), {'channel': CHANNEL, 'payload': payload})
+
+    def _connect(self, engine):
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        connection = engine.dialect.loaded_dbapi.connect(*cargs, **cparams)
+        connection.autocommit = True
+        return connection
+
+    def listen(self, engine, on_events, on_connected, on_lost):
+        backoff = 1.0
+        while True:
+            connection = None
+            try:
+                connection = self._connect(engine)
+                cursor = connection.cursor()
+                cursor.execute(f'LISTEN {CHANNEL}')
+                on_connected()
+                backoff = 1.0
+                while True:
+                    if select.select([connection], [], [], self.keepalive) == ([], [], []):
+                        # Nothing for a while: make sure the connection is still alive
+                        cursor.execute('SELECT 1')
+                        continue
+                    # Let a burst of commits arrive, then evict once for all of it
+                    time.sleep(self.coalesce_window)
+                    connection.poll()
+                    events, remote = set(), set()
+                    while connection.notifies:
+                        message = json.loads(connection.notifies.pop(0).payload)
+                        events.update(message['events'])
+                        if message['origin'] != origin():
+                            remote.update(message['events'])
+                    if events:
+                        on_events(events, remote)
+            except Exception as e:
+                logger.warning('Cache invalidation listener lost its connection: %s', e)
+                on_lost()
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+class PollBus:
+    """Poll the cache_events table; ids are contiguous, so a skipped id is a gap.
+
+    A gap means events were pruned before this process read them, or a
+    later id committed before an earlier one, which may never be read.
+    Either way the listener counts as lost, so the cache is flushed.
+    """
+
+    def __init__(self, config):
+        self.interval = config['CACHE_POLL_INTERVAL']
+        self.retention = timedelta(minutes=10)
+
+    def publish(self, connection, events):
+        from models import CacheEvent
+        connection.execute(insert(CacheEvent).values(events=events, origin=origin(), created_at=datetime.utcnow()))
+
+    def listen(self, engine, on_events, on_connected, on_lost):
+        from models import CacheEvent
+        last_id = None
+        last_prune = time.monotonic()
+        while True:
+            try:
+                with engine.connect() as connection:
+                    if last_id is None:
+                        last_id = connection.execute(sql_select(func.max(CacheEvent.id))).scalar() or 0
+                        on_connected()
+                    rows = connection.execute(
+                        sql_select(CacheEvent.id, CacheEvent.events, CacheEvent.origin)
+                        .where(CacheEvent.id > last_id)
+                        .order_by(CacheEvent.id)
+                        .limit(1000)
+                    ).all()
+                    events, remote = set(), set()
+                    for row in rows:
+                        if row.id != last_id + 1:
+                            raise LookupError(f'cache event gap after id {last_id}')
+                        events.update(row.events)
+                        if row.origin != origin():
+                            remote.update(row.events)
+                        last_id = row.id
+                    if events:
+                        on_events(events, remote)
+
+                    if time.monotonic() - last_prune > 60:
+                        connection.execute(delete(CacheEvent).where(CacheEvent.created_at < datetime.utcnow() - self.retention))
+                        connection.commit()
+                        last_prune = time.monotonic()
+            except Exception as e:
+                logger.warning('Cache invalidation poll failed: %s', e)
+                on_lost()
+                last_id = None
+            time.sleep(self.interval)
+
+# Selected with CACHE_BUS ('auto' picks postgres or poll from the database URL)
+BUSES = {
+    'local': LocalBus,
+    'postgres': PostgresBus,
+    'poll': PollBus
+}
+
+_cache = LocalCache()
+_bus = None
+_subscribers = []
+_connected = threading.Event()
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+def init_app(app):
+    """Pick the invalidation bus and hook publishing into session commits."""
+    global _bus
+    if not app.config.get('CACHE_ENABLED'):
+        return
+
+    name = app.config['CACHE_BUS']
+    if name == 'auto':
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+        name = 'postgres' if uri.startswith('postgresql') else 'poll'
+    if _bus is None:
+        event.listen(Session, 'before_commit', _before_commit)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+    _bus = BUSES[name](app.config)
+    _cache.max_entries = app.config['CACHE_MAX_ENTRIES']
+    _cache.ttl = app.config['CACHE_TTL']
+
+def subscribe(callback, own_events=False):
+    """Call callback(events) after evictions; events contains ALL after a resync.
+
+    Events published by this process are left out unless own_events is set.
+    """
+    _subscribers.append((callback, own_events))
+
+def _ready():
+    if _bus is None:
+        return False
+    # Threads do not survive a fork, so each process starts its own listener
+    if _listener_pid != os.getpid():
+        _start_listener()
+    return _connected.is_set()
+
+def _start_listener():
+    global _listener_pid
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        _connected.clear()
+        _cache.evict([(ALL, None)])
+        threading.Thread(
+            target=_bus.listen,
+            args=(db.engine, _apply, _on_connected, _on_lost),
+            name='cache-listener',
+            daemon=True
+        ).start()
+        _listener_pid = os.getpid()
+
+def _notify_subscribers(events, remote):
+    for callback, own_events in _subscribers:
+        delivered = events if own_events else remote
+        if not delivered:
+            continue
+        try:
+            callback(delivered)
+        except Exception:
+            logger.exception('Cache invalidation subscriber failed')
+
+def _apply(events, remote):
+    """Evict events; remote is the part published by other processes."""
+    _cache.evict([parse_event(name) for name in events])
+    _cache.stats['events'] += len(events)
+    _notify_subscribers(events, remote)
+
+def _resync():
+    _cache.evict([(ALL, None)])
+    _cache.stats['resyncs'] += 1
+    _notify_subscribers({ALL}, {ALL})
+
+def _on_connected():
+    # Anything cached before now may have missed an event
+    _resync()
+    _connected.set()
+
+def _on_lost():
+    _connected.clear()
+    _resync()
+
+def get_or_load(namespace, key, loader):
+    """Cached value for (namespace, key), calling loader() on a miss."""
+    if not _ready():
+        return loader()
+    value = _cache.get(namespace, key)
+    if value is MISS:
+        generation = _cache.generation
+        value = loader()
+        _cache.set(namespace, key, value, generation)
+    return value
+
+def invalidate(namespace, key=None):
+    """Evict (namespace, key) everywhere once the current transaction commits.
+
+    Without a key the whole namespace goes; namespace ALL clears everything.
+    """
+    if _bus is None:
+        return
+    name = namespace if key is None else f'{namespace}:{key}'
+    db.session.info.setdefault('cache_events', set()).add(name)
+
+def stats():
+    return dict(_cache.stats, entries=len(_cache), connected=_connected.is_set(),
+                bus=type(_bus).__name__ if _bus else None)
+
+def _before_commit(session):
+    events = session.info.get('cache_events')
+    if events and _bus is not None:
+        _bus.publish(session.connection(), sorted(events))
+
+def _after_commit(session):
+    events = session.info.pop('cache_events', None)
+    if events:
+        # Other processes hear about it from the bus; this one evicts right away
+        _apply(events, set())
+
+def _after_rollback(session):
+    session.info.pop('cache_events', None)
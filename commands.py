@@ -0,0 +1,110 @@
+import click
+import os
+
+def register_commands(app):
+    """Register maintenance CLI commands on the Flask application."""
+
+    @app.cli.command('rebuild-rollups')
+    def rebuild_rollups_command():
+        """Recompute the time log rollup table from scratch."""
+        from services.time_rollups import rebuild_rollups
+
+        groups = rebuild_rollups()
+        click.echo(f'Rebuilt rollups from {groups} project/day group(s).')
+
+    @app.cli.command('render-projects')
+    @click.option('--workers', type=int, default=os.cpu_count(), show_default=True,
+                  help='Size of the rendering process pool.')
+    @click.option('--force', is_flag=True, help='Re-render even when the content hash is unchanged.')
+    def render_projects_command(workers, force):
+        """Pre-render the markdown content of all projects."""
+        from concurrent.futures import ProcessPoolExecutor
+        from sqlalchemy import select, update
+        from extensions import db
+        from models import Project
+        from services.rendering import content_hash, render_markdown
+        import cache
+
+        rows = db.session.execute(
+            select(Project.id, Project.content, Project.content_hash, Project.updated_at)
+        ).all()
+        todo = [row for row in rows if force or row.content_hash != content_hash(row.content)]
+        if not todo:
+            click.echo('All projects are already rendered.')
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(render_markdown, [row.content for row in todo], chunksize=8))
+
+        # Keep updated_at as is: re-rendering is not an edit
+        db.session.execute(update(Project), [
+            dict(result, id=row.id, updated_at=row.updated_at)
+            for row, result in zip(todo, rendered)
+        ])
+        cache.invalidate(cache.ALL)
+        db.session.commit()
+        click.echo(f'Rendered {len(todo)} of {len(rows)} project(s) with {workers} worker(s).')
+
+    @app.cli.command('process-images')
+    @click.option('--force', is_flag=True, help='Re-encode even when the image hash is unchanged.')
+    def process_images_command(force):
+        """Build responsive variants for every project with a local image."""
+        from extensions import db
+        from models import Project
+        from services.images import process_project_image
+        import cache
+
+        projects = Project.query.filter(Project.image_url.isnot(None)).all()
+        processed = 0
+        for project in projects:
+            if process_project_image(project, app.config, force=force):
+                processed += 1
+        if processed:
+            cache.invalidate(cache.ALL)
+        db.session.commit()
+        click.echo(f'Processed {processed} of {len(projects)} project image(s).')
+
+    @app.cli.command('jobs-worker')
+    @click.option('--concurrency', type=int, default=4, show_default=True,
+                  help='Jobs run in parallel by this worker.')
+    @click.option('--types', default='', help='Comma-separated job types to run (default: all).')
+    @click.option('--poll-interval', type=float, default=1.0, show_default=True)
+    def jobs_worker_command(concurrency, types, poll_interval):
+        """Run a background job worker until interrupted."""
+        from services.jobs import Worker, load_job_modules
+
+        registry = load_job_modules()
+        job_types = [name.strip() for name in types.split(',') if name.strip()] or None
+        worker = Worker(app, concurrency=concurrency, job_types=job_types, poll_interval=poll_interval)
+        click.echo(f'Worker {worker.name} running {", ".join(job_types or sorted(registry))}')
+        try:
+            worker.run()
+        except KeyboardInterrupt:
+            worker.stop()
+        click.echo(f'Worker stopped: {worker.stats}')
+
+    @app.cli.command('archive')
+    @click.option('--schedule', is_flag=True, help='Also queue the recurring archive job.')
+    def archive_command(schedule):
+        """Move old contacts and long-deleted projects into the archive tables."""
+        from extensions import db
+        from services import archival
+
+        result = archival.archive(max_batches=None)
+        if schedule:
+            archival.schedule()
+            db.session.commit()
+        click.echo(
+            f"Archived {result['contacts']} contact(s) and {result['projects']} project(s); "
+            f"pruned {result['changes']} change event(s) and {result['idempotency_keys']} idempotency key(s)."
+        )
+
+    @app.cli.command('rebuild-related')
+    def rebuild_related_command():
+        """Recompute the related projects of every project."""
+        from extensions import db
+        from services.related import rebuild_all
+
+        count = rebuild_all()
+        db.session.commit()
+        click.echo(f'Rebuilt related projects for {count} project(s).')
@@ -0,0 +1,14 @@
+from flask_sqlalchemy import SQLAlchemy
+
+# Initialize extensions
+db = SQLAlchemy()
+
+def init_migrations(app):
+    """Attach Flask-Migrate to the app.
+
+    Alembic is only needed by the `flask db` commands, so it is imported here
+    instead of at module level to keep it out of web worker start-up.
+    """
+    from flask_migrate import Migrate
+
+    return Migrate(app, db)
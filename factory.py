@@ -0,0 +1,70 @@
+from flask import Flask
+from flask_cors import CORS
+import os
+
+from extensions import db, init_migrations
+
+def create_app(config_name=None, enable_migrations=None):
+    """Create and configure the Flask application.
+
+    Nothing here opens a database connection, so the app can be built once in
+    a gunicorn master (preload_app) and shared by forked workers. Migrations
+    are only wired up under the `flask` CLI unless enable_migrations is given.
+    """
+    app = Flask(__name__)
+    
+    # Determine the configuration to use
+    if config_name is None:
+        config_name = os.environ.get('FLASK_CONFIG', 'default')
+    
+    # Import config at runtime to avoid circular imports
+    from config import config
+    
+    # Apply configuration
+    app.config.from_object(config[config_name])
+    
+    # Structured request and error logging
+    from logging_config import configure_logging
+    configure_logging(app)
+    
+    # Request and SQL tracing (no-op unless TRACING_ENABLED)
+    import tracing
+    tracing.init_app(app)
+    
+    # Initialize extensions with app
+    db.init_app(app)
+    if enable_migrations is None:
+        enable_migrations = os.environ.get('FLASK_RUN_FROM_CLI') == 'true'
+    if enable_migrations:
+        init_migrations(app)
+    
+    # Process-local cache with cross-worker invalidation
+    import cache
+    cache.init_app(app)
+    
+    # Configure CORS to allow requests from frontend
+    CORS(app, resources={r"/api/*": {"origins": [
+        "http://localhost:3000",  # Your public site
+        "http://localhost:3001",  # Admin dashboard dev
+        "https://portfolio-website-frontend.onrender.com",  # Public site production
+        "https://admin-yourname.vercel.app",  # Admin dashboard production
+        "https://schonenberg.dev"  # Your custom domain
+    ]}})
+    
+    # Register blueprints
+    register_blueprints(app)
+    
+    # Start the in-process job worker if configured
+    from services import jobs
+    jobs.init_app(app)
+    
+    # Register CLI commands
+    from commands import register_commands
+    register_commands(app)
+    
+    return app
+
+def register_blueprints(app):
+    """Register every blueprint explicitly, public and admin routes alike."""
+    from api import api as api_blueprint
+    app.register_blueprint(api_blueprint, url_prefix='/api')
@@ -0,0 +1,156 @@
+"""
+Gunicorn settings sized from the machine the process runs on.
+
+Environment knobs:
+    GUNICORN_WORKER_CLASS   sync | gthread (default) | gevent
+    WEB_CONCURRENCY         fixed number of workers (skips autotuning)
+    GUNICORN_THREADS        threads per gthread worker (default 4)
+    GUNICORN_CONNECTIONS    concurrent greenlets per gevent worker (default 200)
+    WORKER_MEMORY_MB        expected resident size of one worker (default 120)
+    PORT                    port to bind (Render sets this)
+"""
+import logging
+import multiprocessing
+import os
+
+logger = logging.getLogger('gunicorn.error')
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def _cpu_count():
+    """CPUs this process may run on, honouring affinity and cgroup quotas."""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = multiprocessing.cpu_count()
+
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            count = min(count, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return count
+
+def _available_memory_mb():
+    """Memory available to this container in MB, or None when unknown."""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if value != 'max' and int(value) < 1 << 50:
+                return int(value) // (1024 * 1024)
+        except (OSError, ValueError):
+            continue
+
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _autotune_workers(worker_class, cpus, memory_mb, worker_memory_mb):
+    # Sync workers serve one request at a time, so they need more processes;
+    # thread and greenlet workers get their concurrency inside each process.
+    if worker_class == 'sync':
+        wanted = cpus * 2 + 1
+    else:
+        wanted = cpus + 1
+
+    if memory_mb:
+        # Leave a quarter of the memory for the master, page cache and spikes
+        wanted = min(wanted, int(memory_mb * 0.75) // worker_memory_mb)
+    return max(1, wanted)
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class not in ('sync', 'gthread', 'gevent'):
+    raise RuntimeError(f'Unsupported GUNICORN_WORKER_CLASS: {worker_class}')
+if worker_class == 'gevent':
+    # Fail at boot with a clear message rather than in every worker
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        raise RuntimeError(
+            'GUNICORN_WORKER_CLASS=gevent needs gevent and psycogreen (see requirements.txt): '
+            'pip install gevent psycogreen'
+        ) from None
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+if 'WEB_CONCURRENCY' in os.environ:
+    workers = _env_int('WEB_CONCURRENCY', 2)
+else:
+    workers = _autotune_workers(
+        worker_class,
+        _cpu_count(),
+        _available_memory_mb(),
+        _env_int('WORKER_MEMORY_MB', 120)
+    )
+
+threads = _env_int('GUNICORN_THREADS', 4) if worker_class == 'gthread' else 1
+worker_connections = _env_int('GUNICORN_CONNECTIONS', 200)
+
+# Build the app once in the master so workers fork with it already imported.
+# gevent has to monkey-patch before the app imports socket/threading, so it
+# loads the app in each worker instead.
+preload_app = worker_class != 'gevent'
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = 30
+# Render's proxy keeps connections open; match it instead of gunicorn's 2s default
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# Recycle workers now and then to cap slow memory growth, staggered so they
+# never restart all at once
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = max_requests // 10
+
+errorlog = '-'
+
+def when_ready(server):
+    logger.info('Serving with %s workers x %s threads (%s)', workers, threads, worker_class)
+
+def post_fork(server, worker):
+    """Make each worker open its own database connections."""
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            logger.warning('psycogreen is not installed; psycopg2 calls will block the gevent loop')
+
+    if not server.cfg.preload_app:
+        return
+
+    from extensions import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        # Pooled connections inherited from the master must not be shared
+        # across processes; drop them without closing the master's sockets.
+        db.engine.dispose(close=False)
+
+def worker_exit(server, worker):
+    """Write the view counts still buffered in a stopping or recycled worker."""
+    from services import views
+
+    app = server.app.wsgi()
+    with app.app_context():
+        try:
+            views.flush()
+        except Exception:
+            logger.exception('Could not flush buffered project views')
+
+def post_worker_init(worker):
+    """Build the in-memory tag autocomplete index as the worker starts."""
+    from services import tag_index
+
+    tag_index.warm(worker.wsgi)
@@ -0,0 +1,284 @@
+"""
+Idempotency-Key support for POST routes.
+
+A client that may retry a POST sends an Idempotency-Key header. The first
+request with a key claims it and runs; its response (unless it is a 5xx) is
+stored for IDEMPOTENCY_TTL seconds and replayed, marked with
+Idempotent-Replayed: true, to any retry with the same key, route and body.
+A retry that arrives while the first request is still running waits for
+it, up to IDEMPOTENCY_WAIT_TIMEOUT seconds, then gets a 409. Reusing a key
+for a different body gets a 422. Keys are scoped by endpoint and admin user,
+or by endpoint and client address on public routes, so two anonymous
+clients that pick the same key never see each other's responses.
+
+The database store claims a key with INSERT ... ON CONFLICT DO NOTHING on
+its own connection, so the claim is visible to every worker before the
+handler starts. Waiting uses an in-process event when the first request
+runs in the same process, and polling otherwise. A claim whose request died
+unfinished is taken over after IDEMPOTENCY_LOCK_TIMEOUT seconds. The memory
+store (IDEMPOTENCY_STORE=memory) keeps the same records in a dict, for tests
+and single-process setups.
+"""
+from datetime import datetime, timedelta
+from functools import wraps
+import hashlib
+import logging
+import threading
+import time
+
+from flask import current_app, jsonify, make_response, request
+from sqlalchemy import delete, select, update
+
+# Import the database extension
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+# Polling backoff while another worker runs the first request
+POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 0.5
+
+def _takeover_allowed(record, request_hash, now, lock_timeout):
+    if record['expires_at'] <= now:
+        return True
+    # The first request died without finishing or releasing its claim
+    return (record['status_code'] is None and record['request_hash'] == request_hash
+            and record['created_at'] <= now - lock_timeout)
+
+class DatabaseStore:
+    """Records in the idempotency_keys table, each change in its own transaction."""
+
+    def _insert(self, connection):
+        if connection.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert
+
+    def claim(self, scope, key, request_hash, now, ttl, lock_timeout):
+        """None when this request now owns the key, else the existing record."""
+        from models import IdempotencyKey
+
+        where = (IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        values = {
+            'request_hash': request_hash,
+            'status_code': None,
+            'content_type': None,
+            'body': None,
+            'created_at': now,
+            'expires_at': now + ttl
+        }
+        with db.engine.begin() as connection:
+            insert = self._insert(connection)(IdempotencyKey).values(scope=scope, key=key, **values)
+            if connection.execute(insert.on_conflict_do_nothing(index_elements=['scope', 'key'])).rowcount:
+                return None
+            record = connection.execute(
+                select(IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.content_type,
+                       IdempotencyKey.body, IdempotencyKey.created_at, IdempotencyKey.expires_at)
+                .where(*where)
+            ).mappings().first()
+            if record is None:
+                # Released between the insert and the read; claim on the next attempt
+                return {'request_hash': request_hash, 'status_code': None}
+            if _takeover_allowed(record, request_hash, now, lock_timeout):
+                taken = connection.execute(
+                    update(IdempotencyKey)
+                    .where(*where, IdempotencyKey.created_at == record['created_at'])
+                    .values(**values)
+                ).rowcount
+                if taken:
+                    return None
+            return dict(record)
+
+    def complete(self, scope, key, status_code, content_type, body):
+        from models import IdempotencyKey
+
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+                .values(status_code=status_code, content_type=content_type, body=body)
+            )
+
+    def release(self, scope, key):
+        from models import IdempotencyKey
+
+        with db.engine.begin() as connection:
+            connection.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.scope == scope, IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)
+            ))
+
+    def prune(self, now):
+        from models import IdempotencyKey
+
+        with db.engine.begin() as connection:
+            return connection.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < now)).rowcount
+
+class MemoryStore:
+    """The same records in a dict; only requests in this process see them."""
+
+    def __init__(self):
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def claim(self, scope, key, request_hash, now, ttl, lock_timeout):
+        with self._lock:
+            record = self._records.get((scope, key))
+            if record is None or _takeover_allowed(record, request_hash, now, lock_timeout):
+                self._records[(scope, key)] = {
+                    'request_hash': request_hash,
+                    'status_code': None,
+                    'content_type': None,
+                    'body': None,
+                    'created_at': now,
+                    'expires_at': now + ttl
+                }
+                return None
+            return dict(record)
+
+    def complete(self, scope, key, status_code, content_type, body):
+        with self._lock:
+            record = self._records.get((scope, key))
+            if record is not None:
+                record.update(status_code=status_code, content_type=content_type, body=body)
+
+    def release(self, scope, key):
+        with self._lock:
+            record = self._records.get((scope, key))
+            if record is not None and record['status_code'] is None:
+                del self._records[(scope, key)]
+
+    def prune(self, now):
+        with self._lock:
+            expired = [item for item, record in self._records.items() if record['expires_at'] < now]
+            for item in expired:
+                del self._records[item]
+            return len(expired)
+
+# Selected with IDEMPOTENCY_STORE
+STORES = {
+    'database': DatabaseStore,
+    'memory': MemoryStore
+}
+
+# Requests running in this process, so duplicates here can wait without polling
+_running = {}
+_running_lock = threading.Lock()
+_stats = {'claimed': 0, 'replayed': 0, 'waited': 0, 'in_progress': 0, 'mismatched': 0}
+
+def get_store(app):
+    store = app.extensions.get('idempotency')
+    if store is None:
+        store = app.extensions['idempotency'] = STORES[app.config['IDEMPOTENCY_STORE']]()
+    return store
+
+def prune(now=None):
+    """Delete expired records; returns how many."""
+    return get_store(current_app).prune(now or datetime.utcnow())
+
+def stats():
+    return dict(_stats)
+
+def _scope():
+    user = getattr(request, 'current_user', None)
+    if user is not None:
+        return f'{request.endpoint}:{user.id}'
+    # Hashed, so the table holds no client addresses
+    address = request.access_route[-1] if current_app.config['TRUST_PROXY'] else request.remote_addr
+    return f"{request.endpoint}:client:{hashlib.sha256((address or '').encode()).hexdigest()[:32]}"
+
+def _replay(record):
+    response = current_app.response_class(record['body'], status=record['status_code'],
+                                          content_type=record['content_type'])
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def idempotent(f):
+    """Decorator to honour an Idempotency-Key header.
+
+    Place it last, below validate_json and admin_required (and any spam
+    check), so rejected requests never read the body here or claim a key.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return f(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({
+                'status': 'error',
+                'message': f'Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters'
+            }), 400
+
+        config = current_app.config
+        store = get_store(current_app)
+        scope = _scope()
+        digest = hashlib.sha256(f'{request.method} {request.full_path}\n'.encode())
+        digest.update(request.get_data())
+        request_hash = digest.hexdigest()
+        ttl = timedelta(seconds=config['IDEMPOTENCY_TTL'])
+        lock_timeout = timedelta(seconds=config['IDEMPOTENCY_LOCK_TIMEOUT'])
+
+        deadline = time.monotonic() + config['IDEMPOTENCY_WAIT_TIMEOUT']
+        delay = POLL_INTERVAL
+        waited = False
+        while True:
+            record = store.claim(scope, key, request_hash, datetime.utcnow(), ttl, lock_timeout)
+            if record is None:
+                break
+            if record['request_hash'] != request_hash:
+                _stats['mismatched'] += 1
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Idempotency-Key was already used for a different request'
+                }), 422
+            if record['status_code'] is not None:
+                _stats['replayed'] += 1
+                return _replay(record)
+
+            # The first request with this key is still running
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _stats['in_progress'] += 1
+                response = jsonify({
+                    'status': 'error',
+                    'message': 'A request with this Idempotency-Key is still in progress'
+                })
+                response.headers['Retry-After'] = '1'
+                return response, 409
+            if not waited:
+                _stats['waited'] += 1
+                waited = True
+            with _running_lock:
+                running = _running.get((scope, key))
+            if running is not None:
+                running.wait(min(remaining, MAX_POLL_INTERVAL))
+            else:
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, MAX_POLL_INTERVAL)
+
+        _stats['claimed'] += 1
+        done = threading.Event()
+        with _running_lock:
+            _running[(scope, key)] = done
+        try:
+            response = make_response(f(*args, **kwargs))
+            try:
+                if response.status_code >= 500 or response.is_streamed:
+                    # Let a retry run the request again
+                    store.release(scope, key)
+                else:
+                    store.complete(scope, key, response.status_code, response.content_type, response.get_data())
+            except Exception:
+                logger.exception('Could not store the response for an Idempotency-Key')
+            return response
+        except Exception:
+            store.release(scope, key)
+            raise
+        finally:
+            with _running_lock:
+                _running.pop((scope, key), None)
+            done.set()
+
+    return decorated_function
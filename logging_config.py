@@ -0,0 +1,174 @@
+"""
+Structured logging for the API.
+
+Every request gets an id (X-Request-ID is honoured and echoed back) and one
+JSON access line with route, status, latency and time spent in SQL. Records
+are handed to a queue on the request thread and formatted and written by a
+listener thread, so log I/O never blocks a request. Successful requests can
+be sampled per endpoint; 4xx and 5xx are always logged, 5xx with the
+traceback recorded by capture_exception().
+"""
+from datetime import datetime, timezone
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Attributes every LogRecord has; anything else was passed via extra=
+RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['traceback'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class AsyncHandler(logging.handlers.QueueHandler):
+    """Queue handler whose listener thread is (re)started in every process.
+
+    gunicorn forks workers after the app is built, and threads do not survive
+    a fork, so the listener is started lazily by the first record per pid.
+    """
+
+    def __init__(self, handlers):
+        super().__init__(queue.SimpleQueue())
+        self.handlers = handlers
+        self._pid = None
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def _start_listener(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._listener = logging.handlers.QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Only cheap work here: the formatter runs on the listener thread.
+        # Request context must be captured now, while it is still available.
+        if has_request_context() and not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id')
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._start_listener()
+        self.queue.put_nowait(record)
+
+    def stop(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._pid = None
+
+_handler = None
+access_logger = logging.getLogger('api.access')
+error_logger = logging.getLogger('api.error')
+
+def configure_logging(app):
+    """Route all logging through the async JSON handler and add request hooks."""
+    global _handler
+    if _handler is None:
+        output = logging.StreamHandler(sys.stdout)
+        if app.config['LOG_FORMAT'] == 'json':
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        _handler = AsyncHandler([output])
+
+        root = logging.getLogger()
+        root.handlers = [_handler]
+        root.setLevel(app.config['LOG_LEVEL'])
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        import atexit
+        atexit.register(_handler.stop)
+
+    # Flask's own logger would otherwise add a second, synchronous handler
+    app.logger.handlers = []
+    app.logger.propagate = True
+
+    sample_rate = app.config['LOG_SAMPLE_RATE']
+    sample_rates = app.config['LOG_SAMPLE_RATES']
+
+    @app.before_request
+    def start_request_log():
+        # Keep ids from upstream proxies, within reason
+        g.request_id = request.headers.get('X-Request-ID', '')[:64] or uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+        g.db_time = 0.0
+        g.db_queries = 0
+
+    @app.after_request
+    def write_access_log(response):
+        response.headers['X-Request-ID'] = g.get('request_id', '')
+        status = response.status_code
+        if status < 400:
+            rate = sample_rates.get(request.endpoint, sample_rate)
+            if rate < 1.0 and random.random() >= rate:
+                return response
+
+        exception = g.pop('exception', None)
+        started = g.get('request_started')
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'route': request.url_rule.rule if request.url_rule else None,
+            'endpoint': request.endpoint,
+            'status': status,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2) if started else None,
+            'db_ms': round(g.get('db_time', 0.0) * 1000, 2),
+            'db_queries': g.get('db_queries', 0),
+            'remote_addr': request.remote_addr
+        }
+        if status >= 500:
+            exc_info = (type(exception), exception, exception.__traceback__) if exception else None
+            error_logger.error('%s %s %s', request.method, request.path, status, extra=fields, exc_info=exc_info)
+        else:
+            level = logging.WARNING if status >= 400 else logging.INFO
+            access_logger.log(level, '%s %s %s', request.method, request.path, status, extra=fields)
+        return response
+
+def capture_exception(e):
+    """Remember a handled exception so the 5xx log line carries its traceback."""
+    if has_request_context():
+        g.exception = e
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start'].pop()
+    if has_request_context():
+        g.db_time = g.get('db_time', 0.0) + time.perf_counter() - started
+        g.db_queries = g.get('db_queries', 0) + 1
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get('query_start'):
+        context.connection.info['query_start'].pop()
@@ -45,6 +45,21 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# Created with raw SQL in migrations and deliberately not modeled, so
+# autogenerate must neither drop them nor report them as removed
+UNMODELED_OBJECTS = {
+    # Materialized view on Postgres, plain table elsewhere; services/dashboard.py
+    ('table', 'dashboard_summary'),
+    ('index', 'ix_dashboard_summary_metric_bucket'),
+    # pg_trgm GIN index behind tag suggestions; services/tag_index.py
+    ('index', 'ix_tags_name_trgm'),
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (reflected and compare_to is None and (type_, name) in UNMODELED_OBJECTS)
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -65,7 +80,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +109,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
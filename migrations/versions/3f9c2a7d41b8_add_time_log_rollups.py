@@ -0,0 +1,54 @@
+"""Add time log rollups and time_logs(project_id, date) index
+
+Revision ID: 3f9c2a7d41b8
+Revises: 07afda7495db
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d41b8'
+down_revision = '07afda7495db'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('time_log_rollups',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=5), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('hours', sa.Numeric(precision=12, scale=4), nullable=False),
+    sa.Column('entries', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['freelance_projects.id'], ),
+    sa.PrimaryKeyConstraint('project_id', 'period', 'period_start')
+    )
+    with op.batch_alter_table('time_log_rollups', schema=None) as batch_op:
+        batch_op.create_index('ix_time_log_rollups_period_start', ['period', 'period_start'], unique=False)
+
+    with op.batch_alter_table('time_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_time_logs_project_id_date', ['project_id', 'date'], unique=False)
+
+    # Backfill rollups from existing logs in one set-based statement per period
+    if op.get_bind().dialect.name == 'postgresql':
+        for period in ('day', 'week', 'month'):
+            op.execute(f"""
+                INSERT INTO time_log_rollups (project_id, period, period_start, hours, entries)
+                SELECT project_id, '{period}', date_trunc('{period}', date)::date,
+                       SUM(hours), COUNT(*)
+                FROM time_logs
+                GROUP BY project_id, date_trunc('{period}', date)::date
+            """)
+
+
+def downgrade():
+    with op.batch_alter_table('time_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_time_logs_project_id_date')
+
+    with op.batch_alter_table('time_log_rollups', schema=None) as batch_op:
+        batch_op.drop_index('ix_time_log_rollups_period_start')
+
+    op.drop_table('time_log_rollups')
@@ -0,0 +1,60 @@
+"""Store money as decimals and back invoice numbers with a sequence
+
+Revision ID: 8b1e6d0c5a93
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-19 10:02:17.540911
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e6d0c5a93'
+down_revision = '3f9c2a7d41b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('freelance_projects', schema=None) as batch_op:
+        batch_op.alter_column('hourly_rate',
+               existing_type=sa.Float(),
+               type_=sa.Numeric(precision=10, scale=2),
+               existing_nullable=True,
+               postgresql_using='round(hourly_rate::numeric, 2)')
+
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.alter_column('amount',
+               existing_type=sa.Float(),
+               type_=sa.Numeric(precision=12, scale=2),
+               existing_nullable=False,
+               postgresql_using='round(amount::numeric, 2)')
+
+    op.create_table('counters',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(sa.schema.CreateSequence(sa.Sequence('invoice_number_seq')))
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(sa.schema.DropSequence(sa.Sequence('invoice_number_seq')))
+
+    op.drop_table('counters')
+
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.alter_column('amount',
+               existing_type=sa.Numeric(precision=12, scale=2),
+               type_=sa.Float(),
+               existing_nullable=False)
+
+    with op.batch_alter_table('freelance_projects', schema=None) as batch_op:
+        batch_op.alter_column('hourly_rate',
+               existing_type=sa.Numeric(precision=10, scale=2),
+               type_=sa.Float(),
+               existing_nullable=True)
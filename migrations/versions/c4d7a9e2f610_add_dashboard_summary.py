@@ -0,0 +1,82 @@
+"""Add dashboard summary materialized view
+
+Revision ID: c4d7a9e2f610
+Revises: 8b1e6d0c5a93
+Create Date: 2026-10-19 10:48:55.203377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d7a9e2f610'
+down_revision = '8b1e6d0c5a93'
+branch_labels = None
+depends_on = None
+
+
+# Frozen at this revision: the view is created from this text, whatever
+# services/dashboard.py says later. A changed query gets a new migration.
+SUMMARY_QUERY = """
+SELECT s.metric, s.bucket, s.label, s.amount, s.hours, s.items,
+       CURRENT_TIMESTAMP AS refreshed_at
+FROM (
+    SELECT 'refreshed' AS metric, '' AS bucket, NULL AS label,
+           0 AS amount, 0 AS hours, 0 AS items
+    UNION ALL
+    SELECT 'revenue_month', SUBSTR(CAST(paid_date AS TEXT), 1, 7), NULL,
+           SUM(amount), 0, COUNT(*)
+    FROM invoices
+    WHERE paid AND paid_date IS NOT NULL
+    GROUP BY SUBSTR(CAST(paid_date AS TEXT), 1, 7)
+    UNION ALL
+    SELECT 'unpaid_due', CAST(due_date AS TEXT), NULL,
+           SUM(amount), 0, COUNT(*)
+    FROM invoices
+    WHERE NOT COALESCE(paid, FALSE)
+    GROUP BY due_date
+    UNION ALL
+    SELECT 'client', CAST(c.id AS TEXT), c.name,
+           COALESCE(inv.amount, 0), COALESCE(h.hours, 0), COALESCE(inv.items, 0)
+    FROM clients c
+    LEFT JOIN (
+        SELECT fp.client_id, SUM(r.hours) AS hours
+        FROM time_log_rollups r
+        JOIN freelance_projects fp ON fp.id = r.project_id
+        WHERE r.period = 'month'
+        GROUP BY fp.client_id
+    ) h ON h.client_id = c.id
+    LEFT JOIN (
+        SELECT fp.client_id, SUM(i.amount) AS amount, COUNT(*) AS items
+        FROM invoices i
+        JOIN freelance_projects fp ON fp.id = i.project_id
+        GROUP BY fp.client_id
+    ) inv ON inv.client_id = c.id
+) s
+"""
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f'CREATE MATERIALIZED VIEW dashboard_summary AS {SUMMARY_QUERY}')
+        # A unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+        op.execute('CREATE UNIQUE INDEX ix_dashboard_summary_metric_bucket ON dashboard_summary (metric, bucket)')
+    else:
+        op.create_table('dashboard_summary',
+        sa.Column('metric', sa.String(length=20), nullable=False),
+        sa.Column('bucket', sa.String(length=20), nullable=False),
+        sa.Column('label', sa.String(length=100), nullable=True),
+        sa.Column('amount', sa.Numeric(precision=14, scale=2), nullable=True),
+        sa.Column('hours', sa.Numeric(precision=14, scale=4), nullable=True),
+        sa.Column('items', sa.Integer(), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('metric', 'bucket')
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP MATERIALIZED VIEW dashboard_summary')
+    else:
+        op.drop_table('dashboard_summary')
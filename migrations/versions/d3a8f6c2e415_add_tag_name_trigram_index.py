@@ -0,0 +1,30 @@
+"""Add pg_trgm index on tags.name
+
+Revision ID: d3a8f6c2e415
+Revises: 5c1f8b3e9d07
+Create Date: 2026-10-19 23:05:38.914207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a8f6c2e415'
+down_revision = '5c1f8b3e9d07'
+branch_labels = None
+depends_on = None
+
+
+# Postgres only: serves tag suggestions (prefix ILIKE and similarity) until a
+# worker's in-memory index is built. SQLite falls back to LIKE.
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('ix_tags_name_trgm', 'tags', ['name'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_tags_name_trgm', table_name='tags')
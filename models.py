@@ -1,9 +1,7 @@
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
-from __init__ import db
+from extensions import db
+import tracing
 
 class User(db.Model):
     """User model for admin access."""
@@ -15,30 +13,126 @@ class User(db.Model):
     password_hash = db.Column(db.String(128))
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        with tracing.span('password.hash'):
+            self.password_hash = generate_password_hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        with tracing.span('password.check'):
+            return check_password_hash(self.password_hash, password)
 
 class Project(db.Model):
     """Project model for portfolio projects."""
     __tablename__ = 'projects'
+    __table_args__ = (
+        # Live rows only: soft-deleted projects drop out of every index the
+        # routes read, and their slugs become free again
+        db.Index('ix_projects_live_slug', 'slug', unique=True,
+                 postgresql_where=db.text('deleted_at IS NULL'),
+                 sqlite_where=db.text('deleted_at IS NULL')),
+        # /projects/featured reads only the few featured rows
+        db.Index('ix_projects_featured_updated_at', 'updated_at',
+                 postgresql_where=db.text('featured AND deleted_at IS NULL'),
+                 sqlite_where=db.text('featured = 1 AND deleted_at IS NULL')),
+        db.Index('ix_projects_live_updated_at', 'updated_at',
+                 postgresql_where=db.text('deleted_at IS NULL'),
+                 sqlite_where=db.text('deleted_at IS NULL')),
+        # The archival job scans only the (few) deleted rows
+        db.Index('ix_projects_deleted_at', 'deleted_at',
+                 postgresql_where=db.text('deleted_at IS NOT NULL'),
+                 sqlite_where=db.text('deleted_at IS NOT NULL')),
+        # ?sort=popular
+        db.Index('ix_projects_live_popularity', 'popularity',
+                 postgresql_where=db.text('deleted_at IS NULL'),
+                 sqlite_where=db.text('deleted_at IS NULL')),
+        # Manual order: listing and neighbour lookups are ordered index scans
+        db.Index('ix_projects_live_sort_key', 'sort_key', unique=True,
+                 postgresql_where=db.text('deleted_at IS NULL'),
+                 sqlite_where=db.text('deleted_at IS NULL')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
-    slug = db.Column(db.String(100), unique=True, nullable=False)
+    slug = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
     github = db.Column(db.String(255))
     private = db.Column(db.Boolean, default=False)
     featured = db.Column(db.Boolean, default=False)
     content = db.Column(db.Text)
     image_url = db.Column(db.String(255))
+    # Pre-rendered from content on write; see services/rendering.py
+    content_html = db.Column(db.Text)
+    content_toc = db.Column(db.JSON)
+    content_excerpt = db.Column(db.Text)
+    reading_time = db.Column(db.Integer)
+    content_hash = db.Column(db.String(64))
+    # Responsive variants of a local image_url; see services/images.py
+    image_hash = db.Column(db.String(64))
+    image_width = db.Column(db.Integer)
+    image_height = db.Column(db.Integer)
+    image_variants = db.Column(db.JSON)
+    image_placeholder = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    deleted_at = db.Column(db.DateTime)  # soft delete; archived later
+    # Decayed view count, refreshed by services/views.py
+    popularity = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    # Manual order, a base62 fractional key; see services/ordering.py. Postgres
+    # must compare it bytewise (C collation) to match Python and SQLite
+    sort_key = db.Column(db.String(255).with_variant(db.String(255, collation='C'), 'postgresql'), nullable=False)
     
     # Relationships
     tags = db.relationship('Tag', secondary='project_tags', backref='projects')
 
+class ProjectNeighbor(db.Model):
+    """Precomputed related projects, maintained by services/related.py."""
+    __tablename__ = 'project_neighbors'
+    
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    # Indexed for incremental updates ("which projects list this one?")
+    neighbor_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False, index=True)
+    score = db.Column(db.Float, nullable=False)
+
+class ProjectTerm(db.Model):
+    """Description term counts per project: the inverted index behind services/related.py."""
+    __tablename__ = 'project_terms'
+    
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True)
+    # Indexed for "which projects use this term?" and document frequencies
+    term = db.Column(db.String(64), primary_key=True, index=True)
+    count = db.Column(db.Integer, nullable=False)
+
+class ProjectView(db.Model):
+    """Views per project and day, written in batches by services/views.py."""
+    __tablename__ = 'project_views'
+    
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True, index=True)
+    views = db.Column(db.Integer, nullable=False, default=0)
+
+class ProjectArchive(db.Model):
+    """Deleted projects moved out of the projects table by services/archival.py.
+
+    Rendered content and image variants are not kept; both can be rebuilt
+    from content and image_url.
+    """
+    __tablename__ = 'projects_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(100), nullable=False)
+    slug = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    github = db.Column(db.String(255))
+    private = db.Column(db.Boolean)
+    featured = db.Column(db.Boolean)
+    content = db.Column(db.Text)
+    image_url = db.Column(db.String(255))
+    tags = db.Column(db.JSON)  # tag names at the time of archiving
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    deleted_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
 class Tag(db.Model):
     """Tag model for project tags."""
     __tablename__ = 'tags'
@@ -49,12 +143,32 @@ class Tag(db.Model):
 # Association table for many-to-many relationship between Project and Tag
 project_tags = db.Table('project_tags',
     db.Column('project_id', db.Integer, db.ForeignKey('projects.id'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True)
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+    # The primary key covers lookups by project; tag filters need their own index
+    db.Index('ix_project_tags_tag_id', 'tag_id')
 )
 
 class Contact(db.Model):
     """Contact model for storing contact form submissions."""
     __tablename__ = 'contacts'
+    __table_args__ = (
+        db.Index('ix_contacts_created_at', 'created_at'),
+        # Contacts still waiting for the admin digest
+        db.Index('ix_contacts_unnotified_id', 'id',
+                 postgresql_where=db.text('notified_at IS NULL'),
+                 sqlite_where=db.text('notified_at IS NULL')),
+        # The admin inbox lists live contacts only
+        db.Index('ix_contacts_live_created_at', 'created_at',
+                 postgresql_where=db.text('deleted_at IS NULL'),
+                 sqlite_where=db.text('deleted_at IS NULL')),
+        db.Index('ix_contacts_deleted_at', 'deleted_at',
+                 postgresql_where=db.text('deleted_at IS NOT NULL'),
+                 sqlite_where=db.text('deleted_at IS NOT NULL')),
+        # Unread count on the admin dashboard
+        db.Index('ix_contacts_unread_id', 'id',
+                 postgresql_where=db.text('NOT read AND deleted_at IS NULL'),
+                 sqlite_where=db.text('read = 0 AND deleted_at IS NULL')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -62,6 +176,22 @@ class Contact(db.Model):
     message = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     read = db.Column(db.Boolean, default=False)
+    notified_at = db.Column(db.DateTime)  # set once the admin digest went out
+    deleted_at = db.Column(db.DateTime)  # soft delete; archived later
+
+class ContactArchive(db.Model):
+    """Old and deleted contacts moved out of the contacts table by services/archival.py."""
+    __tablename__ = 'contacts_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime)
+    read = db.Column(db.Boolean)
+    notified_at = db.Column(db.DateTime)
+    deleted_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
 # Freelance Dashboard Models
 class Client(db.Model):
@@ -82,12 +212,15 @@ class Client(db.Model):
 class FreelanceProject(db.Model):
     """Project model for freelance work."""
     __tablename__ = 'freelance_projects'
+    __table_args__ = (
+        db.Index('ix_freelance_projects_client_id', 'client_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    hourly_rate = db.Column(db.Float)
+    hourly_rate = db.Column(db.Numeric(10, 2))
     start_date = db.Column(db.Date)
     end_date = db.Column(db.Date)
     status = db.Column(db.String(20), default='active')  # active, completed, on-hold
@@ -100,6 +233,11 @@ class FreelanceProject(db.Model):
 class TimeLog(db.Model):
     """Time log model for tracking hours on freelance projects."""
     __tablename__ = 'time_logs'
+    __table_args__ = (
+        db.Index('ix_time_logs_project_id_date', 'project_id', 'date'),
+        # Unfiltered listing is ordered by (date, id) with a limit
+        db.Index('ix_time_logs_date_id', 'date', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('freelance_projects.id'), nullable=False)
@@ -108,17 +246,117 @@ class TimeLog(db.Model):
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class TimeLogRollup(db.Model):
+    """Pre-aggregated hours per freelance project per day, week and month."""
+    __tablename__ = 'time_log_rollups'
+    __table_args__ = (
+        db.Index('ix_time_log_rollups_period_start', 'period', 'period_start'),
+    )
+    
+    project_id = db.Column(db.Integer, db.ForeignKey('freelance_projects.id'), primary_key=True)
+    period = db.Column(db.String(5), primary_key=True)  # day, week, month
+    period_start = db.Column(db.Date, primary_key=True)
+    hours = db.Column(db.Numeric(12, 4), nullable=False, default=0)
+    entries = db.Column(db.Integer, nullable=False, default=0)
+
+# Postgres sequence backing invoice numbers; see services/invoicing.py
+invoice_number_seq = db.Sequence('invoice_number_seq', metadata=db.metadata)
+
+class Counter(db.Model):
+    """Named counter used where the database has no native sequences (SQLite)."""
+    __tablename__ = 'counters'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
 class Invoice(db.Model):
     """Invoice model for freelance projects."""
     __tablename__ = 'invoices'
+    __table_args__ = (
+        db.Index('ix_invoices_project_id_paid_due_date', 'project_id', 'paid', 'due_date'),
+        db.Index('ix_invoices_issue_date_id', 'issue_date', 'id'),
+        # One invoice per project and billed period; also serves the overlap
+        # check in services/invoicing.py
+        db.Index('ix_invoices_project_id_period', 'project_id', 'period_start', 'period_end', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('freelance_projects.id'), nullable=False)
     invoice_number = db.Column(db.String(20), unique=True, nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(db.Numeric(12, 2), nullable=False)
     issue_date = db.Column(db.Date, nullable=False)
     due_date = db.Column(db.Date, nullable=False)
     paid = db.Column(db.Boolean, default=False)
     paid_date = db.Column(db.Date)
+    # Dates whose hours the invoice bills; null on invoices made by hand
+    period_start = db.Column(db.Date)
+    period_end = db.Column(db.Date)
     notes = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Job(db.Model):
+    """Background job queued by the API and executed by services/jobs.py workers."""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # Workers only ever scan queued jobs that are due
+        db.Index('ix_jobs_queued_run_at', 'run_at',
+                 postgresql_where=db.text("status = 'queued'"),
+                 sqlite_where=db.text("status = 'queued'")),
+        # At most one queued job per dedupe key, so bursts coalesce
+        db.Index('ix_jobs_queued_dedupe_key', 'dedupe_key', unique=True,
+                 postgresql_where=db.text("status = 'queued'"),
+                 sqlite_where=db.text("status = 'queued'")),
+        db.Index('ix_jobs_status_finished_at', 'status', 'finished_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON)
+    status = db.Column(db.String(10), nullable=False, default='queued')  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    dedupe_key = db.Column(db.String(100))
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    locked_by = db.Column(db.String(100))
+    last_error = db.Column(db.Text)
+class CacheEvent(db.Model):
+    """Cache invalidations for processes polling instead of using LISTEN/NOTIFY (see cache.py)."""
+    __tablename__ = 'cache_events'
+    # AUTOINCREMENT keeps SQLite from reusing ids after a prune, so a gap is a real gap
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    events = db.Column(db.JSON, nullable=False)
+    # cache.origin() of the publishing process
+    origin = db.Column(db.String(32))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class ChangeLog(db.Model):
+    """Compact admin change events for the /api/admin/events stream (see services/changes.py)."""
+    __tablename__ = 'change_log'
+    # AUTOINCREMENT keeps SQLite from reusing ids after a prune; ids are SSE event ids
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)
+    data = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class IdempotencyKey(db.Model):
+    """Stored responses for Idempotency-Key retries (see idempotency.py)."""
+    __tablename__ = 'idempotency_keys'
+    
+    # Endpoint, plus the admin user on authenticated routes or a hash of
+    # the client address on public ones
+    scope = db.Column(db.String(120), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    # Null while the first request is still running
+    status_code = db.Column(db.Integer)
+    content_type = db.Column(db.String(100))
+    body = db.Column(db.LargeBinary)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -0,0 +1,202 @@
+"""
+Move old contacts and long-deleted projects into the *_archive tables.
+
+Work is done in small batches, each in its own short transaction, so the hot
+tables are never locked for long. On Postgres a batch is a single statement:
+rows are picked with FOR UPDATE SKIP LOCKED (a row someone is editing is left
+for the next run) and moved with a DELETE ... RETURNING feeding an INSERT. On
+SQLite the same batch is a select, an INSERT ... SELECT and a DELETE.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+import itertools
+import time
+
+from flask import current_app
+from sqlalchemy import and_, delete, func, insert, literal, or_, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+# Import the database extension
+from extensions import db
+# Import models from the parent package
+from models import (Contact, ContactArchive, Project, ProjectArchive, ProjectNeighbor, ProjectTerm, ProjectView,
+                    Tag, project_tags)
+# Import the background job framework
+from services.jobs import enqueue, job
+# Import the change feed and Idempotency-Key store, pruned with each run
+from services import changes
+import idempotency
+
+CONTACT_COLUMNS = ['id', 'name', 'email', 'message', 'created_at', 'read', 'notified_at', 'deleted_at']
+PROJECT_COLUMNS = ['id', 'title', 'slug', 'description', 'github', 'private', 'featured', 'content',
+                   'image_url', 'created_at', 'updated_at', 'deleted_at']
+
+# Give up on a batch rather than queue behind a long-held table lock
+LOCK_TIMEOUT = '2s'
+# Breather between batches for concurrent writers (and replication)
+BATCH_PAUSE = 0.05
+# Batches per table per run; the job re-queues itself while rows remain
+MAX_BATCHES = 200
+
+def contact_condition(now, config):
+    """Contacts due for the archive: deleted a while ago, or old and already notified."""
+    return or_(
+        Contact.deleted_at < now - timedelta(days=config['ARCHIVE_DELETED_AFTER_DAYS']),
+        and_(
+            Contact.created_at < now - timedelta(days=config['ARCHIVE_CONTACTS_AFTER_DAYS']),
+            or_(Contact.notified_at.isnot(None), Contact.deleted_at.isnot(None))
+        )
+    )
+
+def project_condition(now, config):
+    return Project.deleted_at < now - timedelta(days=config['ARCHIVE_DELETED_AFTER_DAYS'])
+
+def _begin_batch(connection):
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+
+def _move_contacts_postgres(connection, condition, limit, now):
+    batch = (
+        select(Contact.id).where(condition).limit(limit)
+        .with_for_update(skip_locked=True).cte('batch')
+    )
+    moved = (
+        delete(Contact).where(Contact.id.in_(select(batch.c.id)))
+        .returning(*[Contact.__table__.c[name] for name in CONTACT_COLUMNS])
+        .cte('moved')
+    )
+    return connection.execute(
+        insert(ContactArchive).from_select(
+            CONTACT_COLUMNS + ['archived_at'],
+            select(*[moved.c[name] for name in CONTACT_COLUMNS], literal(now))
+        )
+    ).rowcount
+
+def _move_contacts_sqlite(connection, condition, limit, now):
+    ids = connection.execute(select(Contact.id).where(condition).limit(limit)).scalars().all()
+    if not ids:
+        return 0
+    connection.execute(
+        insert(ContactArchive).from_select(
+            CONTACT_COLUMNS + ['archived_at'],
+            select(*[Contact.__table__.c[name] for name in CONTACT_COLUMNS], literal(now))
+            .where(Contact.id.in_(ids))
+        )
+    )
+    connection.execute(delete(Contact).where(Contact.id.in_(ids)))
+    return len(ids)
+
+def _move_projects_postgres(connection, condition, limit, now):
+    batch = (
+        select(Project.id).where(condition).limit(limit)
+        .with_for_update(skip_locked=True).cte('batch')
+    )
+    # Both deletes run in one statement, so the foreign key from project_tags
+    # is only checked once the projects are gone as well
+    links = (
+        delete(project_tags).where(project_tags.c.project_id.in_(select(batch.c.id)))
+        .returning(project_tags.c.project_id, project_tags.c.tag_id)
+        .cte('links')
+    )
+    moved = (
+        delete(Project).where(Project.id.in_(select(batch.c.id)))
+        .returning(*[Project.__table__.c[name] for name in PROJECT_COLUMNS])
+        .cte('moved')
+    )
+    tag_names = (
+        select(func.coalesce(func.json_agg(aggregate_order_by(Tag.name, Tag.name)), text("'[]'::json")))
+        .select_from(links.join(Tag, Tag.id == links.c.tag_id))
+        .where(links.c.project_id == moved.c.id)
+        .scalar_subquery()
+    )
+    return connection.execute(
+        insert(ProjectArchive).from_select(
+            PROJECT_COLUMNS + ['tags', 'archived_at'],
+            select(*[moved.c[name] for name in PROJECT_COLUMNS], tag_names, literal(now))
+        )
+    ).rowcount
+
+def _move_projects_sqlite(connection, condition, limit, now):
+    rows = connection.execute(
+        select(*[Project.__table__.c[name] for name in PROJECT_COLUMNS]).where(condition).limit(limit)
+    ).mappings().all()
+    if not rows:
+        return 0
+    ids = [row['id'] for row in rows]
+    tags = defaultdict(list)
+    for project_id, name in connection.execute(
+        select(project_tags.c.project_id, Tag.name)
+        .join(Tag, Tag.id == project_tags.c.tag_id)
+        .where(project_tags.c.project_id.in_(ids))
+        .order_by(Tag.name)
+    ):
+        tags[project_id].append(name)
+
+    connection.execute(insert(ProjectArchive), [
+        dict(row, tags=tags[row['id']], archived_at=now) for row in rows
+    ])
+    connection.execute(delete(project_tags).where(project_tags.c.project_id.in_(ids)))
+    # SQLite does not enforce the ON DELETE CASCADE that Postgres applies here
+    connection.execute(delete(ProjectNeighbor).where(
+        ProjectNeighbor.project_id.in_(ids) | ProjectNeighbor.neighbor_id.in_(ids)
+    ))
+    connection.execute(delete(ProjectTerm).where(ProjectTerm.project_id.in_(ids)))
+    connection.execute(delete(ProjectView).where(ProjectView.project_id.in_(ids)))
+    connection.execute(delete(Project).where(Project.id.in_(ids)))
+    return len(rows)
+
+def _move_in_batches(move, condition, batch_size, now, max_batches):
+    """Run move() one transaction at a time; returns (rows moved, rows may remain)."""
+    total = 0
+    for _ in itertools.count() if max_batches is None else range(max_batches):
+        with db.engine.begin() as connection:
+            _begin_batch(connection)
+            moved = move(connection, condition, batch_size, now)
+        total += moved
+        if moved < batch_size:
+            return total, False
+        time.sleep(BATCH_PAUSE)
+    return total, True
+
+def archive(config=None, now=None, max_batches=MAX_BATCHES):
+    """Archive what is due; returns counts per table and whether work remains.
+
+    max_batches bounds the batches per table (None for no limit).
+    """
+    config = config or current_app.config
+    now = now or datetime.utcnow()
+    batch_size = config['ARCHIVE_BATCH_SIZE']
+    postgres = db.engine.dialect.name == 'postgresql'
+
+    contacts, contacts_left = _move_in_batches(
+        _move_contacts_postgres if postgres else _move_contacts_sqlite,
+        contact_condition(now, config), batch_size, now, max_batches
+    )
+    projects, projects_left = _move_in_batches(
+        _move_projects_postgres if postgres else _move_projects_sqlite,
+        project_condition(now, config), batch_size, now, max_batches
+    )
+    # The change log is only kept for event stream clients to resume from
+    pruned = changes.prune(now, config)
+    expired_keys = idempotency.prune(now)
+    return {
+        'contacts': contacts,
+        'projects': projects,
+        'changes': pruned,
+        'idempotency_keys': expired_keys,
+        'more': contacts_left or projects_left
+    }
+
+def schedule(delay=None):
+    """Queue the next archive run in the current transaction, unless one is waiting."""
+    enqueue(
+        'archive',
+        delay=current_app.config['ARCHIVE_INTERVAL'] if delay is None else delay,
+        dedupe_key='archive'
+    )
+
+@job('archive', concurrency=1, max_attempts=3, backoff=300.0)
+def archive_job(payload):
+    """Archive due rows, then schedule the next run (right away if rows remain)."""
+    result = archive()
+    schedule(delay=0 if result['more'] else None)
@@ -0,0 +1,256 @@
+"""
+Change feed behind the admin event stream (/api/admin/events).
+
+Admin writes and new contacts add a compact row to change_log in their own
+transaction (record()), so an event exists exactly when its change
+committed. Each worker process runs one feed thread that, while the
+process has open streams, reads new rows once and hands them to every
+stream: the database sees one query per poll per process, not one per
+subscriber, and streams hold no database connection while they wait. The
+thread polls every CHANGES_POLL_INTERVAL seconds and is woken early by the
+cache invalidation bus, which record() uses to announce the commit.
+
+Row ids are the SSE event ids. A client that reconnects with Last-Event-ID
+first gets the rows it missed; if they were pruned (CHANGES_RETENTION_DAYS)
+or are too many, it gets a 'reset' event and should reload. Postgres can
+commit ids out of order, so the feed waits up to GAP_GRACE seconds at a
+missing id before taking it for a rolled-back transaction; an event
+committed later than that is not streamed.
+"""
+from collections import deque
+from datetime import datetime, timedelta
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import delete, func, select
+
+# Import the database extension
+from extensions import db
+# Import cross-worker cache invalidation (used here as a wake-up signal)
+import cache
+# Import models from the parent package
+from models import ChangeLog
+
+logger = logging.getLogger(__name__)
+
+GAP_GRACE = 5.0
+# Events replayed on resume before the client is told to reload instead
+BACKLOG_LIMIT = 500
+# Events a slow stream may fall behind before it is reset
+SUBSCRIBER_BUFFER = 1000
+
+def record(kind, data):
+    """Add a change event to the current transaction."""
+    db.session.add(ChangeLog(kind=kind, data=data, created_at=datetime.utcnow()))
+    cache.invalidate('changes')
+
+def project_data(project):
+    return {
+        'id': project.id,
+        'slug': project.slug,
+        'title': project.title,
+        'featured': project.featured,
+        'private': project.private
+    }
+
+def _event(row):
+    return {'id': row.id, 'kind': row.kind, 'data': row.data}
+
+def format_event(event):
+    data = json.dumps(event['data'], separators=(',', ':'))
+    return f"id: {event['id']}\nevent: {event['kind']}\ndata: {data}\n\n"
+
+class Subscriber:
+    def __init__(self, cursor):
+        # Id of the last event this stream has been given
+        self.cursor = cursor
+        self.overflowed = False
+        self._events = deque()
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def put(self, events):
+        with self._lock:
+            for event in events:
+                if event['id'] > self.cursor:
+                    self._events.append(event)
+                    self.cursor = event['id']
+            if len(self._events) > SUBSCRIBER_BUFFER:
+                self._events.clear()
+                self.overflowed = True
+            if self._events or self.overflowed:
+                self._ready.set()
+
+    def wait(self, timeout):
+        """Events queued since the last call, waiting up to timeout for the first."""
+        self._ready.wait(timeout)
+        with self._lock:
+            events, self._events = list(self._events), deque()
+            self._ready.clear()
+            return events
+
+class ChangeFeed:
+    def __init__(self):
+        self.stats = {'polls': 0, 'delivered': 0, 'skipped_ids': 0, 'rejected': 0}
+        # Id of the last event handed to subscribers; None while idle
+        self.position = None
+        self._subscribers = set()
+        self._gap = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread_pid = None
+
+    def subscribe(self, app, after=None):
+        """(subscriber, position), or None when the process has no stream to spare."""
+        with self._lock:
+            if len(self._subscribers) >= app.config['CHANGES_MAX_SUBSCRIBERS']:
+                self.stats['rejected'] += 1
+                return None
+            if self.position is None:
+                self.position = db.session.execute(select(func.max(ChangeLog.id))).scalar() or 0
+            # Threads do not survive a fork, so each process starts its own
+            if self._thread_pid != os.getpid():
+                threading.Thread(target=self._run, args=(app,), name='change-feed', daemon=True).start()
+                self._thread_pid = os.getpid()
+            subscriber = Subscriber(max(after or 0, self.position))
+            self._subscribers.add(subscriber)
+            return subscriber, self.position
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                # Start from the newest id again when the next stream opens
+                self.position = None
+                self._gap = None
+
+    def wake(self):
+        self._wake.set()
+
+    def subscribers(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def _run(self, app):
+        interval = app.config['CHANGES_POLL_INTERVAL']
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            with self._lock:
+                position = self.position
+            if position is None:
+                continue
+            try:
+                with app.app_context():
+                    rows = db.session.execute(
+                        select(ChangeLog).where(ChangeLog.id > position).order_by(ChangeLog.id).limit(BACKLOG_LIMIT)
+                    ).scalars().all()
+                    events = [_event(row) for row in rows]
+            except Exception:
+                logger.exception('Change feed poll failed')
+                continue
+            self.stats['polls'] += 1
+            self._deliver(position, self._contiguous(events, position))
+
+    def _contiguous(self, events, position):
+        """The events before the first missing id, unless it has been missing for GAP_GRACE."""
+        expected = position + 1
+        for index, event in enumerate(events):
+            if event['id'] != expected:
+                now = time.monotonic()
+                if self._gap is None or self._gap[0] != expected:
+                    self._gap = (expected, now)
+                if now - self._gap[1] < GAP_GRACE:
+                    return events[:index]
+                self.stats['skipped_ids'] += event['id'] - expected
+            expected = event['id'] + 1
+        return events
+
+    def _deliver(self, position, events):
+        if not events:
+            return
+        with self._lock:
+            # The last stream closed while this poll ran
+            if self.position != position:
+                return
+            self.position = events[-1]['id']
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(events)
+        self.stats['delivered'] += len(events)
+
+_feed = ChangeFeed()
+
+def _on_cache_events(events):
+    if 'changes' in events or cache.ALL in events:
+        _feed.wake()
+
+# Streams in this process want this process's changes too, without waiting for a poll
+cache.subscribe(_on_cache_events, own_events=True)
+
+def subscribe(after=None):
+    """Open a subscription for this process; None when CHANGES_MAX_SUBSCRIBERS are open."""
+    return _feed.subscribe(current_app._get_current_object(), after)
+
+def unsubscribe(subscriber):
+    _feed.unsubscribe(subscriber)
+
+def backlog(after, position):
+    """Events in (after, position] for a resuming client, or None when it must reload."""
+    if after >= position:
+        return []
+    oldest = db.session.execute(select(func.min(ChangeLog.id))).scalar()
+    if oldest is None or oldest > after + 1:
+        # Pruned since the client last saw the stream
+        return None
+    rows = db.session.execute(
+        select(ChangeLog)
+        .where(ChangeLog.id > after, ChangeLog.id <= position)
+        .order_by(ChangeLog.id)
+        .limit(BACKLOG_LIMIT + 1)
+    ).scalars().all()
+    if len(rows) > BACKLOG_LIMIT:
+        return None
+    return [_event(row) for row in rows]
+
+def stream(subscriber, events, max_age, keepalive, retry_ms):
+    """SSE text: the backlog (or a reset), 'ready', then live events for up to max_age seconds."""
+    yield f'retry: {retry_ms}\n\n'
+    if events is None:
+        yield format_event({'id': subscriber.cursor, 'kind': 'reset', 'data': {}})
+    else:
+        for event in events:
+            yield format_event(event)
+    yield format_event({'id': subscriber.cursor, 'kind': 'ready', 'data': {}})
+
+    deadline = time.monotonic() + max_age
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        events = subscriber.wait(min(keepalive, remaining))
+        if subscriber.overflowed:
+            yield format_event({'id': subscriber.cursor, 'kind': 'reset', 'data': {}})
+            return
+        if not events:
+            # Comment line; keeps proxies from closing an idle connection
+            yield ': keepalive\n\n'
+        for event in events:
+            yield format_event(event)
+
+def stats():
+    return dict(_feed.stats, subscribers=_feed.subscribers(), position=_feed.position)
+
+def prune(now=None, config=None):
+    """Delete events older than CHANGES_RETENTION_DAYS; returns how many."""
+    config = config or current_app.config
+    now = now or datetime.utcnow()
+    with db.engine.begin() as connection:
+        result = connection.execute(
+            delete(ChangeLog).where(ChangeLog.created_at < now - timedelta(days=config['CHANGES_RETENTION_DAYS']))
+        )
+    return result.rowcount
@@ -0,0 +1,175 @@
+from datetime import datetime, timezone
+import weakref
+
+from sqlalchemy import text
+
+# Import the database extension
+from extensions import db
+# Import the background job framework
+from services.jobs import enqueue, job
+
+# Seconds to wait after a write before refreshing, so bursts share one refresh
+REFRESH_DELAY = 2.0
+
+# One row per (metric, bucket). Kept portable between Postgres and SQLite.
+# The Postgres view is created from the text frozen in migration c4d7a9e2f610;
+# changing this query needs a migration that recreates the view from the new
+# text (tests/test_dashboard.py checks the two still match).
+SUMMARY_QUERY = """
+SELECT s.metric, s.bucket, s.label, s.amount, s.hours, s.items,
+       CURRENT_TIMESTAMP AS refreshed_at
+FROM (
+    SELECT 'refreshed' AS metric, '' AS bucket, NULL AS label,
+           0 AS amount, 0 AS hours, 0 AS items
+    UNION ALL
+    SELECT 'revenue_month', SUBSTR(CAST(paid_date AS TEXT), 1, 7), NULL,
+           SUM(amount), 0, COUNT(*)
+    FROM invoices
+    WHERE paid AND paid_date IS NOT NULL
+    GROUP BY SUBSTR(CAST(paid_date AS TEXT), 1, 7)
+    UNION ALL
+    SELECT 'unpaid_due', CAST(due_date AS TEXT), NULL,
+           SUM(amount), 0, COUNT(*)
+    FROM invoices
+    WHERE NOT COALESCE(paid, FALSE)
+    GROUP BY due_date
+    UNION ALL
+    SELECT 'client', CAST(c.id AS TEXT), c.name,
+           COALESCE(inv.amount, 0), COALESCE(h.hours, 0), COALESCE(inv.items, 0)
+    FROM clients c
+    LEFT JOIN (
+        SELECT fp.client_id, SUM(r.hours) AS hours
+        FROM time_log_rollups r
+        JOIN freelance_projects fp ON fp.id = r.project_id
+        WHERE r.period = 'month'
+        GROUP BY fp.client_id
+    ) h ON h.client_id = c.id
+    LEFT JOIN (
+        SELECT fp.client_id, SUM(i.amount) AS amount, COUNT(*) AS items
+        FROM invoices i
+        JOIN freelance_projects fp ON fp.id = i.project_id
+        GROUP BY fp.client_id
+    ) inv ON inv.client_id = c.id
+) s
+"""
+
+SQLITE_TABLE = """
+CREATE TABLE IF NOT EXISTS dashboard_summary (
+    metric VARCHAR(20) NOT NULL,
+    bucket VARCHAR(20) NOT NULL,
+    label VARCHAR(100),
+    amount NUMERIC(14, 2),
+    hours NUMERIC(14, 4),
+    items INTEGER,
+    refreshed_at TIMESTAMP,
+    PRIMARY KEY (metric, bucket)
+)
+"""
+
+def refresh_summary():
+    """Recompute the dashboard summary.
+
+    On Postgres this refreshes the materialized view concurrently so readers
+    are never blocked. Elsewhere the summary table is swapped in one transaction.
+    """
+    ensure_table()
+    with db.engine.begin() as connection:
+        if connection.dialect.name == 'postgresql':
+            connection.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY dashboard_summary'))
+        else:
+            connection.execute(text('DELETE FROM dashboard_summary'))
+            connection.execute(text(
+                'INSERT INTO dashboard_summary '
+                '(metric, bucket, label, amount, hours, items, refreshed_at) ' + SUMMARY_QUERY
+            ))
+
+@job('refresh_dashboard', concurrency=1, max_attempts=3)
+def refresh_dashboard_job(payload):
+    refresh_summary()
+
+def request_refresh():
+    """Queue a summary refresh shortly after a write, coalescing bursts.
+
+    Call before committing the write; the deduplicated job means a burst of
+    writes from any number of processes costs a single refresh.
+    """
+    enqueue('refresh_dashboard', delay=REFRESH_DELAY, dedupe_key='refresh_dashboard')
+
+# Engines whose SQLite summary table is known to exist
+_table_ready = weakref.WeakSet()
+
+def ensure_table():
+    """Create the SQLite summary table once per engine if needed.
+
+    Migrations create it (and the Postgres view); this covers databases made
+    with create_all, such as the tests'.
+    """
+    engine = db.engine
+    if engine.dialect.name == 'postgresql' or engine in _table_ready:
+        return
+    with engine.begin() as connection:
+        connection.execute(text(SQLITE_TABLE))
+    _table_ready.add(engine)
+
+def _read_rows():
+    ensure_table()
+    return db.session.execute(text(
+        'SELECT metric, bucket, label, amount, hours, items, refreshed_at FROM dashboard_summary'
+    )).all()
+
+def _as_datetime(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+def load_summary(today):
+    """Read the summary in one query and shape it for the dashboard."""
+    rows = _read_rows()
+    if not rows:
+        # Never refreshed yet (fresh SQLite database)
+        refresh_summary()
+        rows = _read_rows()
+
+    summary = {
+        'revenue_by_month': [],
+        'unpaid': {'amount': 0.0, 'count': 0},
+        'overdue': {'amount': 0.0, 'count': 0},
+        'clients': [],
+        'totals': {'hours': 0.0, 'invoiced': 0.0, 'effective_hourly_rate': None},
+        'refreshed_at': None
+    }
+    today_key = today.isoformat()
+
+    for metric, bucket, label, amount, hours, items, refreshed_at in rows:
+        amount = float(amount or 0)
+        hours = float(hours or 0)
+        if metric == 'refreshed':
+            summary['refreshed_at'] = _as_datetime(refreshed_at)
+        elif metric == 'revenue_month':
+            summary['revenue_by_month'].append({'month': bucket, 'amount': amount, 'invoices': items})
+        elif metric == 'unpaid_due':
+            summary['unpaid']['amount'] += amount
+            summary['unpaid']['count'] += items
+            if bucket < today_key:
+                summary['overdue']['amount'] += amount
+                summary['overdue']['count'] += items
+        elif metric == 'client':
+            summary['clients'].append({
+                'id': int(bucket),
+                'name': label,
+                'hours': hours,
+                'invoiced': amount,
+                'invoices': items,
+                'effective_hourly_rate': round(amount / hours, 2) if hours else None
+            })
+            summary['totals']['hours'] += hours
+            summary['totals']['invoiced'] += amount
+
+    totals = summary['totals']
+    if totals['hours']:
+        totals['effective_hourly_rate'] = round(totals['invoiced'] / totals['hours'], 2)
+    summary['revenue_by_month'].sort(key=lambda item: item['month'])
+    summary['clients'].sort(key=lambda item: item['hours'], reverse=True)
+    return summary
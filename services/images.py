@@ -0,0 +1,203 @@
+import base64
+import hashlib
+import io
+import logging
+import os
+
+from flask import current_app
+from sqlalchemy import update
+
+# Import the database extension
+from extensions import db
+# Import cross-worker cache invalidation
+import cache
+# Import models from the parent package
+from models import Project
+# Import the background job framework
+from services.jobs import enqueue, job
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_WIDTH = 16
+FORMAT_OPTIONS = {
+    'webp': {'quality': 80, 'method': 4},
+    'avif': {'quality': 55, 'speed': 6}
+}
+
+def resolve_local_path(image_url, source_dir):
+    """Map a site-relative image URL to a file under source_dir, or None.
+
+    Remote URLs and paths escaping source_dir are not processed.
+    """
+    if not image_url or not image_url.startswith('/') or image_url.startswith('//'):
+        return None
+
+    root = os.path.realpath(source_dir)
+    path = os.path.realpath(os.path.join(root, image_url.split('?', 1)[0].lstrip('/')))
+    if not path.startswith(root + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def supported_formats(formats):
+    from PIL import features
+
+    return [fmt for fmt in formats if fmt in FORMAT_OPTIONS and features.check(fmt)]
+
+def _placeholder(image):
+    """Tiny blurred WebP as a data URI (LQIP) shown while variants load."""
+    from PIL import ImageFilter
+
+    height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+    tiny = image.resize((PLACEHOLDER_WIDTH, height)).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    tiny.save(buffer, 'WEBP', quality=40)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def process_image(path, output_dir, url_prefix, widths, formats, digest=None):
+    """Write resized variants of an image and describe them.
+
+    Output names embed the content hash, so re-running on the same file only
+    re-encodes variants that are missing on disk.
+    """
+    from PIL import Image, ImageOps
+
+    digest = digest or file_hash(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    os.makedirs(output_dir, exist_ok=True)
+
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        width, height = image.size
+        targets = sorted({w for w in widths if w < width} | {min(width, max(widths))})
+
+        variants = []
+        for target in targets:
+            resized = None
+            target_height = max(1, round(height * target / width))
+            for fmt in supported_formats(formats):
+                name = f'{stem}-{digest[:12]}-{target}.{fmt}'
+                destination = os.path.join(output_dir, name)
+                if not os.path.exists(destination):
+                    if resized is None:
+                        resized = image if target == width else image.resize((target, target_height), Image.LANCZOS)
+                    temporary = destination + '.tmp'
+                    resized.save(temporary, fmt.upper(), **FORMAT_OPTIONS[fmt])
+                    os.replace(temporary, destination)
+                variants.append({
+                    'url': f'{url_prefix.rstrip("/")}/{name}',
+                    'width': target,
+                    'height': target_height,
+                    'format': fmt
+                })
+
+        return {
+            'image_hash': digest,
+            'image_width': width,
+            'image_height': height,
+            'image_variants': variants,
+            'image_placeholder': _placeholder(image)
+        }
+
+def process_project_image(project, config, force=False):
+    """Process a project's local image and store the result on the project.
+
+    Returns True when the stored metadata changed.
+    """
+    path = resolve_local_path(project.image_url, config['IMAGE_SOURCE_DIR'])
+    if path is None:
+        return False
+
+    digest = file_hash(path)
+    if not force and project.image_hash == digest and project.image_variants:
+        return False
+
+    result = process_image(
+        path,
+        config['IMAGE_OUTPUT_DIR'],
+        config['IMAGE_OUTPUT_URL'],
+        config['IMAGE_WIDTHS'],
+        config['IMAGE_FORMATS'],
+        digest=digest
+    )
+    for column, value in result.items():
+        setattr(project, column, value)
+    return True
+
+def clear_image_metadata(project):
+    """Forget variants of a previous image_url."""
+    project.image_hash = None
+    project.image_width = None
+    project.image_height = None
+    project.image_variants = None
+    project.image_placeholder = None
+
+@job('process_image', concurrency=2, max_attempts=3)
+def process_image_job(payload):
+    """Build variants for the project's current image unless they are already done.
+
+    The image is read from the project, not the payload: a queued job stands
+    for every image change made before it runs.
+    """
+    config = current_app.config
+    project = db.session.get(Project, payload['project_id'])
+    if not project or not project.image_url:
+        return
+    image_url = project.image_url
+    path = resolve_local_path(image_url, config['IMAGE_SOURCE_DIR'])
+    if path is None:
+        return
+    digest = file_hash(path)
+    if project.image_hash == digest and project.image_variants:
+        return
+
+    result = process_image(
+        path,
+        config['IMAGE_OUTPUT_DIR'],
+        config['IMAGE_OUTPUT_URL'],
+        config['IMAGE_WIDTHS'],
+        config['IMAGE_FORMATS'],
+        digest=digest
+    )
+    # Only apply if the image was not replaced while we were encoding
+    db.session.execute(
+        update(Project)
+        .where(Project.id == project.id, Project.image_url == image_url)
+        .values(**result)
+    )
+    cache.invalidate('projects')
+    cache.invalidate('related')
+    cache.invalidate('project', project.slug)
+
+def schedule_processing(project):
+    """Queue image processing in the current transaction (project must be flushed).
+
+    Changes made while a job is still queued share it; the job picks up
+    whatever image_url the project has when it runs.
+    """
+    if not project.image_url:
+        return
+    enqueue('process_image', {'project_id': project.id}, dedupe_key=f'process_image:{project.id}')
+
+def image_payload(project):
+    """Image fields for API responses, including a ready-made srcset per format."""
+    srcset = {}
+    for variant in project.image_variants or []:
+        srcset.setdefault(variant['format'], []).append(f"{variant['url']} {variant['width']}w")
+
+    return {
+        'url': project.image_url,
+        'width': project.image_width,
+        'height': project.image_height,
+        'placeholder': project.image_placeholder,
+        'srcset': {fmt: ', '.join(entries) for fmt, entries in srcset.items()}
+    }
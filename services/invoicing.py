@@ -0,0 +1,137 @@
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import Numeric, and_, cast, exists, func, insert, select, text, update
+
+# Import the database extension
+from extensions import db
+# Import models from the parent package
+from models import Counter, FreelanceProject, Invoice, TimeLog
+
+CENTS = Decimal('0.01')
+INVOICE_COUNTER = 'invoice_number'
+
+def format_invoice_number(number, issue_date):
+    """Format a sequence value as an invoice number, e.g. INV-2026-00042."""
+    return f'INV-{issue_date.year}-{number:05d}'
+
+def allocate_invoice_numbers(count):
+    """Reserve count invoice numbers without reading the invoices table.
+
+    Postgres hands them out from a sequence, so concurrent generators never
+    block each other. Elsewhere a single counter row is bumped atomically.
+    """
+    if count <= 0:
+        return []
+
+    if db.engine.dialect.name == 'postgresql':
+        return db.session.scalars(
+            text("SELECT nextval('invoice_number_seq') FROM generate_series(1, :count)"),
+            {'count': count}
+        ).all()
+
+    counter = Counter.__table__
+    last = db.session.execute(
+        update(counter)
+        .where(counter.c.name == INVOICE_COUNTER)
+        .values(value=counter.c.value + count)
+        .returning(counter.c.value)
+    ).scalar()
+    if last is None:
+        db.session.execute(insert(counter).values(name=INVOICE_COUNTER, value=count))
+        last = count
+    return list(range(last - count + 1, last + 1))
+
+def _projects(query, project_ids=None, active_only=False):
+    if project_ids is not None:
+        query = query.where(FreelanceProject.id.in_(project_ids))
+    if active_only:
+        query = query.where(FreelanceProject.status == 'active')
+    return query
+
+def overlapping_invoice(start_date, end_date):
+    """Condition: the freelance project has an invoice billing a date in the range."""
+    return exists().where(
+        Invoice.project_id == FreelanceProject.id,
+        Invoice.period_start <= end_date,
+        Invoice.period_end >= start_date
+    )
+
+def billable_totals(start_date, end_date, project_ids=None, active_only=False):
+    """Return (project_id, hours, amount) per project for a date range.
+
+    Hours and hours x rate are aggregated by the database in one grouped query
+    over time_logs(project_id, date) instead of walking project.time_logs.
+    Projects already invoiced for part of the range are left out.
+    """
+    hours = func.sum(TimeLog.hours)
+    query = (
+        select(
+            FreelanceProject.id,
+            hours.label('hours'),
+            (cast(hours, Numeric(12, 4)) * FreelanceProject.hourly_rate).label('amount')
+        )
+        .join(TimeLog, and_(
+            TimeLog.project_id == FreelanceProject.id,
+            TimeLog.date >= start_date,
+            TimeLog.date <= end_date
+        ))
+        .where(FreelanceProject.hourly_rate.isnot(None), ~overlapping_invoice(start_date, end_date))
+        .group_by(FreelanceProject.id, FreelanceProject.hourly_rate)
+        .order_by(FreelanceProject.id)
+    )
+    query = _projects(query, project_ids, active_only)
+
+    return [
+        (project_id, float(total_hours), Decimal(amount).quantize(CENTS, rounding=ROUND_HALF_UP))
+        for project_id, total_hours, amount in db.session.execute(query)
+        if total_hours
+    ]
+
+def generate_invoices(start_date, end_date, issue_date, due_date, project_ids=None,
+                      active_only=False, notes=None):
+    """Create invoices for billable hours in a date range.
+
+    All invoices are inserted in the caller's transaction so a batch either
+    lands completely or not at all. A project that already has an invoice
+    for any day of the range is skipped, so re-running a batch never bills
+    the same hours twice. Returns (created Invoice objects, ids of the
+    projects skipped that way).
+    """
+    # Lock the projects until the caller commits: a concurrent run for the
+    # same projects waits here and then sees these invoices (SQLite
+    # serializes writers anyway, and the unique period index backs this up)
+    db.session.execute(_projects(select(FreelanceProject.id), project_ids, active_only).with_for_update())
+    invoiced = db.session.execute(
+        _projects(select(FreelanceProject.id), project_ids, active_only)
+        .where(overlapping_invoice(start_date, end_date))
+        .order_by(FreelanceProject.id)
+    ).scalars().all()
+
+    totals = billable_totals(start_date, end_date, project_ids=project_ids, active_only=active_only)
+    if not totals:
+        return [], invoiced
+
+    numbers = allocate_invoice_numbers(len(totals))
+    default_notes = f'Hours logged from {start_date.isoformat()} to {end_date.isoformat()}'
+    now = datetime.utcnow()
+
+    invoices = []
+    for (project_id, hours, amount), number in zip(totals, numbers):
+        invoice = Invoice(
+            project_id=project_id,
+            invoice_number=format_invoice_number(number, issue_date),
+            amount=amount,
+            issue_date=issue_date,
+            due_date=due_date,
+            paid=False,
+            period_start=start_date,
+            period_end=end_date,
+            notes=notes or f'{default_notes} ({hours:g} h)',
+            created_at=now
+        )
+        invoices.append(invoice)
+
+    db.session.add_all(invoices)
+    db.session.flush()
+    return invoices, invoiced
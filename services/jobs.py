@@ -0,0 +1,383 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import importlib
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+
+from sqlalchemy import and_, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+# Import the database extension
+from extensions import db
+# Import models from the parent package
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+# Modules whose @job handlers must be registered before a worker starts
+JOB_MODULES = [
+    'services.archival',
+    'services.dashboard',
+    'services.images',
+    'services.notifications',
+    'services.ordering',
+    'services.related',
+    'services.views',
+]
+
+# A running job whose worker has been silent this long is handed out again
+VISIBILITY_TIMEOUT = timedelta(minutes=15)
+# Finished jobs are kept this long for metrics, then deleted
+RETENTION = timedelta(days=1)
+
+@dataclass
+class JobType:
+    name: str
+    func: object
+    concurrency: int = 1
+    max_attempts: int = 5
+    backoff: float = 10.0
+
+_registry = {}
+
+def job(name, concurrency=1, max_attempts=5, backoff=10.0):
+    """Register a function as the handler for a job type.
+
+    The handler receives the job's payload dict and runs inside an app
+    context. concurrency caps how many jobs of this type run at once.
+    """
+    def decorator(func):
+        _registry[name] = JobType(name, func, concurrency, max_attempts, backoff)
+        return func
+    return decorator
+
+def load_job_modules():
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+    return _registry
+
+def enqueue(job_type, payload=None, delay=0, dedupe_key=None, max_attempts=None):
+    """Queue a job in the current transaction.
+
+    The job becomes visible to workers when the caller commits, so it never
+    runs against data that was rolled back. With a dedupe_key, the job is
+    skipped if an identical one is still waiting.
+    """
+    handler = _registry.get(job_type)
+    now = datetime.utcnow()
+    values = {
+        'job_type': job_type,
+        'payload': payload or {},
+        'status': 'queued',
+        'attempts': 0,
+        'max_attempts': max_attempts or (handler.max_attempts if handler else 5),
+        'dedupe_key': dedupe_key,
+        'run_at': now + timedelta(seconds=delay),
+        'created_at': now
+    }
+
+    if dedupe_key is None:
+        db.session.execute(insert(Job), [values])
+        return
+
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    db.session.execute(
+        dialect_insert(Job).values(**values).on_conflict_do_nothing(
+            index_elements=[Job.dedupe_key],
+            index_where=Job.status == 'queued'
+        )
+    )
+
+def retry_delay(job_type, attempts):
+    """Exponential backoff with jitter: backoff, 2x, 4x, ... capped at an hour."""
+    base = job_type.backoff if job_type else 10.0
+    delay = min(base * (2 ** max(attempts - 1, 0)), 3600)
+    return delay * random.uniform(0.8, 1.2)
+
+def _interval_seconds(later, earlier):
+    if db.engine.dialect.name == 'postgresql':
+        return func.extract('epoch', later - earlier)
+    return (func.julianday(later) - func.julianday(earlier)) * 86400
+
+def queue_stats(window=timedelta(hours=1)):
+    """Backlog per type (queued/running) plus latency and throughput over a window."""
+    since = datetime.utcnow() - window
+    depth = {}
+    for job_type, status, count, oldest in db.session.execute(
+        select(Job.job_type, Job.status, func.count(), func.min(Job.run_at))
+        .where(Job.status.in_(['queued', 'running']))
+        .group_by(Job.job_type, Job.status)
+    ):
+        entry = depth.setdefault(job_type, {})
+        entry[status] = count
+        if status == 'queued' and oldest is not None:
+            entry['oldest_queued_at'] = oldest.isoformat()
+
+    recent = {}
+    for job_type, status, count, latency, runtime in db.session.execute(
+        select(
+            Job.job_type,
+            Job.status,
+            func.count(),
+            func.avg(_interval_seconds(Job.started_at, Job.run_at)),
+            func.avg(_interval_seconds(Job.finished_at, Job.started_at))
+        )
+        .where(Job.status.in_(['done', 'failed']), Job.finished_at >= since)
+        .group_by(Job.job_type, Job.status)
+    ):
+        entry = recent.setdefault(job_type, {'done': 0, 'failed': 0})
+        entry[status] = count
+        if status == 'done':
+            entry['avg_queue_latency_seconds'] = round(float(latency or 0), 3)
+            entry['avg_run_seconds'] = round(float(runtime or 0), 3)
+            entry['throughput_per_minute'] = round(count / (window.total_seconds() / 60), 3)
+
+    return {'depth': depth, 'recent': recent, 'window_seconds': int(window.total_seconds())}
+
+class Worker:
+    """Polls the jobs table and runs handlers on a thread pool."""
+
+    def __init__(self, app, concurrency=4, job_types=None, poll_interval=1.0, max_poll_interval=5.0, name=None):
+        self.app = app
+        self.concurrency = concurrency
+        self.job_types = job_types
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}:{id(self):x}'
+        self.stop_event = threading.Event()
+        self.stats = {'claimed': 0, 'done': 0, 'retried': 0, 'superseded': 0, 'failed': 0}
+        self._running = {}
+        self._lock = threading.Lock()
+        self._last_housekeeping = 0.0
+
+    def _free_slots(self, registry):
+        """How many more jobs of each type this worker may claim right now."""
+        running_everywhere = dict(db.session.execute(
+            select(Job.job_type, func.count()).where(Job.status == 'running').group_by(Job.job_type)
+        ).all())
+        db.session.rollback()
+
+        with self._lock:
+            free_threads = self.concurrency - sum(self._running.values())
+            slots = {}
+            for name, job_type in registry.items():
+                if self.job_types and name not in self.job_types:
+                    continue
+                # Local count is authoritative for this process; the global
+                # count keeps several workers from oversubscribing a type
+                local = job_type.concurrency - self._running.get(name, 0)
+                remote = job_type.concurrency - running_everywhere.get(name, 0)
+                available = min(local, remote, free_threads)
+                if available > 0:
+                    slots[name] = available
+        return slots
+
+    def claim(self, job_type, limit):
+        """Atomically mark up to limit due jobs as running and return them."""
+        now = datetime.utcnow()
+        candidates = (
+            select(Job.id)
+            .where(Job.status == 'queued', Job.run_at <= now, Job.job_type == job_type)
+            .order_by(Job.run_at, Job.id)
+            .limit(limit)
+        )
+        if db.engine.dialect.name == 'postgresql':
+            # Concurrent workers skip rows another worker is claiming
+            candidates = candidates.with_for_update(skip_locked=True)
+
+        with db.engine.begin() as connection:
+            rows = connection.execute(
+                update(Job)
+                .where(Job.id.in_(candidates.scalar_subquery()))
+                .values(status='running', started_at=now, locked_by=self.name, attempts=Job.attempts + 1)
+                .returning(Job.id, Job.job_type, Job.payload, Job.attempts, Job.max_attempts, Job.dedupe_key)
+            ).all()
+        return rows
+
+    def _requeue(self, job_id, dedupe_key, run_at, last_error, *conditions):
+        """Put a job back in the queue; returns 'retried', 'superseded' or None.
+
+        Only one queued job may hold a dedupe_key. If an identical job was
+        enqueued while this one ran, that one is kept, due no later than this
+        retry would have been, and this row is closed as done. None when
+        conditions no longer match the row.
+        """
+        now = datetime.utcnow()
+        this_job = update(Job).where(Job.id == job_id, *conditions)
+        # A duplicate can be enqueued between the check and the update; the
+        # second pass then sees it
+        for attempt in range(2):
+            try:
+                with db.engine.begin() as connection:
+                    waiting = None
+                    if dedupe_key is not None:
+                        waiting = connection.execute(
+                            select(Job.id, Job.run_at)
+                            .where(Job.status == 'queued', Job.dedupe_key == dedupe_key, Job.id != job_id)
+                        ).first()
+                    if waiting is None:
+                        updated = connection.execute(this_job.values(
+                            status='queued', started_at=None, finished_at=None, locked_by=None,
+                            run_at=run_at, last_error=last_error
+                        )).rowcount
+                        return 'retried' if updated else None
+                    updated = connection.execute(this_job.values(
+                        status='done', finished_at=now, locked_by=None, last_error=last_error
+                    )).rowcount
+                    if updated and run_at < waiting.run_at:
+                        connection.execute(update(Job).where(Job.id == waiting.id).values(run_at=run_at))
+                    return 'superseded' if updated else None
+            except IntegrityError:
+                if attempt:
+                    raise
+
+    def _finish(self, row, error=None):
+        now = datetime.utcnow()
+        if error is not None and row.attempts < row.max_attempts:
+            run_at = now + timedelta(seconds=retry_delay(_registry.get(row.job_type), row.attempts))
+            return self._requeue(row.id, row.dedupe_key, run_at, error)
+
+        values = {'finished_at': now, 'locked_by': None}
+        if error is None:
+            values['status'] = 'done'
+            outcome = 'done'
+        else:
+            values.update(status='failed', last_error=error)
+            outcome = 'failed'
+
+        with db.engine.begin() as connection:
+            connection.execute(update(Job).where(Job.id == row.id).values(**values))
+        return outcome
+
+    def execute(self, row):
+        job_type = _registry.get(row.job_type)
+        error = None
+        with self.app.app_context():
+            try:
+                if job_type is None:
+                    raise LookupError(f'No handler registered for job type {row.job_type!r}')
+                job_type.func(row.payload or {})
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                error = traceback.format_exc(limit=20)
+                logger.warning('Job %s (%s) failed on attempt %s', row.id, row.job_type, row.attempts)
+
+            outcome = None
+            try:
+                outcome = self._finish(row, error)
+            except Exception:
+                # The row stays 'running'; housekeeping hands it out again
+                # after VISIBILITY_TIMEOUT
+                logger.exception('Could not record the outcome of job %s (%s)', row.id, row.job_type)
+            finally:
+                db.session.remove()
+                with self._lock:
+                    self._running[row.job_type] -= 1
+                    if outcome is not None:
+                        self.stats[outcome] += 1
+
+    def housekeeping(self):
+        """Requeue jobs abandoned by dead workers and drop old finished jobs."""
+        now = datetime.utcnow()
+        abandoned = (Job.status == 'running', Job.started_at < now - VISIBILITY_TIMEOUT)
+        with db.engine.begin() as connection:
+            rows = connection.execute(
+                select(Job.id, Job.job_type, Job.attempts, Job.max_attempts, Job.dedupe_key).where(*abandoned)
+            ).all()
+        for row in rows:
+            error = f'Abandoned by its worker on attempt {row.attempts}'
+            try:
+                if row.attempts >= row.max_attempts:
+                    with db.engine.begin() as connection:
+                        connection.execute(
+                            update(Job).where(Job.id == row.id, *abandoned)
+                            .values(status='failed', finished_at=now, locked_by=None, last_error=error)
+                        )
+                else:
+                    self._requeue(row.id, row.dedupe_key, now, error, *abandoned)
+            except Exception:
+                logger.exception('Could not requeue abandoned job %s (%s)', row.id, row.job_type)
+
+        with db.engine.begin() as connection:
+            connection.execute(
+                delete(Job).where(and_(Job.status.in_(['done', 'failed']), Job.finished_at < now - RETENTION))
+            )
+
+    def run_once(self, pool=None):
+        """Claim and run what is due; returns the number of jobs started."""
+        registry = load_job_modules()
+        started = 0
+        with self.app.app_context():
+            if time.monotonic() - self._last_housekeeping > 60:
+                self.housekeeping()
+                self._last_housekeeping = time.monotonic()
+
+            for name, available in self._free_slots(registry).items():
+                rows = self.claim(name, available)
+                for row in rows:
+                    with self._lock:
+                        self._running[name] = self._running.get(name, 0) + 1
+                        self.stats['claimed'] += 1
+                    if pool is None:
+                        self.execute(row)
+                    else:
+                        pool.submit(self.execute, row)
+                    started += 1
+            db.session.remove()
+        return started
+
+    def run(self):
+        """Poll until stop() is called, backing off while the queue is idle."""
+        interval = self.poll_interval
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job') as pool:
+            while not self.stop_event.is_set():
+                try:
+                    started = self.run_once(pool)
+                except Exception:
+                    logger.exception('Job worker poll failed')
+                    started = 0
+                interval = self.poll_interval if started else min(interval * 2, self.max_poll_interval)
+                self.stop_event.wait(interval)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def start_in_thread(self):
+        thread = threading.Thread(target=self.run, name='job-worker', daemon=True)
+        thread.start()
+        return thread
+
+_embedded_worker = None
+_embedded_lock = threading.Lock()
+
+def init_app(app):
+    """Run an in-process worker in each web process when no dedicated worker is deployed.
+
+    The thread starts on the first request, i.e. after gunicorn has forked,
+    and never inside CLI commands.
+    """
+    if not app.config.get('JOBS_EMBEDDED_WORKER'):
+        return
+
+    @app.before_request
+    def start_embedded_worker():
+        global _embedded_worker
+        if _embedded_worker is not None or app.config.get('TESTING'):
+            return
+        with _embedded_lock:
+            if _embedded_worker is None:
+                _embedded_worker = Worker(app, concurrency=app.config['JOBS_EMBEDDED_CONCURRENCY'], poll_interval=2.0)
+                _embedded_worker.start_in_thread()
+
+def embedded_worker():
+    return _embedded_worker
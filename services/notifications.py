@@ -0,0 +1,161 @@
+from datetime import datetime
+from email.message import EmailMessage
+import json
+import os
+import smtplib
+import urllib.request
+
+from flask import current_app
+from sqlalchemy import select, update
+
+# Import the database extension
+from extensions import db
+# Import request tracing
+import tracing
+# Import models from the parent package
+from models import Contact
+# Import the background job framework
+from services.jobs import enqueue, job
+
+class SMTPTransport:
+    """Send the digest as a plain-text email."""
+
+    def __init__(self, config):
+        self.config = config
+
+    def send(self, digest):
+        config = self.config
+        message = EmailMessage()
+        message['Subject'] = digest['subject']
+        message['From'] = config['NOTIFY_EMAIL_FROM']
+        message['To'] = config['NOTIFY_EMAIL_TO']
+        message['X-Digest-Id'] = digest['id']
+        message.set_content(digest['text'])
+
+        with smtplib.SMTP(config['SMTP_HOST'], config['SMTP_PORT'], timeout=config['NOTIFY_TIMEOUT']) as smtp:
+            if config['SMTP_USE_TLS']:
+                smtp.starttls()
+            if config['SMTP_USERNAME']:
+                smtp.login(config['SMTP_USERNAME'], config['SMTP_PASSWORD'])
+            smtp.send_message(message)
+
+class WebhookTransport:
+    """POST the digest as JSON; any non-2xx response raises and is retried."""
+
+    def __init__(self, config):
+        self.config = config
+
+    def send(self, digest):
+        request = urllib.request.Request(
+            self.config['NOTIFY_WEBHOOK_URL'],
+            data=json.dumps(digest).encode('utf-8'),
+            headers=tracing.inject_headers({'Content-Type': 'application/json', 'X-Digest-Id': digest['id']}),
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.config['NOTIFY_TIMEOUT']):
+            pass
+
+class OutboxTransport:
+    """Write each digest to a JSON file; a stand-in for development and tests."""
+
+    def __init__(self, config):
+        self.directory = config['NOTIFY_OUTBOX_DIR']
+
+    def send(self, digest):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"digest-{digest['id']}.json")
+        temporary = path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(digest, f, indent=2)
+        os.replace(temporary, path)
+
+class NullTransport:
+    """Drop notifications (contacts are still marked as notified)."""
+
+    def __init__(self, config):
+        pass
+
+    def send(self, digest):
+        pass
+
+# Selected with NOTIFY_TRANSPORT; register additional transports here
+TRANSPORTS = {
+    'smtp': SMTPTransport,
+    'webhook': WebhookTransport,
+    'outbox': OutboxTransport,
+    'none': NullTransport
+}
+
+def get_transport(config):
+    name = config['NOTIFY_TRANSPORT']
+    if name not in TRANSPORTS:
+        raise ValueError(f'Unknown notification transport: {name}')
+    return TRANSPORTS[name](config)
+
+def contact_created():
+    """Schedule a digest for new contacts; call before committing the contact.
+
+    Every submission inside the digest window shares the same queued job, so a
+    burst of submissions results in one notification.
+    """
+    enqueue(
+        'contact_digest',
+        delay=current_app.config['NOTIFY_DIGEST_WINDOW'],
+        dedupe_key='contact_digest'
+    )
+
+def build_digest(contacts):
+    """Subject, plain-text body and structured entries for a batch of contacts."""
+    count = len(contacts)
+    subject = 'New contact form submission' if count == 1 else f'{count} new contact form submissions'
+    entries = [
+        {
+            'id': contact.id,
+            'name': contact.name,
+            'email': contact.email,
+            'message': contact.message,
+            'created_at': contact.created_at.isoformat() if contact.created_at else None
+        }
+        for contact in contacts
+    ]
+    text = '\n\n'.join(
+        f"From: {entry['name']} <{entry['email']}>\nReceived: {entry['created_at']}\n\n{entry['message']}"
+        for entry in entries
+    )
+    return {
+        # Stable for a given batch, so receivers can drop duplicates after a retry
+        'id': f'{contacts[0].id}-{contacts[-1].id}',
+        'subject': subject,
+        'text': text,
+        'contacts': entries
+    }
+
+@job('contact_digest', concurrency=1, max_attempts=8, backoff=30.0)
+def send_contact_digest(payload):
+    """Send one digest of unnotified contacts and mark them notified.
+
+    If the transport fails, the job raises and is retried with backoff while
+    the contacts stay unnotified.
+    """
+    config = current_app.config
+    limit = config['NOTIFY_DIGEST_MAX']
+    contacts = db.session.execute(
+        select(Contact)
+        .where(Contact.notified_at.is_(None), Contact.deleted_at.is_(None))
+        .order_by(Contact.id)
+        .limit(limit + 1)
+    ).scalars().all()
+    if not contacts:
+        return
+
+    batch = contacts[:limit]
+    get_transport(config).send(build_digest(batch))
+
+    db.session.execute(
+        update(Contact)
+        .where(Contact.id.in_([contact.id for contact in batch]))
+        .values(notified_at=datetime.utcnow())
+    )
+    if len(contacts) > limit:
+        # Backlog larger than one digest: send the rest right away
+        enqueue('contact_digest', dedupe_key='contact_digest')
@@ -0,0 +1,190 @@
+"""
+Manual project order with fractional (lexicographic) keys.
+
+projects.sort_key holds a base62 string; the portfolio lists live projects
+by it. Moving a project gives it a key between its new neighbours' keys, so
+a move rewrites one row however many projects there are. Keys use the
+digits 0-9A-Za-z, which sort the same in Python, SQLite and Postgres under
+the C collation, and never end in '0', so a key always exists between any
+two of them.
+
+Repeated moves into the same gap make keys longer, one character per about
+six moves. When a move produces a key longer than SORT_KEY_MAX_LENGTH, the
+rebalance_sort_keys job rewrites every live key, evenly spaced and as short
+as the number of projects allows, keeping the order.
+"""
+from flask import current_app
+from sqlalchemy import cast, func, literal, select, update
+
+# Import the database extension
+from extensions import db
+# Import cross-worker cache invalidation
+import cache
+# Import models from the parent package
+from models import Project
+# Import the background job framework
+from services.jobs import enqueue, job
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+_VALUES = {digit: value for value, digit in enumerate(DIGITS)}
+# Spare room left between rebalanced keys, in units of their last digit
+REBALANCE_GAP = BASE
+
+def key_between(before, after):
+    """A key sorting strictly between before and after; None for either end."""
+    before = before or ''
+    if after is not None and before >= after:
+        raise ValueError(f'{before!r} does not sort before {after!r}')
+    return _midpoint(before, after)
+
+def _midpoint(low, high):
+    # low may be '', high None stands for the end; neither ends in '0'
+    if high is not None:
+        # Keep the shared prefix; low is padded with zeros to compare
+        shared = 0
+        while shared < len(high) and (low[shared] if shared < len(low) else '0') == high[shared]:
+            shared += 1
+        if shared:
+            return high[:shared] + _midpoint(low[shared:], high[shared:])
+    low_digit = _VALUES[low[0]] if low else 0
+    high_digit = _VALUES[high[0]] if high is not None else BASE
+    if high_digit - low_digit > 1:
+        return DIGITS[(low_digit + high_digit) // 2]
+    # Adjacent first digits: high's first digit alone still sorts above low
+    if high is not None and len(high) > 1:
+        return high[:1]
+    return DIGITS[low_digit] + _midpoint(low[1:], None)
+
+def key_after(key):
+    """A short key after key, for appending: bump the first digit that can be."""
+    if not key:
+        return key_between(None, None)
+    for position, digit in enumerate(key):
+        if _VALUES[digit] < BASE - 1:
+            return key[:position] + DIGITS[_VALUES[digit] + 1]
+    return key_between(key, None)
+
+def spread_keys(count):
+    """count keys in order, evenly spaced and of the same, smallest useful length."""
+    width = 1
+    while BASE ** width < (count + 1) * REBALANCE_GAP:
+        width += 1
+    step = BASE ** width // (count + 1)
+    keys = []
+    for index in range(1, count + 1):
+        value = step * index
+        digits = []
+        for _ in range(width):
+            value, remainder = divmod(value, BASE)
+            digits.append(DIGITS[remainder])
+        # Trailing zeros change nothing about the order
+        keys.append(''.join(reversed(digits)).rstrip('0'))
+    return keys
+
+def live_projects():
+    return Project.deleted_at.is_(None)
+
+def last_key():
+    return db.session.execute(select(func.max(Project.sort_key)).where(live_projects())).scalar()
+
+def next_key():
+    """Key for a project added at the end of the order."""
+    return key_after(last_key())
+
+def key_taken(key, exclude_id=None):
+    query = select(Project.id).where(live_projects(), Project.sort_key == key)
+    if exclude_id is not None:
+        query = query.where(Project.id != exclude_id)
+    return db.session.execute(query.limit(1)).first() is not None
+
+def _neighbour_key(key, moving_id, direction):
+    """Key of the live project next to key (direction 'after' or 'before'), skipping moving_id."""
+    if direction == 'after':
+        condition, order = Project.sort_key > key, Project.sort_key
+    else:
+        condition, order = Project.sort_key < key, Project.sort_key.desc()
+    return db.session.execute(
+        select(Project.sort_key)
+        .where(live_projects(), condition, Project.id != moving_id)
+        .order_by(order)
+        .limit(1)
+    ).scalar()
+
+def move(project, after=None, before=None, to_start=False):
+    """Give project a key right after `after`, right before `before`, or at an end.
+
+    after and before are Projects; with neither, the project goes to the end,
+    or to the start with to_start. Returns the new key.
+    """
+    if after is not None:
+        if after.id == project.id:
+            return project.sort_key
+        low, high = after.sort_key, _neighbour_key(after.sort_key, project.id, 'after')
+    elif before is not None:
+        if before.id == project.id:
+            return project.sort_key
+        low, high = _neighbour_key(before.sort_key, project.id, 'before'), before.sort_key
+    elif to_start:
+        low, high = None, db.session.execute(
+            select(func.min(Project.sort_key)).where(live_projects(), Project.id != project.id)
+        ).scalar()
+    else:
+        low = db.session.execute(
+            select(func.max(Project.sort_key)).where(live_projects(), Project.id != project.id)
+        ).scalar()
+        return _assign(project, key_after(low))
+    return _assign(project, key_between(low, high))
+
+def _assign(project, key):
+    # Keep updated_at as is: reordering is not an edit
+    db.session.execute(
+        update(Project)
+        .where(Project.id == project.id)
+        .values(sort_key=key, updated_at=project.updated_at)
+    )
+    return key
+
+def needs_rebalance(key):
+    return len(key) > current_app.config['SORT_KEY_MAX_LENGTH']
+
+def rebalance():
+    """Rewrite the keys of all live projects, evenly spaced in their current order; returns how many changed."""
+    rows = db.session.execute(
+        select(Project.id, Project.sort_key, Project.updated_at)
+        .where(live_projects())
+        .order_by(Project.sort_key, Project.id)
+        .with_for_update()
+    ).all()
+    keys = spread_keys(len(rows))
+    changes = [
+        {'id': row.id, 'sort_key': key, 'updated_at': row.updated_at}
+        for row, key in zip(rows, keys)
+        if row.sort_key != key
+    ]
+    if not changes:
+        return 0
+    # Park the rows on keys outside the base62 range first, so no update
+    # collides with a key that another row still holds (the index is unique)
+    changed_ids = [change['id'] for change in changes]
+    db.session.execute(
+        update(Project)
+        .where(Project.id.in_(changed_ids))
+        .values(sort_key=literal('~', db.String) + cast(Project.id, db.String), updated_at=Project.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(update(Project), changes)
+    cache.invalidate('projects')
+    return len(changes)
+
+def schedule_rebalance():
+    """Queue a rebalance in the current transaction, unless one is waiting."""
+    enqueue('rebalance_sort_keys', delay=5.0, dedupe_key='rebalance_sort_keys')
+
+@job('rebalance_sort_keys', concurrency=1)
+def rebalance_sort_keys_job(payload):
+    longest = db.session.execute(
+        select(func.max(func.length(Project.sort_key))).where(live_projects())
+    ).scalar()
+    if longest and longest > current_app.config['SORT_KEY_MAX_LENGTH']:
+        rebalance()
@@ -0,0 +1,301 @@
+"""
+Related projects, precomputed from tag and description similarity.
+
+The similarity of two projects is the Jaccard index of their tag sets,
+blended with the cosine similarity of TF-IDF vectors of their descriptions
+when RELATED_TEXT_WEIGHT is above zero. Only pairs that share a tag or a
+term can score above zero, so a project's scores are accumulated through
+inverted indexes (tag -> projects, term -> projects). This is the sparse
+product of the project x tag incidence matrix with its transpose, and the
+dense projects x projects matrix is never built. The top RELATED_TOP_K
+neighbours of each project are stored in project_neighbors, and
+/api/projects/<slug>/related reads them.
+
+Each project's description term counts are kept in project_terms, an
+inverted index in the database. When one project changes, only the
+projects that listed it, or now share a tag or term with it, have their
+rows recomputed, and only they and the projects sharing a tag or term with
+them are loaded. The document frequencies come from project_terms too, so
+those rows match a full rebuild; rows of other projects drift slightly as
+descriptions change the frequencies, until `flask rebuild-related`
+recomputes every row.
+"""
+from collections import Counter, defaultdict
+import heapq
+import math
+import re
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, select
+
+# Import the database extension
+from extensions import db
+# Import cross-worker cache invalidation
+import cache
+# Import models from the parent package
+from models import Project, ProjectNeighbor, ProjectTerm, project_tags
+# Import the background job framework
+from services.jobs import enqueue, job
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.-]*[a-z0-9+#]|[a-z0-9]')
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or so such that the their
+this to was were will with using used use built based can our your you we which also than then
+""".split())
+# Terms in more than this share of descriptions carry little signal and
+# would make their posting lists as long as the table
+MAX_DOCUMENT_FREQUENCY = 0.5
+# Longer tokens are not words (hashes, URLs) and would not fit project_terms
+MAX_TERM_LENGTH = 64
+# Writes are chunked to keep IN lists and statements small
+CHUNK = 500
+# Past this many changed projects, one full rebuild beats separate updates
+BULK_REBUILD_THRESHOLD = 20
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall((text or '').lower())
+            if 2 < len(token) <= MAX_TERM_LENGTH and token not in STOPWORDS]
+
+def _too_common(frequency, total):
+    return total >= 20 and frequency > MAX_DOCUMENT_FREQUENCY * total
+
+def _live():
+    return Project.deleted_at.is_(None)
+
+def _live_tags(project_ids=None):
+    """{project_id: set of tag ids} for live projects (all, or those in project_ids)."""
+    query = (
+        select(project_tags.c.project_id, project_tags.c.tag_id)
+        .join(Project, Project.id == project_tags.c.project_id)
+        .where(_live())
+    )
+    if project_ids is not None:
+        query = query.where(project_tags.c.project_id.in_(project_ids))
+    tags = defaultdict(set)
+    for project_id, tag_id in db.session.execute(query):
+        tags[project_id].add(tag_id)
+    return tags
+
+def _live_count():
+    return db.session.execute(select(func.count()).select_from(Project).where(_live())).scalar()
+
+def _document_frequency(terms):
+    """{term: number of live projects whose description uses it}."""
+    return dict(db.session.execute(
+        select(ProjectTerm.term, func.count())
+        .join(Project, Project.id == ProjectTerm.project_id)
+        .where(_live(), ProjectTerm.term.in_(terms))
+        .group_by(ProjectTerm.term)
+    ).all())
+
+def _sharing(project_ids, text_weight):
+    """Live projects sharing a tag, or a term that is not too common, with one of project_ids."""
+    shared = set(db.session.execute(
+        select(project_tags.c.project_id).distinct()
+        .join(Project, Project.id == project_tags.c.project_id)
+        .where(_live(), project_tags.c.tag_id.in_(
+            select(project_tags.c.tag_id).where(project_tags.c.project_id.in_(project_ids))
+        ))
+    ).scalars())
+    if text_weight > 0:
+        terms = set(db.session.execute(
+            select(ProjectTerm.term).where(ProjectTerm.project_id.in_(project_ids))
+        ).scalars())
+        if terms:
+            total = _live_count()
+            terms = [term for term, frequency in _document_frequency(terms).items()
+                     if not _too_common(frequency, total)]
+            shared.update(db.session.execute(
+                select(ProjectTerm.project_id).distinct()
+                .join(Project, Project.id == ProjectTerm.project_id)
+                .where(_live(), ProjectTerm.term.in_(terms))
+            ).scalars())
+    return shared
+
+class SimilarityIndex:
+    def __init__(self, tags, counts, text_weight=0.0, document_frequency=None, total=None):
+        """tags: {project_id: set of tag ids}; counts: {project_id: Counter of description terms}.
+
+        Document frequencies and the number of projects are taken from counts
+        unless given, as they are for an index of part of the projects.
+        """
+        self.text_weight = text_weight
+        self.counts = counts
+        self.projects = set(tags) | set(counts)
+        self.tags = {project_id: frozenset(tag_ids) for project_id, tag_ids in tags.items()}
+        self.by_tag = defaultdict(set)
+        for project_id, tag_ids in self.tags.items():
+            for tag_id in tag_ids:
+                self.by_tag[tag_id].add(project_id)
+
+        self.vectors = {}
+        self.by_term = defaultdict(dict)
+        if text_weight > 0:
+            if document_frequency is None:
+                document_frequency = Counter(term for terms in counts.values() for term in terms)
+            self._build_text_index(counts, document_frequency, len(counts) if total is None else total)
+
+    def _build_text_index(self, counts, document_frequency, total):
+        for project_id, terms in counts.items():
+            vector = {}
+            for term, count in terms.items():
+                frequency = document_frequency[term]
+                if _too_common(frequency, total):
+                    continue
+                vector[term] = count * math.log((1 + total) / (1 + frequency))
+            norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+            if not norm:
+                continue
+            vector = {term: weight / norm for term, weight in vector.items()}
+            self.vectors[project_id] = vector
+            for term, weight in vector.items():
+                self.by_term[term][project_id] = weight
+
+    @classmethod
+    def load(cls, text_weight=0.0):
+        """Build the index from all live projects, tokenizing their descriptions."""
+        counts = {
+            project_id: Counter(tokenize(description))
+            for project_id, description in db.session.execute(
+                select(Project.id, Project.description).where(_live())
+            )
+        }
+        tags = _live_tags()
+        for project_id in counts:
+            tags.setdefault(project_id, set())
+        return cls(tags, counts, text_weight)
+
+    @classmethod
+    def load_around(cls, project_ids, text_weight=0.0):
+        """Build the index of project_ids and the projects sharing a tag or term with them.
+
+        That is every project top() can return for project_ids, so their rows
+        come out as from a full index. Term counts come from project_terms.
+        """
+        live = set(db.session.execute(select(Project.id).where(Project.id.in_(project_ids), _live())).scalars())
+        members = live | _sharing(live, text_weight) if live else set()
+        tags = _live_tags(members)
+        for project_id in members:
+            tags.setdefault(project_id, set())
+        if text_weight <= 0:
+            return cls(tags, {}, text_weight)
+
+        counts = {project_id: Counter() for project_id in members}
+        for project_id, term, count in db.session.execute(
+            select(ProjectTerm.project_id, ProjectTerm.term, ProjectTerm.count)
+            .where(ProjectTerm.project_id.in_(members))
+        ):
+            counts[project_id][term] = count
+        terms = {term for terms in counts.values() for term in terms}
+        frequency = Counter(_document_frequency(terms)) if terms else Counter()
+        return cls(tags, counts, text_weight, frequency, _live_count())
+
+    def scores(self, project_id):
+        """Similarity of project_id to every project it shares a tag or term with."""
+        scores = {}
+        own_tags = self.tags.get(project_id, frozenset())
+        shared = Counter()
+        for tag_id in own_tags:
+            shared.update(self.by_tag[tag_id])
+        shared.pop(project_id, None)
+        tag_weight = 1.0 - self.text_weight
+        for other, common in shared.items():
+            scores[other] = tag_weight * common / (len(own_tags) + len(self.tags[other]) - common)
+
+        if self.text_weight > 0:
+            dots = defaultdict(float)
+            for term, weight in self.vectors.get(project_id, {}).items():
+                for other, other_weight in self.by_term[term].items():
+                    dots[other] += weight * other_weight
+            dots.pop(project_id, None)
+            for other, dot in dots.items():
+                scores[other] = scores.get(other, 0.0) + self.text_weight * dot
+        return scores
+
+    def top(self, project_id, k):
+        """[(neighbor_id, score)] best first; ties go to the older project."""
+        best = heapq.nlargest(k, ((score, -other) for other, score in self.scores(project_id).items() if score > 0))
+        return [(-negative_id, score) for score, negative_id in best]
+
+def _replace_rows(project_ids, index, k):
+    project_ids = sorted(project_ids)
+    for start in range(0, len(project_ids), CHUNK):
+        chunk = project_ids[start:start + CHUNK]
+        db.session.execute(delete(ProjectNeighbor).where(ProjectNeighbor.project_id.in_(chunk)))
+        rows = [
+            {'project_id': project_id, 'rank': rank, 'neighbor_id': neighbor_id, 'score': round(score, 6)}
+            for project_id in chunk if project_id in index.projects
+            for rank, (neighbor_id, score) in enumerate(index.top(project_id, k))
+        ]
+        if rows:
+            db.session.execute(insert(ProjectNeighbor), rows)
+    cache.invalidate('related')
+
+def _store_terms(counts):
+    """Replace the project_terms rows of the projects in counts ({project_id: Counter})."""
+    project_ids = sorted(counts)
+    for start in range(0, len(project_ids), CHUNK):
+        chunk = project_ids[start:start + CHUNK]
+        db.session.execute(delete(ProjectTerm).where(ProjectTerm.project_id.in_(chunk)))
+        rows = [
+            {'project_id': project_id, 'term': term, 'count': count}
+            for project_id in chunk for term, count in counts[project_id].items()
+        ]
+        if rows:
+            db.session.execute(insert(ProjectTerm), rows)
+
+def rebuild_all():
+    """Recompute every project's terms and neighbours; returns the number of projects."""
+    config = current_app.config
+    index = SimilarityIndex.load(config['RELATED_TEXT_WEIGHT'])
+    db.session.execute(delete(ProjectTerm))
+    _store_terms(index.counts)
+    db.session.execute(delete(ProjectNeighbor))
+    _replace_rows(index.projects, index, config['RELATED_TOP_K'])
+    return len(index.projects)
+
+def update_project(project_id):
+    """Recompute the rows a change to one project can affect; returns how many."""
+    config = current_app.config
+    text_weight = config['RELATED_TEXT_WEIGHT']
+    if db.session.execute(select(ProjectTerm.project_id).limit(1)).first() is None:
+        # project_terms was never filled (new table): build everything once
+        return rebuild_all()
+
+    description = db.session.execute(
+        select(Project.description).where(Project.id == project_id, _live())
+    ).scalar()
+    live = description is not None
+    _store_terms({project_id: Counter(tokenize(description)) if live else Counter()})
+
+    # Rows that list the project may lose it or reorder; rows of projects
+    # it is now similar to may gain it. No other row can change.
+    affected = {project_id}
+    affected.update(db.session.execute(
+        select(ProjectNeighbor.project_id).where(ProjectNeighbor.neighbor_id == project_id)
+    ).scalars())
+    if live:
+        affected.update(_sharing({project_id}, text_weight))
+    index = SimilarityIndex.load_around(affected, text_weight)
+    _replace_rows(affected, index, config['RELATED_TOP_K'])
+    return len(affected)
+
+def schedule_update(project):
+    """Queue an update of project's neighbours in the current transaction (project must be flushed)."""
+    enqueue('related_update', {'project_id': project.id}, delay=2.0, dedupe_key=f'related:{project.id}')
+
+def schedule_updates(project_ids):
+    """Queue updates for several projects, or one full rebuild when that is cheaper."""
+    if len(project_ids) > BULK_REBUILD_THRESHOLD:
+        enqueue('related_update', {'all': True}, delay=2.0, dedupe_key='related:all')
+        return
+    for project_id in project_ids:
+        enqueue('related_update', {'project_id': project_id}, delay=2.0, dedupe_key=f'related:{project_id}')
+
+# One at a time: updates of different projects can touch the same rows
+@job('related_update', concurrency=1)
+def related_update_job(payload):
+    if payload.get('all'):
+        rebuild_all()
+    else:
+        update_project(payload['project_id'])
@@ -0,0 +1,107 @@
+import hashlib
+import html
+import math
+import re
+
+# Bump when the rendering output changes so stored HTML is regenerated
+RENDERER_VERSION = '1'
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 200
+
+MARKDOWN_EXTENSIONS = ['toc', 'fenced_code', 'tables', 'sane_lists']
+
+ALLOWED_TAGS = {
+    'a', 'abbr', 'b', 'blockquote', 'br', 'code', 'del', 'em', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 'strong', 'sub',
+    'sup', 'table', 'tbody', 'td', 'th', 'thead', 'tr', 'ul'
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'abbr': {'title'},
+    'code': {'class'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'td': {'align'},
+    'th': {'align'},
+    **{f'h{level}': {'id'} for level in range(1, 7)}
+}
+
+PARAGRAPH_RE = re.compile(r'<p>(.*?)</p>', re.S)
+TAG_RE = re.compile(r'<[^>]+>')
+
+def content_hash(content):
+    """Hash of the markdown source plus renderer version."""
+    digest = hashlib.sha256()
+    digest.update(RENDERER_VERSION.encode())
+    digest.update(b'\0')
+    digest.update((content or '').encode('utf-8'))
+    return digest.hexdigest()
+
+def _simplify_toc(tokens):
+    return [
+        {
+            'id': token['id'],
+            'title': html.unescape(token['name']),
+            'level': token['level'],
+            'children': _simplify_toc(token['children'])
+        }
+        for token in tokens
+    ]
+
+def _plain_text(fragment):
+    return html.unescape(TAG_RE.sub('', fragment))
+
+def _excerpt(safe_html):
+    text = ' '.join(_plain_text(p) for p in PARAGRAPH_RE.findall(safe_html))
+    text = ' '.join(text.split())
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    cut = text[:EXCERPT_LENGTH].rsplit(' ', 1)[0]
+    return cut.rstrip(',.;:') + '…'
+
+def render_markdown(content):
+    """Render markdown to sanitized HTML plus table of contents, excerpt and reading time.
+
+    Pure function of its input so it can run in a process pool.
+    """
+    if not content:
+        return {
+            'content_html': None,
+            'content_toc': [],
+            'content_excerpt': None,
+            'reading_time': 0,
+            'content_hash': content_hash(content)
+        }
+
+    import markdown
+    import nh3
+
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    raw_html = md.convert(content)
+    safe_html = nh3.clean(
+        raw_html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        url_schemes={'http', 'https', 'mailto'},
+        link_rel='noopener noreferrer'
+    )
+
+    words = len(_plain_text(safe_html).split())
+    return {
+        'content_html': safe_html,
+        'content_toc': _simplify_toc(md.toc_tokens),
+        'content_excerpt': _excerpt(safe_html),
+        'reading_time': max(1, math.ceil(words / WORDS_PER_MINUTE)),
+        'content_hash': content_hash(content)
+    }
+
+def apply_rendering(project, force=False):
+    """Refresh a project's pre-rendered columns if its content changed.
+
+    Returns True when the project was re-rendered.
+    """
+    if not force and project.content_hash == content_hash(project.content):
+        return False
+
+    for column, value in render_markdown(project.content).items():
+        setattr(project, column, value)
+    return True
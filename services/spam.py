@@ -0,0 +1,189 @@
+from collections import OrderedDict, deque
+import hashlib
+import re
+import threading
+import time
+
+# Rejections that get a normal success response, so bots learn nothing
+SILENT_REASONS = {'honeypot', 'too_fast', 'duplicate'}
+
+WORD_RE = re.compile(r'\w+')
+
+MINHASH_BANDS = 4
+MINHASH_ROWS = 4
+SHINGLE_SIZE = 3
+MAX_SHINGLE_WORDS = 300
+# Shorter messages ("hi", "thanks!") from different senders would share
+# bands, so they are not checked for duplicates
+MIN_DUPLICATE_WORDS = 6
+
+# One XOR mask per MinHash function: h ^ seed permutes the 64-bit hash space
+# and costs a single integer op per shingle
+SEEDS = [
+    int.from_bytes(hashlib.blake2b(f'minhash-{i}'.encode(), digest_size=8).digest(), 'big')
+    for i in range(MINHASH_BANDS * MINHASH_ROWS)
+]
+
+def _hash64(value):
+    # The filter lives in one process, so the salted built-in hash is fine
+    # and much cheaper than a cryptographic digest
+    return hash(value) & 0xFFFFFFFFFFFFFFFF
+
+def minhash_bands(text):
+    """LSH band keys of a message: near-duplicates share at least one band.
+
+    Empty for messages under MIN_DUPLICATE_WORDS words.
+    """
+    words = WORD_RE.findall(text.lower())[:MAX_SHINGLE_WORDS]
+    if len(words) < MIN_DUPLICATE_WORDS:
+        return []
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    hashes = [_hash64(shingle) for shingle in shingles]
+
+    signature = [min(map(seed.__xor__, hashes)) for seed in SEEDS]
+    return [
+        _hash64((band, *signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]))
+        for band in range(MINHASH_BANDS)
+    ]
+
+class RollingBloomFilter:
+    """Bloom filter that forgets entries older than two rotation periods.
+
+    Two generations are kept; lookups check both and inserts go to the newest.
+    """
+
+    def __init__(self, size_bits=1 << 20, hashes=4, period=86400):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self.period = period
+        self.current = bytearray(size_bits // 8)
+        self.previous = bytearray(size_bits // 8)
+        self.rotated_at = time.monotonic()
+
+    def _positions(self, key):
+        # Double hashing: positions derived from two halves of one 64-bit key
+        h1, h2 = key & 0xFFFFFFFF, (key >> 32) | 1
+        return [(h1 + i * h2) % self.size_bits for i in range(self.hashes)]
+
+    def _rotate(self, now):
+        if now - self.rotated_at >= self.period:
+            self.previous = self.current
+            self.current = bytearray(self.size_bits // 8)
+            self.rotated_at = now
+
+    def __contains__(self, key):
+        positions = self._positions(key)
+        for bits in (self.current, self.previous):
+            if all(bits[p >> 3] & (1 << (p & 7)) for p in positions):
+                return True
+        return False
+
+    def add(self, key, now=None):
+        self._rotate(time.monotonic() if now is None else now)
+        for p in self._positions(key):
+            self.current[p >> 3] |= 1 << (p & 7)
+
+class SlidingWindowCounter:
+    """Per-key event timestamps within a window, with a bounded number of keys."""
+
+    def __init__(self, limit, window, max_keys=10000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self.events = OrderedDict()
+
+    def hit(self, key, now):
+        """Record an event; returns False when the key is over its limit."""
+        events = self.events.get(key)
+        if events is None:
+            events = self.events[key] = deque()
+            if len(self.events) > self.max_keys:
+                self.events.popitem(last=False)
+        else:
+            self.events.move_to_end(key)
+
+        while events and events[0] <= now - self.window:
+            events.popleft()
+        if len(events) >= self.limit:
+            return False
+        events.append(now)
+        return True
+
+    def release(self, key):
+        """Take back the latest event of key, for a submission that was not stored."""
+        events = self.events.get(key)
+        if events:
+            events.pop()
+
+class ContactFilter:
+    """In-memory pre-insert checks for contact submissions.
+
+    State is per process, so limits apply per gunicorn worker; that is enough
+    to stop floods without touching the database. An accepted submission
+    counts against the rate limits right away; call record() once it is
+    stored, so later copies are duplicates, or release() if storing failed,
+    so a retry is not held against the sender.
+    """
+
+    def __init__(self, config):
+        self.honeypot_field = config['CONTACT_HONEYPOT_FIELD']
+        self.min_fill_seconds = config['CONTACT_MIN_FILL_SECONDS']
+        self.by_ip = SlidingWindowCounter(config['CONTACT_IP_LIMIT'], config['CONTACT_RATE_WINDOW'])
+        self.by_email = SlidingWindowCounter(config['CONTACT_EMAIL_LIMIT'], config['CONTACT_RATE_WINDOW'])
+        self.seen = RollingBloomFilter(period=config['CONTACT_DUPLICATE_WINDOW'])
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def _count(self, reason):
+        self.counters[reason] = self.counters.get(reason, 0) + 1
+        return None if reason == 'accepted' else reason
+
+    def check(self, data, ip, now=None):
+        """Return a rejection reason for a parsed submission, or None to accept it."""
+        now = time.time() if now is None else now
+        with self.lock:
+            if data.get(self.honeypot_field):
+                return self._count('honeypot')
+
+            # Optional: the form may send when it was rendered (epoch seconds)
+            rendered_at = data.get('rendered_at')
+            if isinstance(rendered_at, (int, float)) and now - rendered_at < self.min_fill_seconds:
+                return self._count('too_fast')
+
+            if not self.by_ip.hit(ip, now):
+                return self._count('rate_ip')
+            email = str(data.get('email', '')).strip().lower()
+            if not self.by_email.hit(email, now):
+                return self._count('rate_email')
+
+            bands = minhash_bands(str(data.get('message', '')))
+            if any(band in self.seen for band in bands):
+                return self._count('duplicate')
+
+            return self._count('accepted')
+
+    def record(self, data):
+        """Remember a stored submission's message for duplicate detection."""
+        bands = minhash_bands(str(data.get('message', '')))
+        with self.lock:
+            for band in bands:
+                self.seen.add(band)
+
+    def release(self, data, ip):
+        """Undo the rate counting of an accepted submission that could not be stored."""
+        with self.lock:
+            self.by_ip.release(ip)
+            self.by_email.release(str(data.get('email', '')).strip().lower())
+            self.counters['accepted'] = self.counters.get('accepted', 1) - 1
+            self.counters['released'] = self.counters.get('released', 0) + 1
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
+
+def get_filter(app):
+    """The app's contact filter, created on first use."""
+    contact_filter = app.extensions.get('contact_filter')
+    if contact_filter is None:
+        contact_filter = app.extensions.setdefault('contact_filter', ContactFilter(app.config))
+    return contact_filter
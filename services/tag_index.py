@@ -0,0 +1,290 @@
+"""
+In-memory tag autocomplete for /api/admin/tags/suggest.
+
+Each worker process holds every tag name, weighted by the number of live
+projects using it:
+- a sorted list of lowercased names, so a prefix lookup is a bisect and a
+  range scan. One- and two-character prefixes match too many names to scan
+  per keystroke, so their best SHORT_PREFIX_TOP tags are kept ranked;
+- a trigram index (words split as pg_trgm does) for names that contain the
+  query or are close to it, used when prefix matches leave room.
+
+A background thread builds the index on first use and rebuilds it when
+tags or projects change in another process, as announced by the cache
+invalidation bus, and at least every REBUILD_INTERVAL seconds. Tags created
+or deleted in this process are applied as soon as their transaction
+commits; project counts changed in this process catch up at the next
+rebuild. Until the first build finishes, suggestions come from the
+database: the pg_trgm GIN index on Postgres, LIKE on SQLite.
+"""
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import and_, case, event, func, inspect, or_, select
+from sqlalchemy.orm import Session
+
+# Import the database extension
+from extensions import db
+# Import cross-worker cache invalidation (used here as a change signal)
+import cache
+# Import models from the parent package
+from models import Project, Tag, project_tags
+
+logger = logging.getLogger(__name__)
+
+SHORT_PREFIX = 2
+SHORT_PREFIX_TOP = 50
+# pg_trgm's default similarity threshold
+SIMILARITY_THRESHOLD = 0.3
+REBUILD_INTERVAL = 600
+# Bursts of changes share one rebuild
+REBUILD_DEBOUNCE = 1.0
+WORD_RE = re.compile(r'[^\W_]+')
+
+def trigrams(text):
+    """Trigrams of each word, padded like pg_trgm: '  w', ' wo', 'wor', 'ord', 'rd '."""
+    grams = set()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def _short_prefixes(name):
+    lowered = name.lower()
+    return [lowered[:length] for length in range(1, min(SHORT_PREFIX, len(lowered)) + 1)]
+
+class TagIndex:
+    def __init__(self, rows):
+        """rows: (id, name, project count) for every tag."""
+        self.tags = {}
+        self.by_trigram = defaultdict(set)
+        self.trigram_counts = {}
+        self.top_short = {}
+        for tag_id, name, weight in rows:
+            self.tags[tag_id] = (name, weight or 0)
+            self._index_trigrams(tag_id, name)
+        self.names = sorted((name.lower(), tag_id) for tag_id, (name, _) in self.tags.items())
+        self._rank_short({prefix for name, _ in self.tags.values() for prefix in _short_prefixes(name)})
+
+    def _index_trigrams(self, tag_id, name):
+        grams = trigrams(name)
+        self.trigram_counts[tag_id] = len(grams)
+        for gram in grams:
+            self.by_trigram[gram].add(tag_id)
+
+    def _rank_key(self, tag_id):
+        name, weight = self.tags[tag_id]
+        return (-weight, len(name), name.lower())
+
+    def _prefix_ids(self, prefix):
+        start = bisect_left(self.names, (prefix,))
+        end = bisect_left(self.names, (prefix + '\uffff',), start)
+        return (tag_id for _, tag_id in self.names[start:end])
+
+    def _rank_short(self, prefixes):
+        for prefix in prefixes:
+            best = heapq.nsmallest(SHORT_PREFIX_TOP, self._prefix_ids(prefix), key=self._rank_key)
+            if best:
+                self.top_short[prefix] = best
+            else:
+                self.top_short.pop(prefix, None)
+
+    def add(self, tag_id, name, weight=0):
+        if tag_id in self.tags:
+            return
+        self.tags[tag_id] = (name, weight)
+        insort(self.names, (name.lower(), tag_id))
+        self._index_trigrams(tag_id, name)
+        self._rank_short(_short_prefixes(name))
+
+    def remove(self, tag_id):
+        entry = self.tags.pop(tag_id, None)
+        if entry is None:
+            return
+        name = entry[0]
+        position = bisect_left(self.names, (name.lower(), tag_id))
+        if position < len(self.names) and self.names[position][1] == tag_id:
+            del self.names[position]
+        for gram in trigrams(name):
+            postings = self.by_trigram.get(gram)
+            if postings is not None:
+                postings.discard(tag_id)
+                if not postings:
+                    del self.by_trigram[gram]
+        self.trigram_counts.pop(tag_id, None)
+        self._rank_short(_short_prefixes(name))
+
+    def similar(self, query, limit, exclude=()):
+        """Ids of names whose trigram similarity to query passes the threshold, best first."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        # A name needs at least `needed` of the query's trigrams to pass, so
+        # it must have one of the rarest len - needed + 1 of them: only those
+        # postings are walked, the long ones are just probed
+        by_rarity = sorted(grams, key=lambda gram: len(self.by_trigram.get(gram, ())))
+        needed = max(1, math.ceil(SIMILARITY_THRESHOLD * len(grams)))
+        split = len(grams) - needed + 1
+        shared = Counter()
+        for gram in by_rarity[:split]:
+            shared.update(self.by_trigram.get(gram, ()))
+        for gram in by_rarity[split:]:
+            postings = self.by_trigram.get(gram, ())
+            for tag_id in shared:
+                if tag_id in postings:
+                    shared[tag_id] += 1
+        scored = []
+        for tag_id, common in shared.items():
+            if tag_id in exclude:
+                continue
+            similarity = common / (len(grams) + self.trigram_counts[tag_id] - common)
+            if similarity >= SIMILARITY_THRESHOLD:
+                scored.append((-similarity,) + self._rank_key(tag_id) + (tag_id,))
+        return [entry[-1] for entry in heapq.nsmallest(limit, scored)]
+
+    def suggest(self, query, limit):
+        """Prefix matches by weight, then similar names; [{'id', 'name', 'project_count'}]."""
+        query = query.strip().lower()
+        if not query:
+            return []
+        if len(query) <= SHORT_PREFIX:
+            ids = self.top_short.get(query, [])[:limit]
+        else:
+            ids = heapq.nsmallest(limit, self._prefix_ids(query), key=self._rank_key)
+        if len(ids) < limit and len(query) >= 3:
+            ids += self.similar(query, limit - len(ids), exclude=set(ids))
+        return [
+            {'id': tag_id, 'name': self.tags[tag_id][0], 'project_count': self.tags[tag_id][1]}
+            for tag_id in ids
+        ]
+
+_index = None
+_stale = threading.Event()
+_lock = threading.Lock()
+_builder_pid = None
+_builder_lock = threading.Lock()
+
+def _load_rows():
+    live_counts = (
+        select(project_tags.c.tag_id, func.count().label('project_count'))
+        .join(Project, and_(Project.id == project_tags.c.project_id, Project.deleted_at.is_(None)))
+        .group_by(project_tags.c.tag_id)
+        .subquery()
+    )
+    return db.session.execute(
+        select(Tag.id, Tag.name, live_counts.c.project_count)
+        .outerjoin(live_counts, live_counts.c.tag_id == Tag.id)
+    ).all()
+
+def _run_builder(app):
+    global _index
+    while True:
+        _stale.wait(REBUILD_INTERVAL)
+        _stale.clear()
+        try:
+            with app.app_context():
+                rows = _load_rows()
+            index = TagIndex(rows)
+            with _lock:
+                _index = index
+        except Exception:
+            logger.exception('Tag index build failed')
+            _stale.set()
+        time.sleep(REBUILD_DEBOUNCE)
+
+def _ensure_builder(app):
+    global _builder_pid
+    # Threads do not survive a fork, so each process builds its own index
+    if _builder_pid == os.getpid():
+        return
+    with _builder_lock:
+        if _builder_pid == os.getpid():
+            return
+        _stale.set()
+        threading.Thread(target=_run_builder, args=(app,), name='tag-index', daemon=True).start()
+        _builder_pid = os.getpid()
+
+def _on_cache_events(events):
+    namespaces = {cache.parse_event(name)[0] for name in events}
+    if namespaces & {'tags', 'projects', cache.ALL}:
+        _stale.set()
+
+cache.subscribe(_on_cache_events)
+
+def track_created(tag):
+    """Add a new (flushed or pending) tag to this process's index once its transaction commits."""
+    db.session.info.setdefault('tag_index', []).append(('add', tag, tag.name))
+
+def track_deleted(tag_id):
+    db.session.info.setdefault('tag_index', []).append(('remove', tag_id, None))
+
+@event.listens_for(Session, 'after_commit')
+def _after_commit(session):
+    pending = session.info.pop('tag_index', None)
+    if not pending or _index is None:
+        return
+    with _lock:
+        for action, value, name in pending:
+            if action == 'add':
+                # The identity survives the commit's expiry without a query
+                identity = inspect(value).identity
+                if identity:
+                    _index.add(identity[0], name)
+            else:
+                _index.remove(value)
+
+@event.listens_for(Session, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('tag_index', None)
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _suggest_from_database(query, limit):
+    query = query.strip().lower()
+    if not query:
+        return []
+    project_count = (
+        select(func.count())
+        .select_from(project_tags)
+        .join(Project, and_(Project.id == project_tags.c.project_id, Project.deleted_at.is_(None)))
+        .where(project_tags.c.tag_id == Tag.id)
+        .scalar_subquery()
+    )
+    prefix = _escape_like(query) + '%'
+    if db.engine.dialect.name == 'postgresql':
+        # Both conditions are served by the pg_trgm GIN index on tags.name
+        is_prefix = Tag.name.ilike(prefix, escape='\\')
+        matches = or_(is_prefix, Tag.name.op('%')(query))
+        rank = func.similarity(Tag.name, query).desc()
+    else:
+        is_prefix = func.lower(Tag.name).like(prefix, escape='\\')
+        matches = func.lower(Tag.name).like('%' + _escape_like(query) + '%', escape='\\')
+        rank = func.length(Tag.name)
+    rows = db.session.execute(
+        select(Tag.id, Tag.name, project_count)
+        .where(matches)
+        .order_by(case((is_prefix, 0), else_=1), project_count.desc(), rank, Tag.name)
+        .limit(limit)
+    ).all()
+    return [{'id': tag_id, 'name': name, 'project_count': count} for tag_id, name, count in rows]
+
+def suggest(query, limit):
+    """(suggestions, source): from the index once built, from the database until then."""
+    _ensure_builder(current_app._get_current_object())
+    with _lock:
+        if _index is not None:
+            return _index.suggest(query, limit), 'index'
+    return _suggest_from_database(query, limit), 'database'
+
+def warm(app):
+    """Start building this process's index without waiting for a first request."""
+    _ensure_builder(app)
@@ -0,0 +1,118 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from sqlalchemy import delete, func, select, tuple_
+
+# Import the database extension
+from extensions import db
+# Import models from the parent package
+from models import TimeLog, TimeLogRollup
+
+PERIODS = ('day', 'week', 'month')
+
+def period_start(period, day):
+    """Return the first day of the period (ISO week starting Monday) containing day."""
+    if period == 'day':
+        return day
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    raise ValueError(f'Unknown period: {period}')
+
+def _to_decimal(hours):
+    return Decimal(str(hours))
+
+def _upsert_statement():
+    """Build an INSERT ... ON CONFLICT that adds deltas to existing rollup rows."""
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = TimeLogRollup.__table__
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.project_id, table.c.period, table.c.period_start],
+        set_={
+            'hours': table.c.hours + stmt.excluded.hours,
+            'entries': table.c.entries + stmt.excluded.entries
+        }
+    )
+
+def apply_deltas(changes):
+    """Apply (project_id, date, hours_delta, entries_delta) changes to the rollups.
+
+    Changes are folded per rollup row in Python first so a bulk insert of many
+    logs costs a single executemany, regardless of how many logs share a day.
+    Must run inside the same transaction as the time log write.
+    """
+    folded = defaultdict(lambda: [Decimal('0'), 0])
+    for project_id, day, hours, entries in changes:
+        for period in PERIODS:
+            key = (project_id, period, period_start(period, day))
+            folded[key][0] += _to_decimal(hours)
+            folded[key][1] += entries
+
+    rows = [
+        {
+            'project_id': project_id,
+            'period': period,
+            'period_start': start,
+            'hours': hours,
+            'entries': entries
+        }
+        for (project_id, period, start), (hours, entries) in folded.items()
+        if hours or entries
+    ]
+    if not rows:
+        return
+
+    db.session.execute(_upsert_statement(), rows)
+
+    # Rows emptied by updates or deletes are dropped to keep the table compact;
+    # only rows that just lost entries can be empty, so only those are checked
+    shrunk = [(row['project_id'], row['period'], row['period_start']) for row in rows if row['entries'] < 0]
+    if shrunk:
+        db.session.execute(
+            delete(TimeLogRollup)
+            .where(
+                tuple_(TimeLogRollup.project_id, TimeLogRollup.period, TimeLogRollup.period_start).in_(shrunk),
+                TimeLogRollup.entries <= 0
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+def rebuild_rollups():
+    """Recompute every rollup row from the time logs (used after backfills)."""
+    db.session.execute(delete(TimeLogRollup))
+    changes = [
+        (project_id, day, hours, entries)
+        for project_id, day, hours, entries in db.session.execute(
+            select(TimeLog.project_id, TimeLog.date, func.sum(TimeLog.hours), func.count())
+            .group_by(TimeLog.project_id, TimeLog.date)
+        )
+    ]
+    apply_deltas(changes)
+    db.session.commit()
+    return len(changes)
+
+def summarize(period, start=None, end=None, project_id=None):
+    """Read hours per project per period from the rollups."""
+    query = select(
+        TimeLogRollup.project_id,
+        TimeLogRollup.period_start,
+        TimeLogRollup.hours,
+        TimeLogRollup.entries
+    ).where(TimeLogRollup.period == period)
+
+    if project_id is not None:
+        query = query.where(TimeLogRollup.project_id == project_id)
+    if start is not None:
+        query = query.where(TimeLogRollup.period_start >= period_start(period, start))
+    if end is not None:
+        query = query.where(TimeLogRollup.period_start <= end)
+
+    query = query.order_by(TimeLogRollup.period_start, TimeLogRollup.project_id)
+    return db.session.execute(query).all()
@@ -0,0 +1,195 @@
+"""
+Project view counting without a database write per request.
+
+Each worker process counts views in memory per (project, day). A background
+thread flushes the buffer every VIEWS_FLUSH_INTERVAL seconds as one batched
+upsert into project_views (views = views + excluded.views), in key order so
+flushes from several workers cannot deadlock on each other. A failed flush
+puts its counts back for the next attempt. gunicorn's worker_exit hook
+flushes what is left when a worker stops or is recycled; counts buffered in
+a worker that is killed outright are lost.
+
+The popularity used by ?sort=popular is the view count decayed by age with a
+half-life of POPULARITY_HALF_LIFE_DAYS. The refresh_popularity job
+precomputes it into projects.popularity.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+import logging
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+# Import the database extension
+from extensions import db
+# Import cross-worker cache invalidation
+import cache
+# Import models from the parent package
+from models import Project, ProjectView
+# Import the background job framework
+from services.jobs import enqueue, job
+
+logger = logging.getLogger(__name__)
+
+# Days after which a view's weight is negligible (under 0.4%)
+HORIZON_HALF_LIVES = 8
+
+class ViewBuffer:
+    def __init__(self):
+        self.stats = {'recorded': 0, 'flushed': 0, 'flushes': 0, 'failures': 0}
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, project_id, day):
+        with self._lock:
+            self._counts[(project_id, day)] += 1
+            self.stats['recorded'] += 1
+
+    def drain(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            return counts
+
+    def restore(self, counts):
+        with self._lock:
+            self._counts.update(counts)
+
+    def pending(self):
+        with self._lock:
+            return sum(self._counts.values())
+
+_buffer = ViewBuffer()
+_flusher_pid = None
+_scheduled_pid = None
+_flusher_lock = threading.Lock()
+
+def record(project_id):
+    """Count one view of a project; written to the database on the next flush."""
+    app = current_app._get_current_object()
+    if not app.config['VIEWS_ENABLED']:
+        return
+    _buffer.record(project_id, datetime.utcnow().date())
+    # Threads do not survive a fork, so each process starts its own flusher
+    if _flusher_pid != os.getpid():
+        _start_flusher(app)
+
+def _start_flusher(app):
+    global _flusher_pid
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        threading.Thread(target=_run_flusher, args=(app,), name='view-flush', daemon=True).start()
+        _flusher_pid = os.getpid()
+
+def _run_flusher(app):
+    interval = app.config['VIEWS_FLUSH_INTERVAL']
+    while True:
+        time.sleep(interval)
+        try:
+            with app.app_context():
+                flush()
+        except Exception:
+            logger.exception('View counter flush failed')
+
+def _upsert(connection, rows):
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    statement = dialect_insert(ProjectView)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[ProjectView.project_id, ProjectView.day],
+            set_={'views': ProjectView.views + statement.excluded.views}
+        ),
+        rows
+    )
+
+def flush():
+    """Write buffered counts in one batched upsert; returns the views written."""
+    global _scheduled_pid
+    counts = _buffer.drain()
+    if not counts:
+        return 0
+
+    try:
+        with db.engine.begin() as connection:
+            # Projects archived since they were viewed have nowhere to count
+            existing = set(connection.execute(
+                select(Project.id).where(Project.id.in_({project_id for project_id, _ in counts}))
+            ).scalars())
+            rows = [
+                {'project_id': project_id, 'day': day, 'views': views}
+                for (project_id, day), views in sorted(counts.items())
+                if project_id in existing
+            ]
+            if rows:
+                _upsert(connection, rows)
+    except IntegrityError:
+        # A project vanished between the check and the upsert; drop this batch
+        _buffer.stats['failures'] += 1
+        logger.warning('Dropped %s buffered view(s) for removed projects', sum(counts.values()))
+        return 0
+    except Exception:
+        _buffer.restore(counts)
+        _buffer.stats['failures'] += 1
+        raise
+
+    written = sum(row['views'] for row in rows)
+    _buffer.stats['flushes'] += 1
+    _buffer.stats['flushed'] += written
+
+    if _scheduled_pid != os.getpid():
+        # Keep the popularity refresh going; it re-queues itself afterwards
+        schedule_refresh()
+        db.session.commit()
+        _scheduled_pid = os.getpid()
+    return written
+
+def stats():
+    return dict(_buffer.stats, pending=_buffer.pending())
+
+def popularity_scores(today=None, half_life=None):
+    """{project_id: decayed view count} from the daily table."""
+    today = today or datetime.utcnow().date()
+    half_life = half_life or current_app.config['POPULARITY_HALF_LIFE_DAYS']
+    since = today - timedelta(days=int(half_life * HORIZON_HALF_LIVES))
+    scores = defaultdict(float)
+    for project_id, day, views in db.session.execute(
+        select(ProjectView.project_id, ProjectView.day, ProjectView.views).where(ProjectView.day >= since)
+    ):
+        scores[project_id] += views * 0.5 ** ((today - day).days / half_life)
+    return scores
+
+def refresh_popularity():
+    """Store decayed scores on live projects; returns how many changed."""
+    scores = popularity_scores()
+    changes = [
+        # Keep updated_at as is: popularity is not an edit
+        {'id': project_id, 'popularity': round(scores.get(project_id, 0.0), 4), 'updated_at': updated_at}
+        for project_id, updated_at, popularity in db.session.execute(
+            select(Project.id, Project.updated_at, Project.popularity).where(Project.deleted_at.is_(None))
+        )
+        if abs(round(scores.get(project_id, 0.0), 4) - (popularity or 0.0)) >= 1e-4
+    ]
+    if changes:
+        db.session.execute(update(Project), changes)
+        cache.invalidate('projects')
+    return len(changes)
+
+def schedule_refresh(delay=None):
+    """Queue the next popularity refresh in the current transaction, unless one is waiting."""
+    enqueue(
+        'refresh_popularity',
+        delay=current_app.config['POPULARITY_REFRESH_INTERVAL'] if delay is None else delay,
+        dedupe_key='refresh_popularity'
+    )
+
+@job('refresh_popularity', concurrency=1)
+def refresh_popularity_job(payload):
+    refresh_popularity()
+    schedule_refresh()
@@ -0,0 +1,81 @@
+"""
+Request coalescing ("single flight") within a worker process.
+
+Concurrent calls with the same key share one execution: the first caller
+(the leader) runs the function, the others wait for its result instead of
+repeating the same queries and serialization. A follower that waits longer
+than SINGLEFLIGHT_TIMEOUT stops waiting and computes the value itself, so a
+stuck leader cannot hold every request for a key hostage. An exception in
+the leader is raised in its followers too.
+
+Results are shared between threads, so functions must return plain data
+(dicts, lists) rather than ORM objects bound to the leader's session.
+"""
+import threading
+
+from flask import current_app
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class Group:
+    def __init__(self):
+        self.stats = {'executed': 0, 'coalesced': 0, 'timeouts': 0, 'errors': 0}
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, timeout=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats['executed'] += 1
+            else:
+                call.waiters += 1
+
+        if leader:
+            try:
+                call.result = func()
+            except Exception as e:
+                call.error = e
+                with self._lock:
+                    self.stats['errors'] += 1
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+
+        if not call.done.wait(timeout):
+            with self._lock:
+                self.stats['timeouts'] += 1
+            return func()
+        with self._lock:
+            self.stats['coalesced'] += 1
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+_group = Group()
+
+def do(key, func):
+    """Run func() once for all concurrent callers with the same key."""
+    config = current_app.config
+    if not config['SINGLEFLIGHT_ENABLED']:
+        return func()
+    return _group.do(key, func, config['SINGLEFLIGHT_TIMEOUT'])
+
+def stats():
+    return dict(_group.stats, in_flight=_group.in_flight())
@@ -0,0 +1,58 @@
+from contextlib import contextmanager
+import os
+import tempfile
+
+import pytest
+
+# A throwaway SQLite file unless TEST_DATABASE_URL points elsewhere
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+_db_file.close()
+os.environ.setdefault('TEST_DATABASE_URL', f'sqlite:///{_db_file.name}')
+
+@contextmanager
+def make_app(database_url=None):
+    """A testing app on freshly created tables, dropped afterwards.
+
+    It uses TEST_DATABASE_URL unless database_url is given.
+    """
+    from config import TestingConfig
+    from factory import create_app
+    from extensions import db
+
+    with pytest.MonkeyPatch.context() as patch:
+        if database_url:
+            patch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', database_url)
+        app = create_app('testing')
+    with app.app_context():
+        import models  # noqa: F401 (registers the tables)
+        db.create_all()
+    try:
+        yield app
+    finally:
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+@pytest.fixture(scope='session')
+def app_factory():
+    """make_app, for fixtures that need their own app or a wider scope."""
+    return make_app
+
+@pytest.fixture
+def app():
+    with make_app() as app:
+        yield app
+
+@pytest.fixture
+def admin_headers(app):
+    from extensions import db
+    from models import User
+    from api.auth import generate_token
+
+    with app.app_context():
+        user = User(username='admin', email='admin@example.com')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+        token = generate_token(user.id)
+    return {'Authorization': f'Bearer {token}'}
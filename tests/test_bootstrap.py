@@ -0,0 +1,47 @@
+from extensions import db
+from models import Contact, Project
+
+SECTIONS = 'user,projects,tags,contacts'
+
+def add_project(app, slug):
+    with app.app_context():
+        db.session.add(Project(title=slug.title(), slug=slug, description='d', sort_key=slug))
+        db.session.commit()
+
+def test_matching_etag_gets_304(app, admin_headers):
+    add_project(app, 'alpha')
+    client = app.test_client()
+    first = client.get(f'/api/admin/bootstrap?sections={SECTIONS}', headers=admin_headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    again = client.get(f'/api/admin/bootstrap?sections={SECTIONS}', headers=dict(admin_headers, **{'If-None-Match': etag}))
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+    assert not again.data
+
+    add_project(app, 'beta')
+    changed = client.get(f'/api/admin/bootstrap?sections={SECTIONS}', headers=dict(admin_headers, **{'If-None-Match': etag}))
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert [project['slug'] for project in changed.get_json()['sections']['projects']['data']] == ['beta', 'alpha']
+
+def test_known_versions_skip_unchanged_sections(app, admin_headers):
+    add_project(app, 'alpha')
+    client = app.test_client()
+    sections = client.get(f'/api/admin/bootstrap?sections={SECTIONS}', headers=admin_headers).get_json()['sections']
+    versions = ','.join(f"{name}:{section['version']}" for name, section in sections.items())
+
+    with app.app_context():
+        db.session.add(Contact(name='Ada', email='ada@example.com', message='Hello there'))
+        db.session.commit()
+    sections = client.get(f'/api/admin/bootstrap?sections={SECTIONS}&versions={versions}',
+                          headers=admin_headers).get_json()['sections']
+
+    assert {name for name, section in sections.items() if section.get('unchanged')} == {'user', 'projects', 'tags'}
+    assert sections['contacts']['data']['unread'] == 1
+    assert sections['contacts']['data']['total'] == 1
+
+def test_unknown_section(app, admin_headers):
+    response = app.test_client().get('/api/admin/bootstrap?sections=projects,secrets', headers=admin_headers)
+    assert response.status_code == 400
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+from sqlalchemy import select
+
+from extensions import db
+from models import ChangeLog, Project, Tag
+
+def add_projects(app):
+    with app.app_context():
+        python, flask = Tag(name='python'), Tag(name='flask')
+        db.session.add_all([
+            Project(id=1, title='One', slug='one', description='d', sort_key='1', featured=False, tags=[python]),
+            Project(id=2, title='Two', slug='two', description='d', sort_key='2', featured=True, tags=[python, flask]),
+            Project(id=3, title='Three', slug='three', description='d', sort_key='3', deleted_at=datetime.utcnow()),
+            Project(id=4, title='Four', slug='four', description='d', sort_key='4', featured=True, tags=[flask])
+        ])
+        db.session.commit()
+
+def patch(app, headers, body):
+    return app.test_client().patch('/api/admin/projects/bulk', headers=headers, json=body)
+
+def project_state(app, project_id):
+    with app.app_context():
+        project = db.session.get(Project, project_id)
+        return project.featured, project.private, sorted(tag.name for tag in project.tags)
+
+def test_mixed_ids_report_each_project(app, admin_headers):
+    add_projects(app)
+    response = patch(app, admin_headers, {
+        'ids': [2, 99, 1, 3, 4, 1],
+        'set': {'featured': True},
+        'add_tags': ['flask'],
+        'remove_tags': ['python']
+    })
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['updated'], body['unchanged'], body['not_found']) == (2, 1, 2)
+    assert body['results'] == [
+        {'id': 2, 'status': 'updated', 'fields': [], 'tags_added': [], 'tags_removed': ['python']},
+        {'id': 99, 'status': 'not_found'},
+        {'id': 1, 'status': 'updated', 'fields': ['featured'], 'tags_added': ['flask'], 'tags_removed': ['python']},
+        # Deleted projects are not targets
+        {'id': 3, 'status': 'not_found'},
+        {'id': 4, 'status': 'unchanged', 'fields': [], 'tags_added': [], 'tags_removed': []}
+    ]
+    assert project_state(app, 1) == (True, False, ['flask'])
+    assert project_state(app, 2) == (True, False, ['flask'])
+    assert project_state(app, 4) == (True, False, ['flask'])
+    with app.app_context():
+        logged = db.session.execute(select(ChangeLog).where(ChangeLog.kind == 'projects.bulk_updated')).scalar_one()
+        assert logged.data['ids'] == [1, 2]
+
+def test_filter_selects_targets(app, admin_headers):
+    add_projects(app)
+    response = patch(app, admin_headers, {'filter': {'tag': 'python', 'featured': True}, 'set': {'private': True}})
+
+    assert response.status_code == 200
+    assert [(result['id'], result['status']) for result in response.get_json()['results']] == [(2, 'updated')]
+    assert project_state(app, 1)[1] is False
+    assert project_state(app, 2)[1] is True
+
+def test_nothing_changes_when_no_project_does(app, admin_headers):
+    add_projects(app)
+    response = patch(app, admin_headers, {'ids': [4, 99], 'add_tags': ['flask']})
+
+    assert response.get_json()['updated'] == 0
+    with app.app_context():
+        assert db.session.execute(select(ChangeLog)).first() is None
+
+def test_invalid_requests(app, admin_headers):
+    add_projects(app)
+    for body in [
+        {'ids': [1], 'filter': {'featured': True}, 'set': {'featured': False}},
+        {'ids': [1]},
+        {'ids': [1], 'set': {'title': 'x'}},
+        {'ids': [1], 'set': {'featured': 'yes'}},
+        {'ids': [1], 'add_tags': ['flask'], 'remove_tags': ['flask']},
+        {'filter': {'slug': 'one'}, 'set': {'featured': False}}
+    ]:
+        assert patch(app, admin_headers, body).status_code == 400, body
+    assert project_state(app, 1) == (False, False, ['python'])
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, insert, select
+
+import cache
+from extensions import db
+from models import CacheEvent, Tag
+from services import tag_index
+
+class Stopped(Exception):
+    pass
+
+def poll_once(app, monkeypatch, rows):
+    """Run one PollBus poll that finds rows ([(id offset, events, origin)]) published after it connected."""
+    received, lost = [], []
+
+    def on_connected():
+        with db.engine.begin() as connection:
+            last_id = connection.execute(select(func.max(CacheEvent.id))).scalar() or 0
+            for offset, events, origin in rows:
+                connection.execute(insert(CacheEvent).values(
+                    id=last_id + offset, events=events, origin=origin, created_at=datetime.utcnow()
+                ))
+
+    def on_lost():
+        lost.append(True)
+        raise Stopped
+
+    def sleep(seconds):
+        raise Stopped
+
+    monkeypatch.setattr(cache.time, 'sleep', sleep)
+    with app.app_context():
+        with pytest.raises(Stopped):
+            cache.PollBus(app.config).listen(
+                db.engine, lambda events, remote: received.append((events, remote)), on_connected, on_lost
+            )
+    return received, lost
+
+def test_poll_separates_events_from_other_processes(app, monkeypatch):
+    received, lost = poll_once(app, monkeypatch, [
+        (1, ['project:alpha'], cache.origin()),
+        (2, ['tags'], 'another-process')
+    ])
+    assert not lost
+    assert received == [({'project:alpha', 'tags'}, {'tags'})]
+
+def test_poll_treats_a_hole_inside_a_batch_as_lost(app, monkeypatch):
+    received, lost = poll_once(app, monkeypatch, [
+        (1, ['project:alpha'], 'another-process'),
+        (3, ['project:beta'], 'another-process')
+    ])
+    assert lost
+    assert not received
+
+def test_subscribers_only_get_own_events_when_asked(monkeypatch):
+    calls = []
+    monkeypatch.setattr(cache, '_subscribers', [])
+    cache.subscribe(lambda events: calls.append(('remote only', events)))
+    cache.subscribe(lambda events: calls.append(('all', events)), own_events=True)
+
+    cache._apply({'tags'}, set())
+    assert calls == [('all', {'tags'})]
+
+    calls.clear()
+    cache._apply({'tags', 'projects'}, {'projects'})
+    assert calls == [('remote only', {'projects'}), ('all', {'tags', 'projects'})]
+
+def test_local_tag_change_does_not_force_a_rebuild(app):
+    with app.app_context():
+        tag_index._stale.clear()
+        tag = Tag(name='python')
+        db.session.add(tag)
+        db.session.flush()
+        cache.invalidate('tags')
+        db.session.commit()
+    assert not tag_index._stale.is_set()
+
+    cache._apply({'tags'}, {'tags'})
+    assert tag_index._stale.is_set()
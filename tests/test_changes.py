@@ -0,0 +1,78 @@
+import time
+
+from sqlalchemy import delete, select
+
+from extensions import db
+from models import ChangeLog
+from services import changes
+
+def record(*kinds):
+    for kind in kinds:
+        changes.record(kind, {'kind': kind})
+    db.session.commit()
+    return db.session.execute(select(ChangeLog.id).order_by(ChangeLog.id)).scalars().all()
+
+def parse(body):
+    """[(id, event name, data line)] of an SSE body."""
+    events = []
+    for block in body.split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((int(fields['id']), fields['event'], fields['data']))
+    return events
+
+def get_stream(app, headers, last_event_id):
+    response = app.test_client().get('/api/admin/events', headers=dict(headers, **{'Last-Event-ID': last_event_id}))
+    body = response.get_data(as_text=True)
+    # Closing the response unsubscribes the stream, as a disconnect would
+    response.close()
+    return response, body
+
+def test_resume_sends_missed_events_then_ready(app, admin_headers):
+    with app.app_context():
+        ids = record('project.created', 'project.updated', 'contact.created')
+
+    response, body = get_stream(app, admin_headers, str(ids[0]))
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert changes.stats()['subscribers'] == 0
+    assert parse(body) == [
+        (ids[1], 'project.updated', '{"kind":"project.updated"}'),
+        (ids[2], 'contact.created', '{"kind":"contact.created"}'),
+        (ids[2], 'ready', '{}')
+    ]
+
+def test_resume_from_pruned_events_resets(app, admin_headers):
+    with app.app_context():
+        ids = record('project.created', 'project.updated', 'project.deleted')
+        db.session.execute(delete(ChangeLog).where(ChangeLog.id <= ids[1]))
+        db.session.commit()
+
+    response, body = get_stream(app, admin_headers, str(ids[0] - 1))
+    assert [kind for _, kind, _ in parse(body)] == ['reset', 'ready']
+
+def test_invalid_last_event_id(app, admin_headers):
+    response, _ = get_stream(app, admin_headers, 'abc')
+    assert response.status_code == 400
+
+def test_commit_wakes_streams_in_the_same_process(app, monkeypatch):
+    feed = changes.ChangeFeed()
+    monkeypatch.setattr(changes, '_feed', feed)
+    # Far longer than the wait below: only the commit's wake-up can deliver in time
+    app.config['CHANGES_POLL_INTERVAL'] = 60
+    with app.app_context():
+        subscriber, position = changes.subscribe()
+        try:
+            ids = record('project.created')
+            assert [event['id'] for event in subscriber.wait(10)] == ids
+        finally:
+            changes.unsubscribe(subscriber)
+
+def test_feed_holds_back_events_after_a_missing_id():
+    feed = changes.ChangeFeed()
+    events = [{'id': 1}, {'id': 3}]
+    assert feed._contiguous(events, 0) == [{'id': 1}]
+
+    feed._gap = (2, time.monotonic() - changes.GAP_GRACE - 1)
+    assert feed._contiguous(events, 0) == events
+    assert feed.stats['skipped_ids'] == 1
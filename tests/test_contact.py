@@ -0,0 +1,37 @@
+from sqlalchemy import func, select
+
+from extensions import db
+from models import Contact
+from services import notifications
+
+MESSAGE = 'I would like to talk about a freelance project next month'
+
+def contact_count(app):
+    with app.app_context():
+        return db.session.execute(select(func.count()).select_from(Contact)).scalar()
+
+def test_retry_after_a_failed_insert_is_stored(app, monkeypatch):
+    client = app.test_client()
+    body = {'name': 'Ada', 'email': 'ada@example.com', 'message': MESSAGE}
+
+    def fail():
+        raise RuntimeError('database went away')
+
+    monkeypatch.setattr(notifications, 'contact_created', fail)
+    assert client.post('/api/contact', json=body).status_code == 500
+
+    # The retry is neither a duplicate nor counted twice against the limits
+    monkeypatch.undo()
+    assert client.post('/api/contact', json=body).status_code == 200
+    assert contact_count(app) == 1
+
+    # A real second copy is a duplicate, answered like a success but not stored
+    assert client.post('/api/contact', json=body).status_code == 200
+    assert contact_count(app) == 1
+
+def test_short_messages_from_different_senders_are_not_duplicates(app):
+    client = app.test_client()
+    for index, message in enumerate(['hi', 'Hi!', 'thanks!', 'Thanks']):
+        body = {'name': f'Sender {index}', 'email': f'sender{index}@example.com', 'message': message}
+        assert client.post('/api/contact', json=body, environ_base={'REMOTE_ADDR': f'10.0.0.{index}'}).status_code == 200
+    assert contact_count(app) == 4
@@ -0,0 +1,28 @@
+from datetime import date
+import importlib.util
+import os
+
+from sqlalchemy import event
+
+from extensions import db
+from services import dashboard
+
+MIGRATION = os.path.join(os.path.dirname(__file__), '..', 'migrations', 'versions',
+                         'c4d7a9e2f610_add_dashboard_summary.py')
+
+def test_summary_query_matches_the_frozen_migration():
+    # A changed query needs a migration that recreates the Postgres view
+    spec = importlib.util.spec_from_file_location('dashboard_migration', MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    assert migration.SUMMARY_QUERY == dashboard.SUMMARY_QUERY
+
+def test_summary_table_is_created_once(app):
+    with app.app_context():
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        for _ in range(3):
+            summary = dashboard.load_summary(date.today())
+        assert summary['refreshed_at'] is not None
+        assert sum('CREATE TABLE' in statement for statement in statements) == 1
@@ -0,0 +1,59 @@
+from sqlalchemy import func, select
+
+from extensions import db
+from models import IdempotencyKey, Project
+
+def count(app, model):
+    with app.app_context():
+        return db.session.execute(select(func.count()).select_from(model)).scalar()
+
+def test_retry_replays_the_stored_response(app, admin_headers):
+    client = app.test_client()
+    headers = dict(admin_headers, **{'Idempotency-Key': 'create-alpha'})
+    body = {'title': 'Alpha', 'description': 'First project'}
+
+    first = client.post('/api/admin/projects', json=body, headers=headers)
+    assert first.status_code == 201
+    retry = client.post('/api/admin/projects', json=body, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json() == first.get_json()
+    assert count(app, Project) == 1
+
+def test_key_reused_for_a_different_body_is_rejected(app, admin_headers):
+    client = app.test_client()
+    headers = dict(admin_headers, **{'Idempotency-Key': 'create-beta'})
+    assert client.post('/api/admin/projects', json={'title': 'Beta', 'description': 'One'},
+                       headers=headers).status_code == 201
+    response = client.post('/api/admin/projects', json={'title': 'Gamma', 'description': 'Two'},
+                           headers=headers)
+    assert response.status_code == 422
+    assert count(app, Project) == 1
+
+def test_public_keys_are_scoped_by_client(app):
+    client = app.test_client()
+    headers = {'Idempotency-Key': 'contact-1'}
+    messages = ['I would like to talk about a freelance project next month',
+                'Could you send me your rates for a small data pipeline job']
+    for index, message in enumerate(messages):
+        body = {'name': 'Ada', 'email': f'ada{index}@example.com', 'message': message}
+        response = client.post('/api/contact', json=body, headers=headers,
+                               environ_base={'REMOTE_ADDR': f'10.0.0.{index + 1}'})
+        # The second client does not get the first one's replay (or a 422)
+        assert response.status_code == 200
+        assert 'Idempotent-Replayed' not in response.headers
+    assert count(app, IdempotencyKey) == 2
+
+def test_filtered_contacts_claim_no_key(app):
+    client = app.test_client()
+    body = {'name': 'Bot', 'email': 'bot@example.com', 'message': 'x', 'website': 'http://spam.example'}
+    response = client.post('/api/contact', json=body, headers={'Idempotency-Key': 'spam-1'})
+    assert response.status_code == 200
+    assert count(app, IdempotencyKey) == 0
+
+def test_oversized_contacts_are_rejected_before_the_claim(app):
+    client = app.test_client()
+    body = {'name': 'Ada', 'email': 'ada@example.com', 'message': 'x' * 20000}
+    response = client.post('/api/contact', json=body, headers={'Idempotency-Key': 'large-1'})
+    assert response.status_code == 413
+    assert count(app, IdempotencyKey) == 0
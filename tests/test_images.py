@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from PIL import Image
+from sqlalchemy import update
+
+from extensions import db
+from models import Job, Project
+from services import images
+from services.jobs import Worker, load_job_modules
+
+def test_image_changed_while_its_job_is_queued(app, tmp_path):
+    load_job_modules()
+    for name, color in (('first.png', 'red'), ('second.png', 'blue')):
+        Image.new('RGB', (400, 300), color).save(tmp_path / name)
+    app.config.update(IMAGE_SOURCE_DIR=str(tmp_path), IMAGE_OUTPUT_DIR=str(tmp_path / 'variants'),
+                      IMAGE_WIDTHS=(320,), IMAGE_FORMATS=('webp',))
+
+    with app.app_context():
+        project = Project(title='Project', slug='project', description='d', sort_key='V', image_url='/first.png')
+        db.session.add(project)
+        db.session.flush()
+        images.schedule_processing(project)
+        db.session.commit()
+
+        # Replaced before the first job ran: the queued job covers it
+        project.image_url = '/second.png'
+        images.clear_image_metadata(project)
+        images.schedule_processing(project)
+        db.session.commit()
+        db.session.execute(update(Job).values(run_at=datetime.utcnow()))
+        db.session.commit()
+        project_id = project.id
+
+    worker = Worker(app)
+    worker._last_housekeeping = float('inf')
+    assert worker.run_once() == 1
+    with app.app_context():
+        project = db.session.get(Project, project_id)
+        assert project.image_url == '/second.png'
+        assert project.image_variants and project.image_placeholder
+        assert project.image_hash == images.file_hash(str(tmp_path / 'second.png'))
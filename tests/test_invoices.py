@@ -0,0 +1,62 @@
+from datetime import date
+
+from sqlalchemy import func, select
+
+from extensions import db
+from models import Client, FreelanceProject, Invoice, TimeLog
+
+def seed(app):
+    with app.app_context():
+        db.session.add(Client(id=1, name='Acme'))
+        db.session.add_all([
+            FreelanceProject(id=1, client_id=1, title='Site', hourly_rate=100, status='active'),
+            FreelanceProject(id=2, client_id=1, title='App', hourly_rate=80, status='active')
+        ])
+        db.session.add_all([
+            TimeLog(project_id=1, date=date(2026, 3, 2), hours=4),
+            TimeLog(project_id=1, date=date(2026, 3, 20), hours=2),
+            TimeLog(project_id=2, date=date(2026, 3, 10), hours=5)
+        ])
+        db.session.commit()
+
+def invoice_count(app):
+    with app.app_context():
+        return db.session.execute(select(func.count()).select_from(Invoice)).scalar()
+
+def test_rerunning_a_batch_skips_invoiced_projects(app, admin_headers):
+    seed(app)
+    client = app.test_client()
+    period = {'start_date': '2026-03-01', 'end_date': '2026-03-31', 'issue_date': '2026-04-01'}
+
+    first = client.post('/api/admin/invoices/generate-batch', json=period, headers=admin_headers)
+    assert first.status_code == 201
+    assert first.get_json()['count'] == 2
+    assert first.get_json()['invoices'][0]['period_start'] == '2026-03-01'
+
+    again = client.post('/api/admin/invoices/generate-batch', json=period, headers=admin_headers)
+    assert again.status_code == 201
+    assert again.get_json()['count'] == 0
+    assert again.get_json()['skipped_project_ids'] == [1, 2]
+    assert invoice_count(app) == 2
+
+def test_overlapping_period_for_one_project_is_rejected(app, admin_headers):
+    seed(app)
+    client = app.test_client()
+    body = {'project_id': 1, 'start_date': '2026-03-01', 'end_date': '2026-03-15'}
+    assert client.post('/api/admin/invoices/generate', json=body, headers=admin_headers).status_code == 201
+
+    overlapping = dict(body, start_date='2026-03-10', end_date='2026-03-31')
+    response = client.post('/api/admin/invoices/generate', json=overlapping, headers=admin_headers)
+    assert response.status_code == 409
+
+    # The days after the first invoice can still be billed
+    later = dict(body, start_date='2026-03-16', end_date='2026-03-31')
+    assert client.post('/api/admin/invoices/generate', json=later, headers=admin_headers).status_code == 201
+    assert invoice_count(app) == 2
+
+def test_project_id_must_be_an_integer(app, admin_headers):
+    client = app.test_client()
+    for project_id in ['abc', '1', 1.5, True, None]:
+        body = {'project_id': project_id, 'start_date': '2026-03-01', 'end_date': '2026-03-31'}
+        response = client.post('/api/admin/invoices/generate', json=body, headers=admin_headers)
+        assert response.status_code == 400, project_id
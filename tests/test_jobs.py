@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from extensions import db
+from models import Contact, Job
+from services import notifications
+from services.jobs import Worker, load_job_modules
+
+class FailingTransport:
+    """Fails every send; a contact arrives while the digest is being sent."""
+
+    def __init__(self, config):
+        pass
+
+    def send(self, digest):
+        db.session.add(Contact(name='Second', email='second@example.com', message='Another message',
+                               created_at=datetime.utcnow()))
+        notifications.contact_created()
+        db.session.commit()
+        raise ConnectionError('SMTP server unavailable')
+
+def make_due():
+    db.session.execute(update(Job).where(Job.status == 'queued').values(run_at=datetime.utcnow()))
+    db.session.commit()
+
+def test_digest_retry_while_a_duplicate_is_queued(app, monkeypatch):
+    load_job_modules()
+    monkeypatch.setitem(notifications.TRANSPORTS, 'failing', FailingTransport)
+    app.config['NOTIFY_TRANSPORT'] = 'failing'
+    worker = Worker(app, concurrency=2)
+    # Housekeeping is covered separately; keep it out of these polls
+    worker._last_housekeeping = float('inf')
+
+    with app.app_context():
+        db.session.add(Contact(name='First', email='first@example.com', message='Hello there',
+                               created_at=datetime.utcnow()))
+        notifications.contact_created()
+        db.session.commit()
+        make_due()
+
+    # The send fails while a second digest job is queued: the failed one
+    # folds into it instead of violating the queued dedupe_key index
+    assert worker.run_once() == 1
+    assert worker._running == {'contact_digest': 0}
+    assert worker.stats['superseded'] == 1
+    with app.app_context():
+        statuses = db.session.execute(select(Job.status).order_by(Job.id)).scalars().all()
+        assert statuses == ['done', 'queued']
+
+        # The worker keeps going and the digest goes out once SMTP is back
+        app.config['NOTIFY_TRANSPORT'] = 'none'
+        make_due()
+    assert worker.run_once() == 1
+    with app.app_context():
+        unnotified = db.session.execute(select(Contact).where(Contact.notified_at.is_(None))).scalars().all()
+        assert unnotified == []
+
+def test_housekeeping_requeues_abandoned_jobs_next_to_a_duplicate(app):
+    worker = Worker(app)
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.add_all([
+            Job(job_type='contact_digest', payload={}, status='running', attempts=1, max_attempts=8,
+                dedupe_key='contact_digest', run_at=now, started_at=now - timedelta(hours=1), created_at=now),
+            Job(job_type='contact_digest', payload={}, status='queued', attempts=0, max_attempts=8,
+                dedupe_key='contact_digest', run_at=now + timedelta(minutes=5), created_at=now),
+            Job(job_type='related_update', payload={}, status='running', attempts=5, max_attempts=5,
+                run_at=now, started_at=now - timedelta(hours=1), created_at=now)
+        ])
+        db.session.commit()
+
+        worker.housekeeping()
+        rows = db.session.execute(select(Job.status, Job.run_at).order_by(Job.id)).all()
+        assert [row.status for row in rows] == ['done', 'queued', 'failed']
+        # The waiting job is due no later than the abandoned one would have been
+        assert rows[1].run_at <= datetime.utcnow()
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+from sqlalchemy import select
+
+from extensions import db
+from models import Project
+from services import ordering
+from services.ordering import key_after, key_between, spread_keys
+
+def test_key_between_keeps_order_without_trailing_zeros():
+    rng = random.Random(49)
+    keys = []
+    for _ in range(2000):
+        position = rng.randint(0, len(keys))
+        before = keys[position - 1] if position else None
+        after = keys[position] if position < len(keys) else None
+        key = key_between(before, after)
+        assert (before or '') < key and (after is None or key < after)
+        assert not key.endswith('0')
+        keys.insert(position, key)
+    assert keys == sorted(keys)
+
+def test_repeated_moves_into_one_gap_grow_slowly():
+    low, high = 'V', 'W'
+    for _ in range(60):
+        high = key_between(low, high)
+    # About one character per six moves
+    assert len(high) <= 1 + 60 // 5
+
+def test_key_between_rejects_unordered_bounds():
+    with pytest.raises(ValueError):
+        key_between('b', 'a')
+    with pytest.raises(ValueError):
+        key_between('a', 'a')
+
+def test_key_after_and_spread_keys():
+    for key in ['', 'V', 'z', 'zz', 'Vz', 'V1']:
+        after = key_after(key)
+        assert after > key and not after.endswith('0')
+    keys = spread_keys(5000)
+    assert keys == sorted(set(keys))
+    assert not any(key.endswith('0') for key in keys)
+
+def add_projects(app, count):
+    with app.app_context():
+        for number in range(1, count + 1):
+            db.session.add(Project(title=f'P{number}', slug=f'p{number}', description='d', sort_key=ordering.next_key()))
+            db.session.flush()
+        db.session.commit()
+
+def manual_order(client, headers):
+    response = client.get('/api/admin/projects?sort=manual', headers=headers)
+    return [project['id'] for project in response.get_json()['projects']]
+
+def test_reorder_endpoint(app, admin_headers):
+    add_projects(app, 4)
+    client = app.test_client()
+    with app.app_context():
+        updated_at = db.session.execute(select(Project.updated_at).where(Project.id == 4)).scalar()
+
+    response = client.post('/api/admin/projects/reorder', headers=admin_headers, json={'moves': [
+        {'id': 4, 'after_id': None},
+        {'id': 1, 'before_id': None},
+        {'id': 2, 'after_id': 3}
+    ]})
+    assert response.status_code == 200
+    assert manual_order(client, admin_headers) == [4, 3, 2, 1]
+    with app.app_context():
+        # Reordering is not an edit
+        assert db.session.execute(select(Project.updated_at).where(Project.id == 4)).scalar() == updated_at
+
+    response = client.post('/api/admin/projects/reorder', headers=admin_headers, json={'moves': [
+        {'id': 4, 'after_id': 99}
+    ]})
+    assert response.status_code == 404
+    assert manual_order(client, admin_headers) == [4, 3, 2, 1]
+
+def test_rebalance_keeps_order_and_shortens_keys(app):
+    add_projects(app, 3)
+    with app.app_context():
+        for project_id, key in [(1, 'V'), (2, 'VVVVVVVVVVVVVVVVVVVVVVVVVVVVVV1'), (3, 'VVVVVVVVVVVVVVVVVVVVVVVVVVVVVV2')]:
+            db.session.get(Project, project_id).sort_key = key
+        db.session.commit()
+
+        assert ordering.rebalance() == 3
+        db.session.commit()
+        rows = db.session.execute(select(Project.id, Project.sort_key).order_by(Project.sort_key)).all()
+    assert [row.id for row in rows] == [1, 2, 3]
+    assert max(len(row.sort_key) for row in rows) <= 2
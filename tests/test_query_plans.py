@@ -0,0 +1,275 @@
+"""
+Query-plan regression tests for the API routes.
+
+Seeds a database with enough rows to make full scans expensive, calls each
+route in ROUTES through the test client while recording the SQL it sends,
+then EXPLAINs every distinct statement. A route fails when a plan:
+  - reads a large table with a sequential scan, or
+  - sorts a large number of rows (Postgres: Sort over more than
+    SORT_ROWS_LIMIT estimated rows; SQLite: a temporary B-tree sort fed by
+    a full scan)
+unless the route lists that table as allowed, because it returns the whole
+table anyway.
+
+The test database (TEST_DATABASE_URL, SQLite by default) is always checked,
+with EXPLAIN QUERY PLAN on SQLite. Set DATABASE_URL to an empty, disposable
+Postgres database to also check real Postgres plans, with EXPLAIN (FORMAT
+JSON) after ANALYZE.
+"""
+from datetime import date, datetime, timedelta
+import json
+import os
+import random
+import threading
+
+import pytest
+
+import cache
+
+# (route, tables the route may scan in full because it returns all of them)
+ROUTES = [
+    ('/api/projects', {'projects'}),
+    ('/api/projects?tag=tag-3', set()),
+    ('/api/projects?sort=popular', {'projects'}),
+    ('/api/projects/featured', set()),
+    ('/api/projects/project-42', set()),
+    ('/api/projects/project-42/related', set()),
+    ('/api/admin/projects', {'projects'}),
+    ('/api/admin/projects?sort=manual', {'projects'}),
+    ('/api/admin/projects?deleted=true', set()),
+    ('/api/admin/contacts', set()),
+    ('/api/admin/time-logs', set()),
+    ('/api/admin/time-logs?project_id=3&start=2026-01-01&end=2026-03-31', set()),
+    ('/api/admin/time-logs/summary?period=month&start=2026-01-01&end=2026-06-30', set()),
+    ('/api/admin/invoices?project_id=3&paid=false', set()),
+    ('/api/admin/invoices', {'invoices'}),
+    ('/api/admin/dashboard', set()),
+    ('/api/admin/jobs/stats', set()),
+    ('/api/admin/bootstrap', {'projects', 'project_tags'}),
+    ('/api/admin/tags/suggest?q=tag', set()),
+    ('/api/admin/analytics/views?days=30', set()),
+    ('/api/admin/analytics/projects/42/views', set()),
+]
+
+LARGE_TABLE_ROWS = 1000
+SORT_ROWS_LIMIT = 1000
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+def seed(db, scale):
+    """Bulk-insert synthetic rows; returns row counts per table."""
+    from sqlalchemy import insert
+    from models import (Client, Contact, FreelanceProject, Invoice, Job, Project, ProjectNeighbor,
+                        ProjectView, Tag, TimeLog, project_tags)
+    from services import ordering, related, time_rollups, views
+
+    rng = random.Random(42)
+    now = datetime(2026, 6, 30)
+    counts = {
+        'projects': 2000 * scale,
+        'tags': 50,
+        'contacts': 20000 * scale,
+        'clients': 50,
+        'freelance_projects': 200,
+        'time_logs': 50000 * scale,
+        'invoices': 10000 * scale,
+        'jobs': 5000 * scale
+    }
+    view_days = 180
+
+    db.session.execute(insert(Tag), [{'id': i, 'name': f'tag-{i}'} for i in range(1, counts['tags'] + 1)])
+    sort_keys = ordering.spread_keys(counts['projects'])
+    db.session.execute(insert(Project), [
+        {
+            'id': i,
+            'title': f'Project {i}',
+            'slug': f'project-{i}',
+            'description': 'Synthetic project',
+            'featured': i % 100 == 0,
+            'private': False,
+            'content': None,
+            'created_at': now - timedelta(days=i),
+            'updated_at': now - timedelta(hours=i),
+            'deleted_at': now - timedelta(days=i) if i % 50 == 0 else None,
+            'sort_key': sort_keys[i - 1]
+        }
+        for i in range(1, counts['projects'] + 1)
+    ])
+    links = {(rng.randint(1, counts['projects']), rng.randint(1, counts['tags'])) for _ in range(counts['projects'] * 3)}
+    db.session.execute(insert(project_tags), [{'project_id': p, 'tag_id': t} for p, t in links])
+    counts['project_tags'] = len(links)
+
+    db.session.execute(insert(Contact), [
+        {
+            'name': f'Sender {i}',
+            'email': f'sender{i}@example.com',
+            'message': 'Hello',
+            'created_at': now - timedelta(minutes=i),
+            'read': i % 3 == 0,
+            'notified_at': now - timedelta(minutes=i) if i > 10 else None,
+            'deleted_at': now - timedelta(minutes=i) if i % 20 == 0 else None
+        }
+        for i in range(1, counts['contacts'] + 1)
+    ])
+    db.session.execute(insert(Client), [{'id': i, 'name': f'Client {i}'} for i in range(1, counts['clients'] + 1)])
+    db.session.execute(insert(FreelanceProject), [
+        {'id': i, 'client_id': rng.randint(1, counts['clients']), 'title': f'Engagement {i}', 'hourly_rate': 90, 'status': 'active'}
+        for i in range(1, counts['freelance_projects'] + 1)
+    ])
+    db.session.execute(insert(TimeLog), [
+        {
+            'project_id': rng.randint(1, counts['freelance_projects']),
+            'date': date(2025, 1, 1) + timedelta(days=rng.randint(0, 545)),
+            'hours': rng.choice([0.5, 1.0, 2.0, 3.5]),
+            'description': None
+        }
+        for _ in range(counts['time_logs'])
+    ])
+    db.session.execute(insert(Invoice), [
+        {
+            'project_id': rng.randint(1, counts['freelance_projects']),
+            'invoice_number': f'INV-SEED-{i:06d}',
+            'amount': 500,
+            'issue_date': date(2025, 1, 1) + timedelta(days=i % 545),
+            'due_date': date(2025, 1, 31) + timedelta(days=i % 545),
+            'paid': i % 4 != 0,
+            'paid_date': None
+        }
+        for i in range(1, counts['invoices'] + 1)
+    ])
+    db.session.execute(insert(Job), [
+        {
+            'job_type': 'refresh_dashboard',
+            'payload': {},
+            'status': 'done',
+            'attempts': 1,
+            'max_attempts': 3,
+            'run_at': now - timedelta(minutes=i),
+            'created_at': now - timedelta(minutes=i),
+            'started_at': now - timedelta(minutes=i),
+            'finished_at': now - timedelta(minutes=i)
+        }
+        for i in range(counts['jobs'])
+    ])
+    # Analytics read days relative to today, not to the fixed `now`
+    today = date.today()
+    viewed = {
+        (rng.randint(1, counts['projects']), today - timedelta(days=rng.randint(0, view_days - 1)))
+        for _ in range(counts['projects'] * 20)
+    }
+    db.session.execute(insert(ProjectView), [
+        {'project_id': p, 'day': d, 'views': rng.randint(1, 50)} for p, d in sorted(viewed)
+    ])
+    counts['project_views'] = len(viewed)
+    db.session.commit()
+    time_rollups.rebuild_rollups()
+    related.rebuild_all()
+    views.refresh_popularity()
+    db.session.commit()
+    counts['project_neighbors'] = db.session.query(ProjectNeighbor).count()
+    return counts
+
+def capture(client, headers, route):
+    """Call a route and return the (statement, parameters) pairs it executed."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    statements = []
+    thread = threading.get_ident()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # Skip background threads (cache listener, change feed)
+        if thread != threading.get_ident():
+            return
+        if not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+            statements.append((statement, parameters))
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(route, headers=headers)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+    assert response.status_code == 200, f'{route} returned {response.status_code}: {response.get_data(as_text=True)[:200]}'
+
+    unique = {}
+    for statement, parameters in statements:
+        unique.setdefault(statement, parameters)
+    return list(unique.items())
+
+def postgres_problems(connection, statement, parameters, large, allowed):
+    plan = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + statement, parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    problems = []
+    def walk(node):
+        relation = node.get('Relation Name')
+        if node['Node Type'] == 'Seq Scan' and relation in large and relation not in allowed:
+            problems.append(f'Seq Scan on {relation}')
+        if node['Node Type'] in ('Sort', 'Incremental Sort') and node.get('Plan Rows', 0) > SORT_ROWS_LIMIT and not allowed:
+            problems.append(f"Sort of ~{node['Plan Rows']} rows")
+        for child in node.get('Plans', []):
+            walk(child)
+    walk(plan[0]['Plan'])
+    return problems
+
+def sqlite_problems(connection, statement, parameters, large, allowed):
+    rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+    details = [row[-1] for row in rows]
+
+    problems = []
+    full_scans = []
+    for detail in details:
+        parts = detail.split()
+        if parts[0] == 'SCAN' and 'USING' not in parts:
+            table = parts[1]
+            if table in large:
+                full_scans.append(table)
+                if table not in allowed:
+                    problems.append(f'full scan of {table}')
+    if any('TEMP B-TREE' in detail for detail in details) and full_scans and not allowed:
+        problems.append('sort of a full table scan')
+    return problems
+
+DATABASE_URL = os.environ.get('DATABASE_URL', '')
+
+@pytest.fixture(scope='module', params=[
+    pytest.param(None, id='test-db'),
+    pytest.param(DATABASE_URL, id='postgres', marks=pytest.mark.skipif(
+        not DATABASE_URL.startswith('postgresql'), reason='DATABASE_URL does not point at Postgres'))
+])
+def seeded(request, app_factory):
+    """(client, auth headers, large tables, checker, connection) on a seeded database."""
+    from sqlalchemy import text
+    from extensions import db
+    from models import User
+    from api.auth import generate_token
+
+    with app_factory(request.param) as app, pytest.MonkeyPatch.context() as patch:
+        # Every route must reach the database to have its statements checked
+        patch.setattr(cache, 'get_or_load', lambda namespace, key, loader: loader())
+        with app.app_context():
+            counts = seed(db, 1)
+            if db.engine.dialect.name == 'postgresql':
+                db.session.execute(text('ANALYZE'))
+                db.session.commit()
+            large = {table for table, count in counts.items() if count >= LARGE_TABLE_ROWS}
+
+            user = User(username='plans', email='plans@example.com')
+            user.set_password('plans')
+            db.session.add(user)
+            db.session.commit()
+            headers = {'Authorization': f'Bearer {generate_token(user.id)}'}
+
+            check = postgres_problems if db.engine.dialect.name == 'postgresql' else sqlite_problems
+            with db.engine.connect() as connection:
+                yield app.test_client(), headers, large, check, connection
+
+@pytest.mark.parametrize('route, allowed', ROUTES, ids=[route for route, _ in ROUTES])
+def test_route_plans(seeded, route, allowed):
+    client, headers, large, check, connection = seeded
+    failures = []
+    for statement, parameters in capture(client, headers, route):
+        problems = check(connection, statement, parameters, large, allowed)
+        if problems:
+            failures.append(f"{'; '.join(problems)}: {' '.join(statement.split())[:160]}")
+    assert not failures, '\n'.join(failures)
@@ -0,0 +1,85 @@
+import random
+
+from sqlalchemy import insert, select
+
+from extensions import db
+from models import Project, ProjectNeighbor, Tag, project_tags
+from services import ordering, related
+
+# Sparse enough that a project shares tags and terms with only a few others
+TAGS = 200
+WORDS = [f'topic{n}' for n in range(300)]
+
+def seed(count=120):
+    rng = random.Random(7)
+    db.session.execute(insert(Tag), [{'id': i, 'name': f'tag-{i}'} for i in range(1, TAGS + 1)])
+    db.session.execute(insert(Project), [
+        {'id': i, 'title': f'Project {i}', 'slug': f'project-{i}', 'sort_key': key,
+         'description': ' '.join(rng.sample(WORDS, 3))}
+        for i, key in enumerate(ordering.spread_keys(count), start=1)
+    ])
+    db.session.execute(insert(project_tags), [
+        {'project_id': i, 'tag_id': tag_id} for i in range(1, count + 1) for tag_id in rng.sample(range(1, TAGS + 1), 2)
+    ])
+    db.session.commit()
+
+def neighbour_rows():
+    return db.session.execute(
+        select(ProjectNeighbor.project_id, ProjectNeighbor.rank, ProjectNeighbor.neighbor_id, ProjectNeighbor.score)
+        .order_by(ProjectNeighbor.project_id, ProjectNeighbor.rank)
+    ).all()
+
+def test_update_matches_a_full_rebuild_and_loads_only_neighbours(app, monkeypatch):
+    with app.app_context():
+        seed()
+        related.rebuild_all()
+        db.session.commit()
+
+        # Retag one project; its description (and so every document frequency) stays
+        db.session.execute(project_tags.delete().where(project_tags.c.project_id == 5))
+        db.session.execute(insert(project_tags), [{'project_id': 5, 'tag_id': 1}, {'project_id': 5, 'tag_id': 2}])
+        db.session.commit()
+
+        loaded = []
+        original = related.SimilarityIndex.__init__
+
+        def spy(self, tags, counts, *args, **kwargs):
+            loaded.append(len(set(tags) | set(counts)))
+            original(self, tags, counts, *args, **kwargs)
+
+        monkeypatch.setattr(related.SimilarityIndex, '__init__', spy)
+        related.update_project(5)
+        db.session.commit()
+        incremental = neighbour_rows()
+        monkeypatch.undo()
+
+        related.rebuild_all()
+        db.session.commit()
+        assert incremental == neighbour_rows()
+        assert loaded and loaded[0] < 60, loaded
+
+def test_deleted_project_leaves_its_neighbours_rows(app):
+    with app.app_context():
+        seed(30)
+        related.rebuild_all()
+        db.session.commit()
+        listing = db.session.execute(
+            select(ProjectNeighbor.project_id).where(ProjectNeighbor.neighbor_id == 3)
+        ).scalars().all()
+        assert listing
+
+        db.session.get(Project, 3).deleted_at = db.func.now()
+        db.session.commit()
+        related.update_project(3)
+        db.session.commit()
+        assert db.session.execute(
+            select(ProjectNeighbor).where((ProjectNeighbor.neighbor_id == 3) | (ProjectNeighbor.project_id == 3))
+        ).first() is None
+
+def test_first_update_fills_the_term_index(app):
+    with app.app_context():
+        seed(30)
+        # Nothing stored yet, as right after the migration
+        assert related.update_project(1) == 30
+        db.session.commit()
+        assert len(neighbour_rows()) > 0
@@ -0,0 +1,84 @@
+import threading
+
+import singleflight
+from singleflight import Group
+
+def run_concurrently(count, target):
+    results = [None] * count
+    def run(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+def wait_for_waiters(group, key, count):
+    for _ in range(500):
+        with group._lock:
+            if group._calls[key].waiters == count:
+                return
+        threading.Event().wait(0.01)
+    raise AssertionError('followers never arrived')
+
+def test_concurrent_calls_share_one_execution():
+    group = Group()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return {'slug': 'alpha'}
+
+    threads, results = run_concurrently(5, lambda: group.do('project:alpha', load, timeout=5))
+    wait_for_waiters(group, 'project:alpha', 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{'slug': 'alpha'}] * 5
+    assert group.stats['executed'] == 1
+    assert group.stats['coalesced'] == 4
+    assert group.in_flight() == 0
+
+def test_leader_error_reaches_followers_and_is_not_kept():
+    group = Group()
+    release = threading.Event()
+
+    def load():
+        release.wait(5)
+        raise LookupError('gone')
+
+    threads, results = run_concurrently(3, lambda: group.do('key', load, timeout=5))
+    wait_for_waiters(group, 'key', 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(result, LookupError) for result in results)
+    # The next call runs again instead of seeing the old error
+    assert group.do('key', lambda: 'fresh') == 'fresh'
+
+def test_follower_computes_for_itself_after_timeout():
+    group = Group()
+    release = threading.Event()
+    leader = threading.Thread(target=group.do, args=('key', lambda: release.wait(5)))
+    leader.start()
+    try:
+        wait_for_waiters(group, 'key', 0)
+        assert group.do('key', lambda: 'own', timeout=0.05) == 'own'
+        assert group.stats['timeouts'] == 1
+    finally:
+        release.set()
+        leader.join()
+
+def test_do_runs_directly_when_disabled(app):
+    app.config['SINGLEFLIGHT_ENABLED'] = False
+    executed = singleflight.stats()['executed']
+    with app.app_context():
+        assert singleflight.do('key', lambda: 'value') == 'value'
+    assert singleflight.stats()['executed'] == executed
@@ -0,0 +1,62 @@
+import os
+
+from extensions import db
+from models import Project, Tag
+from services import tag_index
+from services.tag_index import TagIndex
+
+ROWS = [(1, 'Python', 5), (2, 'PyTest', 2), (3, 'pyramid', None), (4, 'JavaScript', 9), (5, 'Flask', 3)]
+
+def names(suggestions):
+    return [suggestion['name'] for suggestion in suggestions]
+
+def test_prefix_matches_rank_by_project_count():
+    index = TagIndex(ROWS)
+    assert names(index.suggest('pyt', 10)) == ['Python', 'PyTest']
+    # Short prefixes come from the precomputed ranking
+    assert names(index.suggest('p', 10)) == ['Python', 'PyTest', 'pyramid']
+    assert index.suggest('py', 1) == [{'id': 1, 'name': 'Python', 'project_count': 5}]
+    assert index.suggest('  ', 10) == []
+
+def test_similar_names_fill_in_after_prefix_matches():
+    index = TagIndex(ROWS)
+    assert names(index.suggest('pythn', 10))[0] == 'Python'
+    assert names(index.suggest('script', 10)) == ['JavaScript']
+    assert index.suggest('haskell', 10) == []
+
+def test_add_and_remove_update_every_lookup():
+    index = TagIndex(ROWS)
+    index.add(6, 'Pyodide')
+    assert 'Pyodide' in names(index.suggest('py', 10))
+    assert names(index.suggest('pyod', 10)) == ['Pyodide']
+
+    index.remove(1)
+    assert 'Python' not in names(index.suggest('p', 10))
+    assert index.suggest('python', 10) == []
+    assert 1 not in index.similar('pythn', 10)
+
+def test_endpoint_uses_the_index_once_built(app, admin_headers, monkeypatch):
+    with app.app_context():
+        python, pytest_tag = Tag(name='python'), Tag(name='pytest')
+        db.session.add_all([
+            Project(title='A', slug='a', description='d', sort_key='a', tags=[python, pytest_tag]),
+            Project(title='B', slug='b', description='d', sort_key='b', tags=[python])
+        ])
+        db.session.commit()
+        ids = {'python': python.id, 'pytest': pytest_tag.id}
+        rows = tag_index._load_rows()
+    # No builder thread: the test decides when the index exists
+    monkeypatch.setattr(tag_index, '_builder_pid', os.getpid())
+    monkeypatch.setattr(tag_index, '_index', None)
+    client = app.test_client()
+
+    from_database = client.get('/api/admin/tags/suggest?q=pyt', headers=admin_headers).get_json()
+    assert from_database['source'] == 'database'
+
+    monkeypatch.setattr(tag_index, '_index', TagIndex(rows))
+    from_index = client.get('/api/admin/tags/suggest?q=pyt', headers=admin_headers).get_json()
+    assert from_index['source'] == 'index'
+    assert from_index['tags'] == from_database['tags'] == [
+        {'id': ids['python'], 'name': 'python', 'project_count': 2},
+        {'id': ids['pytest'], 'name': 'pytest', 'project_count': 1}
+    ]
@@ -0,0 +1,49 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event, select
+
+from api.time_logs import parse_entry
+from extensions import db
+from models import Client, FreelanceProject, TimeLogRollup
+from services import time_rollups
+
+@pytest.mark.parametrize('hours', ['nan', 'NaN', 'inf', '-inf', 'Infinity', 0, -1, 24.5])
+def test_parse_entry_rejects_hours_out_of_range(hours):
+    row, error = parse_entry({'project_id': 1, 'date': '2026-01-05', 'hours': hours})
+    assert row is None
+    assert error == 'Hours must be between 0 and 24'
+
+def test_parse_entry_accepts_hours_as_strings():
+    row, error = parse_entry({'project_id': '1', 'date': '2026-01-05', 'hours': '7.5'})
+    assert error is None
+    assert row['hours'] == 7.5 and row['project_id'] == 1
+
+def test_emptied_rollups_are_deleted_by_key(app):
+    with app.app_context():
+        db.session.add(Client(id=1, name='Acme'))
+        db.session.add_all([FreelanceProject(id=1, client_id=1, title='Site'),
+                            FreelanceProject(id=2, client_id=1, title='App')])
+        time_rollups.apply_deltas([(1, date(2026, 3, 2), 4.0, 1), (1, date(2026, 3, 20), 2.0, 1)])
+        # An empty row no change touches stays until a rebuild
+        db.session.add(TimeLogRollup(project_id=2, period='day', period_start=date(2026, 1, 5), hours=0, entries=0))
+        db.session.commit()
+
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        time_rollups.apply_deltas([(1, date(2026, 3, 2), -4.0, -1)])
+        db.session.commit()
+
+        rows = db.session.execute(
+            select(TimeLogRollup.project_id, TimeLogRollup.period, TimeLogRollup.period_start)
+            .order_by(TimeLogRollup.project_id, TimeLogRollup.period, TimeLogRollup.period_start)
+        ).all()
+        assert rows == [
+            (1, 'day', date(2026, 3, 20)),
+            (1, 'month', date(2026, 3, 1)),
+            (1, 'week', date(2026, 3, 16)),
+            (2, 'day', date(2026, 1, 5))
+        ]
+        delete_statement, = [statement for statement in statements if statement.startswith('DELETE')]
+        assert 'project_id' in delete_statement
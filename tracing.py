@@ -0,0 +1,287 @@
+"""
+Lightweight request tracing with W3C traceparent propagation.
+
+With TRACING_ENABLED off (the default) span() returns a shared no-op object
+and no hooks or engine listeners are installed, so instrumented code pays a
+single global lookup. When enabled, every request to the api blueprint gets
+a server span (continuing the caller's trace from its traceparent header),
+each SQL statement becomes a child span, and finished spans are exported in
+batches from a background thread.
+
+Exporters are chosen with TRACING_EXPORTER: 'console', 'file' (JSON lines in
+TRACING_FILE) or 'package.module:ClassName' for a custom class taking the
+app config and providing export(spans).
+"""
+from contextvars import ContextVar
+import importlib
+import json
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+
+from flask import g, request
+
+TRACEPARENT_RE = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+MAX_STATEMENT_LENGTH = 500
+
+_current_span = ContextVar('current_span', default=None)
+_tracer = None
+
+class NoopSpan:
+    """Stand-in returned while tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+NOOP_SPAN = NoopSpan()
+
+class Span:
+    def __init__(self, tracer, name, trace_id, parent_id, sampled, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = '%016x' % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes
+        self.status = 'ok'
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._token = None
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def start(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def end(self, error=None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.status = 'error'
+            self.attributes['error'] = f'{type(error).__name__}: {error}'
+        if self._token is not None:
+            try:
+                _current_span.reset(self._token)
+            except ValueError:
+                # Ended from a different context than it was started in
+                _current_span.set(None)
+            self._token = None
+        if self.sampled:
+            self.tracer.processor.submit(self)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end(exc)
+        return False
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_ns': self.start_ns,
+            'duration_ms': round((self.end_ns - self.start_ns) / 1e6, 3),
+            'status': self.status,
+            'attributes': self.attributes
+        }
+
+class ConsoleExporter:
+    def __init__(self, config):
+        self.stream = sys.stderr
+
+    def export(self, spans):
+        for span in spans:
+            self.stream.write(json.dumps(span, default=str) + '\n')
+        self.stream.flush()
+
+class FileExporter:
+    def __init__(self, config):
+        self.path = config['TRACING_FILE']
+
+    def export(self, spans):
+        with open(self.path, 'a') as f:
+            for span in spans:
+                f.write(json.dumps(span, default=str) + '\n')
+
+EXPORTERS = {
+    'console': ConsoleExporter,
+    'file': FileExporter
+}
+
+class BatchProcessor:
+    """Collect finished spans and export them from a background thread."""
+
+    def __init__(self, exporter, max_batch=256, interval=1.0, max_queue=10000):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.interval = interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                threading.Thread(target=self._run, name='trace-export', daemon=True).start()
+                self._pid = os.getpid()
+
+    def submit(self, span):
+        # Threads do not survive a fork, so each process starts its own
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self.queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        batch = []
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.queue.get_nowait().to_dict())
+            except queue.Empty:
+                break
+        if batch:
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                sys.stderr.write(f'Trace export failed: {e}\n')
+        return len(batch)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            while self.flush() == self.max_batch:
+                pass
+
+class Tracer:
+    def __init__(self, processor, sample_rate=1.0, service='portfolio-api'):
+        self.processor = processor
+        self.sample_rate = sample_rate
+        self.service = service
+
+    def start_span(self, name, attributes=None, parent=None, traceparent=None):
+        if traceparent:
+            match = TRACEPARENT_RE.match(traceparent.strip().lower())
+            if match:
+                trace_id, parent_id, flags = match.groups()
+                return Span(self, name, trace_id, parent_id, bool(int(flags, 16) & 1), attributes or {})
+
+        parent = parent or _current_span.get()
+        if parent is not None:
+            return Span(self, name, parent.trace_id, parent.span_id, parent.sampled, attributes or {})
+
+        sampled = random.random() < self.sample_rate
+        return Span(self, name, '%032x' % random.getrandbits(128), None, sampled, attributes or {})
+
+def span(name, **attributes):
+    """Context manager timing a block as a child of the current span."""
+    if _tracer is None:
+        return NOOP_SPAN
+    return _tracer.start_span(name, attributes)
+
+def current_span():
+    return _current_span.get() if _tracer is not None else None
+
+def inject_headers(headers):
+    """Add traceparent for an outgoing call made inside the current span."""
+    current = current_span()
+    if current is not None:
+        headers['traceparent'] = current.traceparent
+    return headers
+
+def _load_exporter(config):
+    name = config['TRACING_EXPORTER']
+    if name in EXPORTERS:
+        return EXPORTERS[name](config)
+    module_name, _, class_name = name.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)(config)
+
+def init_app(app):
+    """Install request hooks and SQL listeners when TRACING_ENABLED is set."""
+    global _tracer
+    if not app.config.get('TRACING_ENABLED'):
+        return
+
+    if _tracer is None:
+        _tracer = Tracer(
+            BatchProcessor(_load_exporter(app.config)),
+            sample_rate=app.config['TRACING_SAMPLE_RATE']
+        )
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def start_request_span():
+        if request.blueprint != 'api':
+            return
+        rule = request.url_rule.rule if request.url_rule else request.path
+        g.trace_span = _tracer.start_span(
+            f'{request.method} {rule}',
+            {'http.method': request.method, 'http.route': rule, 'http.target': request.path},
+            traceparent=request.headers.get('traceparent')
+        ).start()
+
+    @app.after_request
+    def finish_request_span(response):
+        current = g.get('trace_span')
+        if current is not None:
+            current.set_attribute('http.status_code', response.status_code)
+            if response.status_code >= 500:
+                current.status = 'error'
+            response.headers['traceparent'] = current.traceparent
+        return response
+
+    @app.teardown_request
+    def end_request_span(error=None):
+        current = g.pop('trace_span', None)
+        if current is not None:
+            current.end(error)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_span.get() is None or context is None:
+        return
+    context._trace_span = _tracer.start_span('db.query', {
+        'db.system': conn.dialect.name,
+        'db.statement': statement[:MAX_STATEMENT_LENGTH],
+        'db.executemany': executemany
+    }).start()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    db_span = getattr(context, '_trace_span', None)
+    if db_span is not None:
+        db_span.set_attribute('db.rows', cursor.rowcount)
+        db_span.end()
+        context._trace_span = None
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    db_span = getattr(context, '_trace_span', None) if context is not None else None
+    if db_span is not None:
+        db_span.end(exception_context.original_exception)
+        context._trace_span = None
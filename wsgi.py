@@ -1,6 +1,6 @@
-from __init__ import create_app
+from factory import create_app
 
 app = create_app('production')
 
 if __name__ == "__main__":
-    app.run()
\ No newline at end of file
+    app.run()